@@ -0,0 +1,119 @@
+import multiprocessing
+import time
+
+import engine
+from engine import Action
+from policies import load_policy, odds_policy
+
+# 컴퓨터 플레이어: 정책 계산은 별도 프로세스에서 하고 화면 루프는 결과를 기다리지 않는다.
+# 메인 루프는 매 프레임 update() 를 호출해 결정된 액션이 있는지 확인만 한다.
+
+# --- 상수 정의 ---
+
+DEFAULT_POLICY = "tablebase"
+THINK_BUDGET = 2.0  # 초, 이 시간 안에 답이 없으면 대체 정책으로 진행
+MOVE_DELAY = 0.6  # 초, 사람이 볼 수 있도록 액션 사이 최소 간격
+SHUTDOWN_TIMEOUT = 1.0
+
+# --- 클래스 ---
+
+class AIPlayer:
+    def __init__(self, policy_name=DEFAULT_POLICY, player=1, budget=THINK_BUDGET, delay=MOVE_DELAY):
+        self.policy_name = policy_name
+        self.player = player
+        self.budget = budget
+        self.delay = delay
+
+        # pygame 상태를 복사하지 않도록 spawn 으로 새 인터프리터에서 실행
+        context = multiprocessing.get_context("spawn")
+        self.conn, worker_conn = context.Pipe()
+        self.process = context.Process(target=_worker, args=(policy_name, worker_conn), daemon=True)
+        self.process.start()
+        worker_conn.close()
+
+        self.request_id = 0
+        self.outstanding = 0  # 작업 프로세스가 아직 답하지 않은 요청 수
+        self.state = None  # 생각 중인 상태 (엔진 step 은 매번 새 객체를 만들므로 식별자로 비교)
+        self.started = 0.0
+        self.action = None
+        self.answered = False
+
+    def controls(self, state):
+        return not state.game_over and state.current_player == self.player
+
+    def update(self, state):
+        """결정된 액션을 반환, 아직 생각 중이면 None (절대 대기하지 않음)"""
+        if not self.controls(state):
+            self.state = None
+            return None
+
+        now = time.monotonic()
+        if state is not self.state:
+            self.request_id += 1
+            self.state = state
+            self.started = now
+            self.action = None
+            self.answered = False
+            self.conn.send((self.request_id, state))
+            self.outstanding += 1
+
+        # 이전 요청의 늦은 답은 버림
+        while self.conn.poll():
+            request_id, action = self.conn.recv()
+            self.outstanding -= 1
+            if request_id == self.request_id:
+                self.action = action
+                self.answered = True
+
+        elapsed = now - self.started
+        if not self.answered and elapsed < self.budget:
+            return None
+        if elapsed < self.delay:
+            return None
+
+        action = self.action
+        if action is None or not engine.is_legal(state, action):
+            # 시간 초과, 정책 오류 또는 불가능한 액션: 즉시 계산되는 정책으로 대체
+            action = odds_policy(state)
+        self.state = None
+        return action
+
+    def close(self):
+        # 창을 닫을 때 호출: 계산 중이면 기다리지 않고 작업 프로세스를 강제 종료
+        if self.process.is_alive():
+            if self.outstanding:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+            self.process.join(SHUTDOWN_TIMEOUT)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+
+# --- 함수 ---
+
+def _worker(policy_name, conn):
+    # 작업 프로세스: (요청 번호, 상태) 를 받아 (요청 번호, 액션) 을 돌려줌, None 이면 종료
+    try:
+        policy = load_policy(policy_name)
+    except Exception as e:
+        print(f"Failed to load AI policy {policy_name!r}: {e}")
+        policy = None
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        request_id, state = request
+        try:
+            action = Action(policy(state)) if policy else None
+        except Exception as e:
+            print(f"AI policy {policy_name!r} failed: {e}")
+            action = None
+        try:
+            conn.send((request_id, action))
+        except OSError:
+            return
@@ -0,0 +1,350 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# 이미지와 사운드를 한 번만 불러와 공유하는 자원 캐시
+# 이미지는 (경로, 크기, 회전, 알파 여부) 별로 변환이 끝난 Surface 를 보관하므로
+# 같은 카드를 여러 장 그려도 디스크 읽기/디코딩/크기 조정은 한 번뿐이다.
+#
+# preload_image/preload_sound 로 요청한 자원은 스레드 풀에서 병렬로 디코딩하고,
+# image/sound 로 실제로 필요해진 순간에만 그 자원을 기다린다.
+# 디스플레이 형식 변환(convert)은 메인 스레드에서 한다.
+#
+# 미리 구운 자원 묶음 파일(python assets.py 로 생성)이 있으면
+# 최종 크기의 픽셀과 믹서 형식의 PCM 을 mmap 으로 바로 읽어 디코딩/크기 조정을 건너뛴다.
+#
+# 묶음 파일 구조
+#   헤더    : BUNDLE_HEADER (magic, version, 색인 길이)
+#   색인    : JSON (이미지/사운드 항목, 원본 파일 크기/수정 시각, 데이터 해시 -> 위치)
+#   데이터  : BLOB_ALIGN 단위로 정렬된 원시 픽셀/PCM, 같은 내용은 한 번만 저장
+
+# --- 상수 정의 ---
+
+DEFAULT_BUNDLE_PATH = "assets.bundle"
+BUNDLE_MAGIC = b"BRAB"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<4sHI")
+BLOB_ALIGN = 16
+LOAD_WORKERS = 4  # 자원 디코딩 스레드 수
+TEXT_CACHE_SIZE = 256  # 보관할 렌더링된 문자열 Surface 수
+
+# --- 클래스 ---
+
+class AssetBundle:
+    # mmap 으로 연 읽기 전용 자원 묶음
+    def __init__(self, path=DEFAULT_BUNDLE_PATH):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = BUNDLE_HEADER.unpack_from(self.data, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} asset bundle")
+        start = BUNDLE_HEADER.size
+        index = json.loads(bytes(self.data[start:start + index_size]))
+        self.mixer = tuple(index["mixer"]) if index["mixer"] else None
+        self.blobs = index["blobs"]
+        self.images = {image_key(entry): entry for entry in index["images"]}
+        self.sounds = {entry["path"]: entry for entry in index["sounds"]}
+
+    def close(self):
+        self.data.close()
+
+    def image(self, key):
+        """캐시 키에 해당하는 최종 크기의 Surface (변환 전), 없거나 원본이 바뀌었으면 None"""
+        entry = self.images.get(key)
+        if entry is None or not is_fresh(entry):
+            return None
+        return pygame.image.frombuffer(self._blob(entry), tuple(entry["pixel_size"]), entry["format"])
+
+    def sound(self, path):
+        # 믹서 형식이 만들 때와 같을 때만 원시 PCM 사용
+        entry = self.sounds.get(path)
+        if entry is None or not is_fresh(entry) or pygame.mixer.get_init() != self.mixer:
+            return None
+        return pygame.mixer.Sound(buffer=self._blob(entry))
+
+    def _blob(self, entry):
+        offset, length = self.blobs[entry["hash"]]
+        return memoryview(self.data)[offset:offset + length]
+
+class AssetRegistry:
+    def __init__(self, bundle_path=None, workers=LOAD_WORKERS):
+        self.images = {}
+        self.sounds = {}
+        self.hits = 0
+        self.misses = 0
+        self.bundle_hits = 0  # 묶음 파일에서 바로 만든 자원 수
+
+        # 미리 요청한 자원: 캐시 키 (이미지는 튜플, 사운드는 경로) -> Future
+        self.pending = {}
+        self.requested = 0
+        self.workers = workers
+        self.executor = None
+
+        self.bundle = None
+        if bundle_path:
+            try:
+                self.bundle = AssetBundle(bundle_path)
+            except (OSError, ValueError) as e:
+                print(f"Failed to load asset bundle: {e}")
+
+    def preload_image(self, path, size=None, rotation=0, alpha=True, fill=None):
+        # 백그라운드 스레드에서 디코딩 시작 (image 와 같은 인자로 요청해야 같은 자원으로 인식)
+        key = (path, size, rotation, alpha)
+        if key not in self.images and key not in self.pending:
+            self.pending[key] = self._submit(self._decode_image, key, fill)
+
+    def preload_sound(self, path):
+        if path not in self.sounds and path not in self.pending:
+            self.pending[path] = self._submit(self._decode_sound, path)
+
+    @property
+    def loading(self):
+        return any(not future.done() for future in self.pending.values())
+
+    def progress(self):
+        """(끝난 요청 수, 전체 요청 수) - 로딩 화면 표시용"""
+        waiting = sum(1 for future in self.pending.values() if not future.done())
+        return self.requested - waiting, self.requested
+
+    def close(self):
+        if self.executor is not None:
+            # 실행 중인 디코딩이 묶음을 읽고 있을 수 있으므로 끝날 때까지 기다림
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        # 받아 가지 않은 Surface 는 mmap 을 가리키므로 먼저 버려야 닫을 수 있음
+        self.pending.clear()
+        if self.bundle is not None:
+            self.bundle.close()
+            self.bundle = None
+
+    def image(self, path, size=None, rotation=0, alpha=True, fill=None):
+        """크기 조정/회전까지 끝난 공유 Surface 반환 (반환된 Surface 를 수정하면 안 됨)
+
+        불러오기에 실패하면 size 크기의 투명한 (fill 이 있으면 그 색으로 칠한) Surface 를 쓴다.
+        미리 요청한 자원이면 디코딩이 끝날 때까지 이 자원만 기다린다.
+        """
+        key = (path, size, rotation, alpha)
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+
+        future = self.pending.pop(key, None)
+        surface, from_bundle = future.result() if future else self._decode_image(key, fill)
+        self.bundle_hits += from_bundle
+        surface = surface.convert_alpha() if alpha else surface.convert()
+        self.images[key] = surface
+        return surface
+
+    def sound(self, path):
+        """공유 Sound 반환, 불러오지 못하면 None (실패도 캐시해 한 번만 출력)"""
+        if path in self.sounds:
+            self.hits += 1
+            return self.sounds[path]
+        self.misses += 1
+
+        future = self.pending.pop(path, None)
+        sound, from_bundle = future.result() if future else self._decode_sound(path)
+        self.bundle_hits += from_bundle
+        self.sounds[path] = sound
+        return sound
+
+    def _submit(self, function, *args):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+        self.requested += 1
+        return self.executor.submit(function, *args)
+
+    def _decode_image(self, key, fill):
+        # 디스플레이 형식 변환 전까지 (스레드에서 실행 가능): (Surface, 묶음 사용 여부)
+        path, size, rotation, alpha = key
+        surface = self.bundle.image(key) if self.bundle else None
+        if surface is not None:
+            return surface, True
+
+        try:
+            surface = pygame.image.load(path)
+        except pygame.error as e:
+            print(f"Failed to load image {path}: {e}")
+            surface = pygame.Surface(size or (1, 1), pygame.SRCALPHA)
+            if fill is not None:
+                surface.fill(fill)
+        if size is not None and surface.get_size() != size:
+            surface = pygame.transform.scale(surface, size)
+        if rotation:
+            surface = pygame.transform.rotate(surface, rotation)
+        return surface, False
+
+    def _decode_sound(self, path):
+        sound = self.bundle.sound(path) if self.bundle else None
+        if sound is not None:
+            return sound, True
+        try:
+            return pygame.mixer.Sound(path), False
+        except pygame.error as e:
+            print(f"Failed to load sound {path}: {e}")
+            return None, False
+
+    def image_bytes(self):
+        return sum(surface.get_pitch() * surface.get_height() for surface in self.images.values())
+
+    def sound_bytes(self):
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        frequency, sample_format, channels = mixer
+        sample_size = abs(sample_format) // 8 * channels
+        return sum(
+            round(sound.get_length() * frequency) * sample_size
+            for sound in self.sounds.values()
+            if sound is not None
+        )
+
+    def report(self):
+        # 캐시 적중 횟수와 메모리 사용량 요약
+        return (
+            f"Assets: {len(self.images)} images ({self.image_bytes() / 2**20:.1f} MiB), "
+            f"{len(self.sounds)} sounds ({self.sound_bytes() / 2**20:.1f} MiB), "
+            f"{self.hits} cache hits, {self.misses} loads ({self.bundle_hits} from bundle)"
+        )
+
+class TextCache:
+    # 폰트는 한 번만 만들고, 렌더링한 문자열 Surface 는 LRU 로 보관
+    # system 이 참이면 SysFont, 아니면 Font 로 폰트를 만든다 (name 이 None 이면 기본 폰트)
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size, bold=False, name=None, system=True):
+        key = (name, size, bold, system)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size) if system else pygame.font.Font(name, size)
+            if bold:
+                font.set_bold(True)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, size, bold=False, name=None, system=True):
+        """안티앨리어싱 적용된 문자열 Surface (공유되므로 수정하면 안 됨)"""
+        key = (name, size, bold, system, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.font(size, bold, name, system).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+# --- 함수 ---
+
+def image_key(entry):
+    size = tuple(entry["size"]) if entry["size"] else None
+    return (entry["path"], size, entry["rotation"], entry["alpha"])
+
+def source_stamp(path):
+    # 원본 파일이 바뀌었는지 확인하기 위한 (크기, 수정 시각), 원본이 없으면 None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def is_fresh(entry):
+    # 원본이 없으면 (묶음만 배포한 경우) 묶음을 그대로 사용
+    stamp = source_stamp(entry["path"])
+    return stamp is None or stamp == entry["source"]
+
+def write_bundle(registry, path=DEFAULT_BUNDLE_PATH):
+    """registry 가 불러온 자원을 최종 형식 그대로 묶음 파일에 기록, 항목 수 반환"""
+    blobs = {}  # 데이터 해시 -> 원시 바이트
+    images = []
+    sounds = []
+
+    def add_blob(data):
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        blobs.setdefault(digest, data)
+        return digest
+
+    for (image_path, size, rotation, alpha), surface in registry.images.items():
+        stamp = source_stamp(image_path)
+        if stamp is None:
+            continue  # 불러오기 실패로 만든 대체 Surface 는 굽지 않음
+        pixel_format = "RGBA" if alpha else "RGB"
+        images.append({
+            "path": image_path,
+            "size": size,
+            "rotation": rotation,
+            "alpha": alpha,
+            "pixel_size": surface.get_size(),
+            "format": pixel_format,
+            "source": stamp,
+            "hash": add_blob(pygame.image.tobytes(surface, pixel_format)),
+        })
+    for sound_path, sound in registry.sounds.items():
+        stamp = source_stamp(sound_path)
+        if sound is None or stamp is None:
+            continue
+        sounds.append({"path": sound_path, "source": stamp, "hash": add_blob(sound.get_raw())})
+
+    # 색인 길이가 데이터 위치에 영향을 주므로 위치를 정한 뒤 색인 크기가 안정될 때까지 반복
+    index_size = 0
+    while True:
+        offset = BUNDLE_HEADER.size + index_size
+        locations = {}
+        for digest, data in blobs.items():
+            offset += -offset % BLOB_ALIGN
+            locations[digest] = [offset, len(data)]
+            offset += len(data)
+        index = json.dumps({
+            "mixer": pygame.mixer.get_init(),
+            "images": images,
+            "sounds": sounds,
+            "blobs": locations,
+        }).encode()
+        if len(index) == index_size:
+            break
+        index_size = len(index)
+
+    with open(path, "wb") as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, index_size))
+        f.write(index)
+        for digest, data in blobs.items():
+            f.write(b"\0" * (locations[digest][0] - f.tell()))
+            f.write(data)
+    return len(images) + len(sounds)
+
+def main():
+    # 게임 초기화 과정에서 불러오는 자원을 그대로 모아 묶음 파일 생성 (창 없이 실행)
+    import main as game  # main 이 이 모듈을 import 하므로 여기서 불러옴
+
+    parser = argparse.ArgumentParser(description="Prebake game assets into a memory-mappable bundle.")
+    parser.add_argument("-o", "--output", default=DEFAULT_BUNDLE_PATH)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    game.ASSET_BUNDLE_PATH = None  # 기존 묶음이 아닌 원본 파일에서 불러오기
+    game.init()
+    game.init_game()
+    nb_entries = write_bundle(game.assets, args.output)
+    print(f"Wrote {nb_entries} assets to {args.output} ({os.path.getsize(args.output) / 2**20:.1f} MiB)")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import numpy as np
+
+from engine import (
+    Action,
+    Item,
+    INITIAL_LIVES,
+    NB_SLOTS,
+    MIN_ROUNDS,
+    NB_ITEMS,
+    NB_ACTIONS,
+    SCARECROW_CHANCE,
+    GRENADE_CHANCE,
+    SYRINGE_CHANCE,
+    RESPAWN_CHANCE,
+    DAMAGE,
+    ENHANCED_DAMAGE,
+)
+
+# NumPy 배열로 N 판을 동시에 진행하는 배치 엔진
+# 규칙은 engine.apply_action 과 같고, 판마다 Python 객체를 만들지 않는다.
+# 규칙의 난수는 판마다 따로 가진 splitmix64 스트림(64비트 상태 하나)에서 뽑으므로
+# 한 판의 진행은 그 판의 시드와 액션으로만 정해지고 N 이나 다른 판의 진행과 무관하다.
+
+# --- 상수 정의 ---
+
+ONGOING = -2  # winner 배열에서 진행 중인 판
+
+# splitmix64 상수
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_MULTIPLIER1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_MULTIPLIER2 = np.uint64(0x94D049BB133111EB)
+DOUBLE_UNIT = 1.0 / (1 << 53)
+
+# 탄창 비트마스크 조회 테이블
+FULL_MASKS = np.array([(1 << n) - 1 for n in range(NB_SLOTS + 1)], dtype=np.int32)
+# SELECT_TABLE[mask, r]: mask 에서 r 번째로 켜진 비트의 위치
+SELECT_TABLE = np.zeros((1 << NB_SLOTS, NB_SLOTS), dtype=np.int32)
+for _mask in range(1 << NB_SLOTS):
+    _positions = [i for i in range(NB_SLOTS) if _mask >> i & 1]
+    SELECT_TABLE[_mask, : len(_positions)] = _positions
+
+# 길이 n, 실탄 k 발인 모든 배치를 한 배열에 모아 두고 (n, k) 별 시작 위치/개수 기록
+_arrangements = []
+ARRANGEMENT_OFFSET = np.zeros((NB_SLOTS + 1, NB_SLOTS + 1), dtype=np.int32)
+ARRANGEMENT_COUNT = np.zeros((NB_SLOTS + 1, NB_SLOTS + 1), dtype=np.int32)
+for _n in range(NB_SLOTS + 1):
+    for _k in range(_n + 1):
+        _masks = [m for m in range(1 << _n) if bin(m).count("1") == _k]
+        ARRANGEMENT_OFFSET[_n, _k] = len(_arrangements)
+        ARRANGEMENT_COUNT[_n, _k] = len(_masks)
+        _arrangements.extend(_masks)
+ARRANGEMENTS = np.array(_arrangements, dtype=np.int32)
+
+# --- 클래스 ---
+
+class BatchMatch:
+    # N 개의 독립된 판 상태를 배열로 보관
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)  # 규칙 밖의 난수 (random_actions 등)
+        self.rows = np.arange(n)
+        self.streams = np.zeros(n, dtype=np.uint64)  # 판별 규칙 난수 상태
+        self.seed(seed)
+
+        self.lives = np.zeros((n, 2), dtype=np.int8)
+        self.mag_bits = np.zeros(n, dtype=np.int32)
+        self.mag_len = np.zeros(n, dtype=np.int32)
+        self.mag_live = np.zeros(n, dtype=np.int32)
+        self.items = np.zeros((n, 2, NB_ITEMS), dtype=bool)
+        self.used = np.zeros((n, 2, NB_ITEMS), dtype=bool)
+        self.bullet_enhanced = np.zeros((n, 2), dtype=bool)
+        self.scarecrow_protected = np.zeros((n, 2), dtype=bool)
+        self.item_used_this_turn = np.zeros(n, dtype=bool)
+        self.current_player = np.zeros(n, dtype=np.int8)
+        self.winner = np.full(n, ONGOING, dtype=np.int8)
+        self.nb_actions = np.zeros(n, dtype=np.int32)
+
+        self.reset()
+
+    @property
+    def done(self):
+        return self.winner != ONGOING
+
+    def seed(self, seed=None):
+        """판별 난수 스트림 초기화
+        seed 가 정수나 None 이면 판 i 는 SeedSequence(seed) 의 i 번째 자식, 길이 N 목록이면 판 i 는 seed[i]"""
+        if seed is None or np.ndim(seed) == 0:
+            entropy = np.random.SeedSequence(seed).entropy
+            sequences = [np.random.SeedSequence(entropy, spawn_key=(row,)) for row in range(self.n)]
+        else:
+            if len(seed) != self.n:
+                raise ValueError(f"Expected {self.n} seeds, got {len(seed)}")
+            sequences = [np.random.SeedSequence(row_seed) for row_seed in seed]
+        self.streams[:] = [sequence.generate_state(1, np.uint64)[0] for sequence in sequences]
+
+    def reset(self, rows=None):
+        # "Play" 클릭 시와 같은 초기 상태로 되돌림 (rows 가 없으면 전체)
+        if rows is None:
+            rows = self.rows
+        self.lives[rows] = INITIAL_LIVES
+        self.used[rows] = False
+        self.bullet_enhanced[rows] = False
+        self.scarecrow_protected[rows] = False
+        self.item_used_this_turn[rows] = False
+        self.current_player[rows] = 0
+        self.winner[rows] = ONGOING
+        self.nb_actions[rows] = 0
+
+        self._reload_magazine(rows)
+        self.items[rows, :, Item.SCARECROW] = self._random(rows, 2) < RESPAWN_CHANCE
+        self.items[rows, :, Item.BULLET] = True
+        self.items[rows, :, Item.GRENADE] = self._random(rows, 2) < RESPAWN_CHANCE
+        self.items[rows, :, Item.SYRINGE] = True
+
+    def legal_mask(self, out=None):
+        # (N, NB_ACTIONS) 불리언 배열: 각 판에서 가능한 액션 (out 이 있으면 그 배열에 씀)
+        mask = np.empty((self.n, NB_ACTIONS), dtype=bool) if out is None else out
+        ongoing = self.winner == ONGOING
+        loaded = self.mag_len > 0
+        mask[:, Action.SHOOT_SELF] = ongoing & loaded
+        mask[:, Action.SHOOT_OPPONENT] = ongoing & loaded
+        mask[:, Action.RELOAD] = ongoing & ~loaded
+        player = self.current_player
+        usable = (
+            self.items[self.rows, player] & ~self.used[self.rows, player]
+        ) & (ongoing & ~self.item_used_this_turn)[:, None]
+        mask[:, Action.USE_BULLET:Action.RELOAD] = usable
+        return mask
+
+    def step(self, actions):
+        """판마다 액션 하나씩 적용 후 실제로 적용된 판의 불리언 배열 반환"""
+        actions = np.asarray(actions)
+        applied = self.legal_mask()[self.rows, actions]
+
+        self._shoot(np.flatnonzero(applied & (actions == Action.SHOOT_SELF)), True)
+        self._shoot(np.flatnonzero(applied & (actions == Action.SHOOT_OPPONENT)), False)
+        self._use_bullet(np.flatnonzero(applied & (actions == Action.USE_BULLET)))
+        self._use_scarecrow(np.flatnonzero(applied & (actions == Action.USE_SCARECROW)))
+        self._use_syringe(np.flatnonzero(applied & (actions == Action.USE_SYRINGE)))
+        self._use_grenade(np.flatnonzero(applied & (actions == Action.USE_GRENADE)))
+        self._reload(np.flatnonzero(applied & (actions == Action.RELOAD)))
+
+        self.nb_actions += applied
+        self._check_game_over()
+        return applied
+
+    def _random(self, rows, size=None):
+        # rows 판마다 [0, 1) 균등 난수 (size 가 있으면 판마다 size 개), 그 판들의 스트림만 진행
+        count = 1 if size is None else size
+        state = self.streams[rows]
+        values = np.empty((len(rows), count))
+        for column in range(count):
+            state += GOLDEN_GAMMA
+            z = state ^ (state >> np.uint64(30))
+            z *= MIX_MULTIPLIER1
+            z ^= z >> np.uint64(27)
+            z *= MIX_MULTIPLIER2
+            z ^= z >> np.uint64(31)
+            values[:, column] = (z >> np.uint64(11)) * DOUBLE_UNIT
+        self.streams[rows] = state
+        return values[:, 0] if size is None else values
+
+    def _reload_magazine(self, rows):
+        # Weapon.reload 와 같은 장탄 수/실탄 수 분포로 탄창 채우기
+        draws = self._random(rows, 3)
+        capacity = MIN_ROUNDS + (draws[:, 0] * (NB_SLOTS + 1 - MIN_ROUNDS)).astype(np.int32)
+        low, high = capacity / 4, capacity // 2
+        nb_live = np.ceil(low + draws[:, 1] * (high - low)).astype(np.int32)
+        nb_live[capacity == 2] = 1
+        pick = (draws[:, 2] * ARRANGEMENT_COUNT[capacity, nb_live]).astype(np.int32)
+        self.mag_bits[rows] = ARRANGEMENTS[ARRANGEMENT_OFFSET[capacity, nb_live] + pick]
+        self.mag_len[rows] = capacity
+        self.mag_live[rows] = nb_live
+
+    def _end_turn(self, rows):
+        self.current_player[rows] = 1 - self.current_player[rows]
+        self.item_used_this_turn[rows] = False
+        self.used[rows] = False
+
+    def _shoot(self, rows, target_self):
+        if not len(rows):
+            return
+        player = self.current_player[rows]
+        target = player if target_self else 1 - player
+
+        # 실탄/공포탄이 모두 있으면 50% 확률로 종류 선택, 그 종류 중 무작위 위치 제거
+        bits = self.mag_bits[rows]
+        length = self.mag_len[rows]
+        nb_live = self.mag_live[rows]
+        draws = self._random(rows, 2)
+        mixed = (nb_live > 0) & (nb_live < length)
+        live = np.where(mixed, draws[:, 0] < 0.5, nb_live > 0)
+        count = np.where(live, nb_live, length - nb_live)
+        rank = (draws[:, 1] * count).astype(np.int32)
+        index = SELECT_TABLE[np.where(live, bits, ~bits & FULL_MASKS[length]), rank]
+        self.mag_bits[rows] = (bits & FULL_MASKS[index]) | ((bits >> (index + 1)) << index)
+        self.mag_len[rows] = length - 1
+        self.mag_live[rows] = nb_live - live
+
+        # 피해량 계산 (bullet 효과는 공포탄이어도 소모됨)
+        damage = np.where(self.bullet_enhanced[rows, player], ENHANCED_DAMAGE, DAMAGE)
+        self.bullet_enhanced[rows, player] = False
+
+        protected = self.scarecrow_protected[rows, target]
+        blocked = live & protected
+        self.scarecrow_protected[rows[blocked], target[blocked]] = False
+        hit = live & ~protected
+        hit_rows, hit_target = rows[hit], target[hit]
+        self.lives[hit_rows, hit_target] = np.maximum(
+            0, self.lives[hit_rows, hit_target] - damage[hit]
+        )
+
+        # "Shoot Self" 로 공포탄을 쏜 경우에만 턴 유지
+        if target_self:
+            self._end_turn(rows[live])
+        else:
+            self._end_turn(rows)
+        self.item_used_this_turn[rows] = False
+
+    def _mark_used(self, rows, player, item):
+        self.used[rows, player, item] = True
+        self.item_used_this_turn[rows] = True
+
+    def _use_bullet(self, rows):
+        player = self.current_player[rows]
+        self._mark_used(rows, player, Item.BULLET)
+        self.items[rows, player, Item.BULLET] = False
+        self.bullet_enhanced[rows, player] = True
+
+    def _use_scarecrow(self, rows):
+        player = self.current_player[rows]
+        self._mark_used(rows, player, Item.SCARECROW)
+        self.items[rows, player, Item.SCARECROW] = False
+        success = self._random(rows) < SCARECROW_CHANCE
+        self.scarecrow_protected[rows[success], player[success]] = True
+
+    def _use_syringe(self, rows):
+        player = self.current_player[rows]
+        self._mark_used(rows, player, Item.SYRINGE)
+        success = self._random(rows) < SYRINGE_CHANCE
+        # 생명력이 가득 찬 경우 카드는 남고 턴당 사용만 소모됨
+        heal = success & (self.lives[rows, player] < INITIAL_LIVES)
+        self.lives[rows[heal], player[heal]] += 1
+        spent = heal | ~success
+        self.items[rows[spent], player[spent], Item.SYRINGE] = False
+
+    def _use_grenade(self, rows):
+        player = self.current_player[rows]
+        self._mark_used(rows, player, Item.GRENADE)
+        self.items[rows, player, Item.GRENADE] = False
+        success = rows[self._random(rows) < GRENADE_CHANCE]
+        self.lives[success] = np.maximum(0, self.lives[success] - 1)
+        # 수류탄은 사용 즉시 턴 종료
+        self._end_turn(rows)
+
+    def _reload(self, rows):
+        if not len(rows):
+            return
+        self._reload_magazine(rows)
+        # 허수아비 효과로 보호 중인 플레이어의 허수아비는 재활성화하지 않음
+        respawn = self._random(rows, 2) < RESPAWN_CHANCE
+        scarecrow = self.items[rows, :, Item.SCARECROW]
+        protected = self.scarecrow_protected[rows]
+        self.items[rows, :, Item.SCARECROW] = np.where(protected, scarecrow, respawn)
+        self.items[rows, :, Item.BULLET] = True
+        self.items[rows, :, Item.GRENADE] = self._random(rows, 2) < RESPAWN_CHANCE
+        self.items[rows, :, Item.SYRINGE] = self._random(rows, 2) < RESPAWN_CHANCE
+        self.used[rows] = False
+        self.item_used_this_turn[rows] = False
+
+    def _check_game_over(self):
+        # 진행 중인 판 중 생명력이 0 이하인 판의 승자 기록
+        ongoing = self.winner == ONGOING
+        dead = self.lives <= 0
+        over = ongoing & (dead[:, 0] | dead[:, 1])
+        self.winner[over & dead[:, 0] & dead[:, 1]] = -1  # 무승부
+        self.winner[over & dead[:, 0] & ~dead[:, 1]] = 1  # Player 2 승리
+        self.winner[over & ~dead[:, 0] & dead[:, 1]] = 0  # Player 1 승리
+
+def random_actions(batch):
+    # 가능한 액션 중 하나를 판마다 균등하게 선택
+    mask = batch.legal_mask()
+    scores = np.where(mask, batch.rng.random(mask.shape), -1.0)
+    return scores.argmax(axis=1)
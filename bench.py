@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# 화면 없이 (SDL dummy 드라이버) 실행하는 성능 측정 모음
+# 시작 시간, 화면별 프레임 시간, 클릭 후 화면 반영까지의 지연, 규칙 엔진 처리량을 측정해
+# JSON 기준값으로 저장하고, 기준값과 비교해 느려진 항목이 있으면 실패(종료 코드 1)한다.
+#
+# 항목 이름이 _ms 로 끝나면 작을수록, _per_s 로 끝나면 클수록 좋은 값이다.
+# 다른 프로세스의 방해는 측정값을 느린 쪽으로만 흔들므로 시간은 빠른 쪽 백분위수,
+# 처리량은 짧은 반복 중 가장 빠른 값을 쓴다.
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import engine
+
+# --- 상수 정의 ---
+
+STARTUP_REPEATS = 5
+FRAME_SAMPLES = 200
+CLICK_SAMPLES = 200
+RULES_SAMPLES = 5000
+MATCH_SAMPLES = 100
+ENV_COUNT = 1024  # 벡터 환경 측정의 환경 수
+ENV_STEPS = 20  # 벡터 환경 측정 한 번의 step 수
+RULES_REPEATS = 20
+TIME_PERCENTILE = 10  # 시간 항목에 쓰는 백분위수
+TOLERANCE = 0.25  # 기준값보다 이 비율 이상 나빠지면 실패
+NOISE_FLOOR_MS = 0.05  # 이보다 작은 시간 차이는 측정 잡음으로 보고 무시
+
+# 새 인터프리터에서 메뉴와 게임 화면까지 준비하는 시간 (모듈 import 포함)
+COLD_START_CODE = (
+    "import main\n"
+    "main.REPLAY_PATH = None\n"
+    "main.init()\n"
+    "main.init_game()\n"
+    "main.assets.close()\n"
+)
+
+# --- 함수 ---
+
+def percentile_ms(samples):
+    return statistics.quantiles(samples, n=100)[TIME_PERCENTILE - 1] * 1000
+
+def close_game(game):
+    # init() 이 연 자원 정리 (테이블베이스 mmap 과 파일, 자원 로더)
+    if game.tablebase is not None:
+        game.tablebase.close()
+        game.tablebase = None
+    game.assets.close()
+
+def bench_startup(game, metrics):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    samples = []
+    for _ in range(STARTUP_REPEATS):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", COLD_START_CODE], env=env, check=True, stdout=subprocess.DEVNULL
+        )
+        samples.append(time.perf_counter() - start)
+    metrics["startup_cold_ms"] = percentile_ms(samples)
+
+    # 같은 프로세스에서 다시 초기화 (모듈과 디스크 캐시가 이미 준비된 상태)
+    samples = []
+    for _ in range(STARTUP_REPEATS):
+        start = time.perf_counter()
+        game.init()
+        game.init_game()
+        samples.append(time.perf_counter() - start)
+        close_game(game)
+    metrics["startup_warm_ms"] = percentile_ms(samples)
+
+def time_frames(renderer, before_frame=None):
+    # renderer.render() 한 번의 시간 목록 (before_frame 은 측정 밖에서 상태를 바꿈)
+    samples = []
+    for index in range(FRAME_SAMPLES):
+        if before_frame:
+            before_frame(index)
+        start = time.perf_counter()
+        renderer.render()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def bench_frames(game, metrics, rng):
+    game.router = game.menu_router
+    metrics["menu_full_frame_ms"] = percentile_ms(
+        time_frames(game.menu_renderer, lambda index: game.menu_renderer.invalidate())
+    )
+
+    # 메뉴 버튼 위를 오가는 마우스 오버만 바뀌는 프레임
+    play_region = game.menu_router.hit(game.play_text_rect.center)
+    def toggle_hover(index):
+        game.menu_router.hovered = play_region if index % 2 else None
+    metrics["menu_hover_frame_ms"] = percentile_ms(time_frames(game.menu_renderer, toggle_hover))
+
+    game.start_match(vs_ai=False, seed=0)
+    game.router = game.game_router
+    metrics["playing_full_frame_ms"] = percentile_ms(
+        time_frames(game.game_renderer, lambda index: game.game_renderer.invalidate())
+    )
+    metrics["playing_idle_frame_ms"] = percentile_ms(time_frames(game.game_renderer))
+
+    # 액션 하나가 반영된 뒤의 프레임 (판이 끝나면 새 판)
+    def play_action(index):
+        if game.match.game_over:
+            game.start_match(vs_ai=False, seed=index)
+        game.perform(rng.choice(engine.legal_actions(game.match)))
+    metrics["playing_action_frame_ms"] = percentile_ms(time_frames(game.game_renderer, play_action))
+
+    while not game.match.game_over:
+        game.perform(rng.choice(engine.legal_actions(game.match)))
+    game.game.game_state = game.GameState.GAME_OVER
+    game.router = game.game_over_router
+    metrics["game_over_full_frame_ms"] = percentile_ms(
+        time_frames(game.game_over_renderer, lambda index: game.game_over_renderer.invalidate())
+    )
+
+def bench_click(game, metrics, rng):
+    # 클릭 이벤트가 큐에 들어온 뒤 규칙 적용과 화면 반영까지의 시간
+    import pygame
+
+    game.game.game_state = game.GameState.PLAYING
+    game.router = game.game_router
+    samples = []
+    seed = 0
+    for _ in range(CLICK_SAMPLES):
+        if game.match.game_over:
+            seed += 1
+            game.start_match(vs_ai=False, seed=seed)
+        if game.match.magazine.length == 0:
+            game.handle_reload()
+        game.game_renderer.render()
+        button = rng.choice((game.shoot_self_button_rect, game.shoot_opponent_button_rect))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=button.center, button=1))
+
+        start = time.perf_counter()
+        for event in pygame.event.get():
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                game.handle_click(event.pos)
+        game.game_renderer.render()
+        samples.append(time.perf_counter() - start)
+    metrics["click_to_frame_ms"] = percentile_ms(samples)
+
+def best_rate(run_once, count):
+    # run_once() 가 count 번의 작업을 할 때 반복 중 가장 높은 초당 처리량
+    best = None
+    for _ in range(RULES_REPEATS):
+        start = time.perf_counter()
+        run_once()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best
+
+def bench_rules(metrics):
+    rng = engine.MatchRandom(0)
+    magazine = engine.Magazine()
+
+    def reload_magazines():
+        for _ in range(RULES_SAMPLES):
+            magazine.reload(rng.magazine)
+    metrics["magazine_reload_per_s"] = best_rate(reload_magazines, RULES_SAMPLES)
+
+    # 가득 찬 탄창 복사본에서 한 발씩 (복사는 측정 밖)
+    full_magazines = []
+    for _ in range(RULES_SAMPLES):
+        magazine.reload(rng.magazine)
+        full_magazines.append(magazine)
+        magazine = magazine.copy()
+    batches = [[m.copy() for m in full_magazines] for _ in range(RULES_REPEATS)]
+
+    def draw_magazines():
+        for magazine in batches.pop():
+            magazine.draw(rng.magazine)
+    metrics["magazine_draw_per_s"] = best_rate(draw_magazines, RULES_SAMPLES)
+
+    # 무작위 액션으로 끝까지 진행하는 판
+    def play_matches():
+        policy_rng = random.Random(0)
+        for index in range(MATCH_SAMPLES):
+            match_rng = engine.MatchRandom(index)
+            state = engine.new_match(match_rng)
+            while not state.game_over:
+                engine.apply_action(state, policy_rng.choice(engine.legal_actions(state)), match_rng)
+    metrics["match_per_s"] = best_rate(play_matches, MATCH_SAMPLES)
+
+    # 학습용 벡터 환경의 무작위 액션 step (env-step 단위)
+    import numpy as np
+    import vecenv
+
+    env = vecenv.VectorEnv(ENV_COUNT, 0)
+    env_rng = np.random.default_rng(0)
+    env.reset()
+
+    def step_envs():
+        for _ in range(ENV_STEPS):
+            env.step(vecenv.sample_actions(env.masks, env_rng))
+    metrics["env_step_per_s"] = best_rate(step_envs, ENV_COUNT * ENV_STEPS)
+
+def run(startup=True):
+    """모든 항목을 측정해 {이름: 값} 반환"""
+    import main as game
+
+    metrics = {}
+    rng = random.Random(0)
+    game.REPLAY_PATH = None
+    # 사운드 재생 로그와 자원 통계 출력은 측정 결과와 섞이지 않게 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        if startup:
+            bench_startup(game, metrics)
+        game.init()
+        game.init_game()
+        bench_frames(game, metrics, rng)
+        bench_click(game, metrics, rng)
+        close_game(game)
+    bench_rules(metrics)
+    return metrics
+
+def compare(metrics, baseline, tolerance=TOLERANCE):
+    """(이름, 기준값, 현재값, 변화율, 느려졌는지) 목록, 변화율은 양수가 나빠진 방향"""
+    rows = []
+    for name, value in metrics.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if name.endswith("_per_s"):
+            change = base / value - 1 if value else float("inf")
+            regressed = change > tolerance
+        else:
+            change = value / base - 1 if base else 0.0
+            regressed = change > tolerance and value - base > NOISE_FLOOR_MS
+        rows.append((name, base, value, change, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless benchmark suite.")
+    parser.add_argument("-o", "--output", help="save results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--skip-startup", action="store_true", help="skip the slow startup runs")
+    args = parser.parse_args()
+
+    metrics = run(startup=not args.skip_startup)
+    for name, value in metrics.items():
+        print(f"  {name:>26}: {value:12.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "metrics": metrics,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpus": os.cpu_count(),
+                },
+                f,
+                indent=2,
+            )
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["metrics"]
+        regressions = 0
+        for name, base, value, change, regressed in compare(metrics, baseline, args.tolerance):
+            mark = "REGRESSION" if regressed else "ok"
+            print(f"  {name:>26}: {base:12.3f} -> {value:12.3f} ({change:+.1%} worse) {mark}")
+            regressions += regressed
+        if regressions:
+            print(f"{regressions} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+import math
+import random
+from enum import IntEnum
+
+# pygame 에 의존하지 않는 순수 게임 규칙 엔진
+# 화면/사운드 없이 한 판의 전체 상태를 보관하고 step(state, action) 으로 진행한다.
+
+# --- 상수 정의 ---
+
+# 게임 설정
+INITIAL_LIVES = 5
+NB_SLOTS = 8
+MIN_ROUNDS = 2  # 재장전 시 최소 장탄 수
+
+# 아이템 발동 확률
+SCARECROW_CHANCE = 0.3
+GRENADE_CHANCE = 0.5
+SYRINGE_CHANCE = 0.7
+RESPAWN_CHANCE = 0.5  # 재장전 시 허수아비/수류탄/주사기 재활성화 확률
+
+# 피해량
+DAMAGE = 1
+ENHANCED_DAMAGE = 2  # bullet 카드 효과 적용 시
+
+# --- 열거형 정의 ---
+
+class Item(IntEnum):
+    BULLET = 0
+    SCARECROW = 1
+    SYRINGE = 2
+    GRENADE = 3
+
+NB_ITEMS = len(Item)
+
+class Action(IntEnum):
+    SHOOT_SELF = 0
+    SHOOT_OPPONENT = 1
+    USE_BULLET = 2
+    USE_SCARECROW = 3
+    USE_SYRINGE = 4
+    USE_GRENADE = 5
+    RELOAD = 6
+
+NB_ACTIONS = len(Action)
+
+class Event(IntEnum):
+    # GUI 가 사운드/로그를 재생할 수 있도록 step 이 돌려주는 사건
+    BLANK = 0
+    LIVE = 1
+    ENHANCED_LIVE = 2
+    BLOCKED = 3  # 허수아비가 실탄을 막음
+    BULLET_CARD = 4
+    SCARECROW_CARD = 5
+    SCARECROW_FAILED = 6
+    SYRINGE_HEAL = 7
+    SYRINGE_FAILED = 8
+    GRENADE = 9
+    GRENADE_FAILED = 10
+    RELOAD = 11
+    GAME_OVER = 12
+    DRAW = 13
+
+# 탄창 비트마스크 조회 테이블 (NB_SLOTS 비트 이내)
+_FULL_MASKS = [(1 << n) - 1 for n in range(NB_SLOTS + 1)]
+# _ARRANGEMENTS[n][k]: 길이 n 탄창에서 실탄 k 발의 가능한 모든 배치
+_ARRANGEMENTS = [
+    [[m for m in range(1 << n) if bin(m).count("1") == k] for k in range(n + 1)]
+    for n in range(NB_SLOTS + 1)
+]
+# _SELECT[mask][r]: mask 에서 r 번째로 켜진 비트의 위치
+_SELECT = [[i for i in range(NB_SLOTS) if mask >> i & 1] for mask in range(1 << NB_SLOTS)]
+
+# 판 상태 키 비트 배치 (pack_state), 플레이어별 항목은 Player 1 이 아래쪽 절반
+# 기본 규칙에서 42 비트라 64 비트 정수 하나에 들어간다 (치환표, 테이블베이스, 네트워크, 기록용 키).
+LIVES_BITS = INITIAL_LIVES.bit_length()  # 플레이어당
+KEY_LIVES = 0
+KEY_MAGAZINE = KEY_LIVES + 2 * LIVES_BITS  # 탄창 비트 (NB_SLOTS 비트)
+KEY_LENGTH = KEY_MAGAZINE + NB_SLOTS  # 탄창 길이
+KEY_ITEMS = KEY_LENGTH + NB_SLOTS.bit_length()  # 플레이어당 NB_ITEMS 비트, Item 순서
+KEY_USED = KEY_ITEMS + 2 * NB_ITEMS
+KEY_ENHANCED = KEY_USED + 2 * NB_ITEMS  # 플레이어당 1 비트
+KEY_PROTECTED = KEY_ENHANCED + 2
+KEY_ITEM_USED = KEY_PROTECTED + 2
+KEY_PLAYER = KEY_ITEM_USED + 1
+KEY_WINNER = KEY_PLAYER + 1  # 2 비트: 0 진행 중, 1 무승부, 2 Player 1 승리, 3 Player 2 승리
+STATE_KEY_BITS = KEY_WINNER + 2
+
+_LIVES_MASK = (1 << LIVES_BITS) - 1
+_LENGTH_MASK = (1 << NB_SLOTS.bit_length()) - 1
+# 플레이어를 바꿀 때 두 절반을 맞바꾸는 항목: (위치, 절반의 비트 수)
+_PLAYER_FIELDS = (
+    (KEY_LIVES, LIVES_BITS),
+    (KEY_ITEMS, NB_ITEMS),
+    (KEY_USED, NB_ITEMS),
+    (KEY_ENHANCED, 1),
+    (KEY_PROTECTED, 1),
+)
+# 같은 폭의 항목끼리 묶은 (Player 1 절반들의 마스크, 폭)
+_SWAP_GROUPS = tuple(
+    (sum(((1 << width) - 1) << shift for shift, bits in _PLAYER_FIELDS if bits == width), width)
+    for width in sorted({bits for _, bits in _PLAYER_FIELDS})
+)
+_SHARED_MASK = (1 << KEY_ITEM_USED + 1) - 1 & ~sum(  # 탄창, 이번 턴 아이템 사용
+    ((1 << 2 * bits) - 1) << shift for shift, bits in _PLAYER_FIELDS
+)
+_WINNER_CODES = {None: 0, -1: 1, 0: 2, 1: 3}
+_WINNERS = (None, -1, 0, 1)
+
+# --- 클래스 ---
+
+class Magazine:
+    # 탄창: i 번째 비트가 1 이면 i 번째 칸이 실탄, 0 이면 공포탄
+    __slots__ = ("bits", "length", "nb_live")
+
+    def __init__(self, bits=0, length=0):
+        self.bits = bits
+        self.length = length
+        self.nb_live = bin(bits).count("1")
+
+    @classmethod
+    def from_list(cls, rounds):
+        bits = 0
+        for i, bullet_type in enumerate(rounds):
+            bits |= bullet_type << i
+        return cls(bits, len(rounds))
+
+    @property
+    def nb_blank(self):
+        return self.length - self.nb_live
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        # 화면 표시 순서대로 총알 종류 (1: 실탄, 0: 공포탄)
+        bits = self.bits
+        for i in range(self.length):
+            yield bits >> i & 1
+
+    def __repr__(self):
+        return f"Magazine({''.join(str(b) for b in self)!r})"
+
+    def copy(self):
+        other = Magazine.__new__(Magazine)
+        other.bits = self.bits
+        other.length = self.length
+        other.nb_live = self.nb_live
+        return other
+
+    def reload(self, rng=random):
+        """총알을 재장전"""
+        magazine_capacity = rng.randint(MIN_ROUNDS, NB_SLOTS)
+        if magazine_capacity == 2:
+            nb_live_bullets = 1
+        else:
+            nb_live_bullets = rng.uniform(
+                magazine_capacity / 4, float(magazine_capacity // 2)
+            )
+        ceil_nb_live_bullets = math.ceil(nb_live_bullets)
+
+        # 섞인 탄창: 같은 실탄 수의 배치 중 하나를 균등하게 선택
+        self.bits = rng.choice(_ARRANGEMENTS[magazine_capacity][ceil_nb_live_bullets])
+        self.length = magazine_capacity
+        self.nb_live = ceil_nb_live_bullets
+
+    def draw(self, rng=random):
+        """한 발을 꺼내 반환 (실탄/공포탄이 모두 있으면 50% 확률로 종류 선택)"""
+        nb_live = self.nb_live
+        if nb_live and nb_live < self.length:
+            bullet_type = 1 if rng.random() < 0.5 else 0
+        else:
+            bullet_type = 1 if nb_live else 0
+
+        # 선택된 종류 중 무작위 위치의 총알 제거 후 뒤쪽 비트를 한 칸 당김
+        bits = self.bits
+        if bullet_type:
+            index = _SELECT[bits][rng.randrange(nb_live)]
+            self.nb_live = nb_live - 1
+        else:
+            index = _SELECT[~bits & _FULL_MASKS[self.length]][rng.randrange(self.length - nb_live)]
+        self.bits = (bits & _FULL_MASKS[index]) | (bits >> (index + 1) << index)
+        self.length -= 1
+        return bullet_type
+
+class MatchState:
+    # 한 판의 전체 상태 (생명력, 탄창, 아이템, 턴 플래그, 버프)
+    __slots__ = (
+        "lives",
+        "magazine",
+        "items",
+        "used",
+        "bullet_enhanced",
+        "scarecrow_protected",
+        "item_used_this_turn",
+        "current_player",
+        "winner",
+    )
+
+    def __init__(self):
+        self.lives = [INITIAL_LIVES, INITIAL_LIVES]
+        self.magazine = Magazine()
+        self.items = [[False] * NB_ITEMS, [False] * NB_ITEMS]  # 플레이어별 카드 활성화 여부
+        self.used = [[False] * NB_ITEMS, [False] * NB_ITEMS]  # 플레이어별 카드 턴당 사용 여부
+        self.bullet_enhanced = [False, False]
+        self.scarecrow_protected = [False, False]
+        self.item_used_this_turn = False
+        self.current_player = 0
+        self.winner = None  # None: 진행 중, -1: 무승부, 0/1: 승리한 플레이어
+
+    @property
+    def game_over(self):
+        return self.winner is not None
+
+    def copy(self):
+        other = MatchState.__new__(MatchState)
+        other.lives = self.lives[:]
+        other.magazine = self.magazine.copy()
+        other.items = [self.items[0][:], self.items[1][:]]
+        other.used = [self.used[0][:], self.used[1][:]]
+        other.bullet_enhanced = self.bullet_enhanced[:]
+        other.scarecrow_protected = self.scarecrow_protected[:]
+        other.item_used_this_turn = self.item_used_this_turn
+        other.current_player = self.current_player
+        other.winner = self.winner
+        return other
+
+class MatchRandom:
+    # 한 판의 난수를 하위 시스템별 스트림으로 나눔 (탄창, 아이템 재활성화, 아이템 발동)
+    # 판 시드 하나로 모든 스트림이 정해지고, 한 스트림의 호출 수가 바뀌어도 다른 스트림은 그대로다.
+    # 문자열 시드는 해시를 거치므로 시드가 이웃한 판끼리도 스트림이 상관되지 않는다.
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.magazine = random.Random(f"{seed}:magazine")
+        self.respawn = random.Random(f"{seed}:respawn")
+        self.activation = random.Random(f"{seed}:activation")
+
+# --- 함수 ---
+
+def reload_distribution():
+    """Magazine.reload 결과의 정확한 분포: [((실탄 수, 공포탄 수), 확률), ...]"""
+    nb_capacities = NB_SLOTS - MIN_ROUNDS + 1
+    distribution = {}
+    for magazine_capacity in range(MIN_ROUNDS, NB_SLOTS + 1):
+        if magazine_capacity == 2:
+            live_odds = {1: 1.0}
+        else:
+            # ceil(uniform(a, b)) == k 일 확률은 (k - 1, k] 구간과 [a, b] 가 겹치는 길이의 비율
+            low, high = magazine_capacity / 4, float(magazine_capacity // 2)
+            live_odds = {}
+            for k in range(math.ceil(low), math.ceil(high) + 1):
+                overlap = min(high, k) - max(low, k - 1)
+                if overlap > 0:
+                    live_odds[k] = overlap / (high - low)
+        for nb_live, p in live_odds.items():
+            counts = (nb_live, magazine_capacity - nb_live)
+            distribution[counts] = distribution.get(counts, 0.0) + p / nb_capacities
+    return sorted(distribution.items())
+
+def streams(rng):
+    """(탄창, 재활성화, 발동) 난수 생성기, MatchRandom 이 아니면 셋 다 rng"""
+    if isinstance(rng, MatchRandom):
+        return rng.magazine, rng.respawn, rng.activation
+    return rng, rng, rng
+
+def new_match(rng=random):
+    # "Play" 클릭 시와 같은 초기 상태 생성
+    magazine_rng, respawn_rng, _ = streams(rng)
+    state = MatchState()
+    state.magazine.reload(magazine_rng)
+    for player in range(2):
+        items = state.items[player]
+        items[Item.SCARECROW] = respawn_rng.random() < RESPAWN_CHANCE
+        items[Item.BULLET] = True
+        items[Item.GRENADE] = respawn_rng.random() < RESPAWN_CHANCE
+        items[Item.SYRINGE] = True
+    return state
+
+def is_legal(state, action):
+    # 현재 플레이어가 해당 액션을 할 수 있는지 확인
+    if state.winner is not None:
+        return False
+    if action == Action.SHOOT_SELF or action == Action.SHOOT_OPPONENT:
+        return state.magazine.length > 0
+    if action == Action.RELOAD:
+        return state.magazine.length == 0
+    item = action - Action.USE_BULLET
+    player = state.current_player
+    return (
+        state.items[player][item]
+        and not state.used[player][item]
+        and not state.item_used_this_turn
+    )
+
+def legal_actions(state):
+    return [action for action in Action if is_legal(state, action)]
+
+def check_game_over(state):
+    # 게임 종료 조건 확인 후 승자 기록
+    lives = state.lives
+    if lives[0] <= 0 and lives[1] <= 0:
+        state.winner = -1  # 무승부
+    elif lives[0] <= 0:
+        state.winner = 1  # Player 2 승리
+    elif lives[1] <= 0:
+        state.winner = 0  # Player 1 승리
+    return state.winner is not None
+
+def end_turn(state):
+    # 턴을 넘기고 턴당 사용 여부 초기화
+    state.current_player = 1 - state.current_player
+    state.item_used_this_turn = False
+    for used in state.used:
+        for item in range(NB_ITEMS):
+            used[item] = False
+
+def _shoot(state, target_self, rng, events):
+    current_player = state.current_player
+    target_player = current_player if target_self else 1 - current_player
+    bullet_type = state.magazine.draw(rng)
+
+    # 피해량 계산 (bullet 효과는 공포탄이어도 소모됨)
+    enhanced = state.bullet_enhanced[current_player]
+    damage = ENHANCED_DAMAGE if enhanced else DAMAGE
+    state.bullet_enhanced[current_player] = False
+
+    if bullet_type == 1:
+        if state.scarecrow_protected[target_player]:
+            state.scarecrow_protected[target_player] = False
+            events.append(Event.BLOCKED)
+        else:
+            state.lives[target_player] = max(0, state.lives[target_player] - damage)
+            events.append(Event.ENHANCED_LIVE if enhanced else Event.LIVE)
+    else:
+        events.append(Event.BLANK)
+
+    # "Shoot Self" 로 공포탄을 쏜 경우에만 턴 유지
+    if bullet_type == 1 or not target_self:
+        end_turn(state)
+    state.item_used_this_turn = False
+
+def _use_item(state, item, rng, events):
+    player = state.current_player
+    items = state.items[player]
+    state.used[player][item] = True
+    state.item_used_this_turn = True
+
+    if item == Item.BULLET:
+        items[item] = False
+        state.bullet_enhanced[player] = True
+        events.append(Event.BULLET_CARD)
+    elif item == Item.SCARECROW:
+        items[item] = False
+        if rng.random() < SCARECROW_CHANCE:
+            state.scarecrow_protected[player] = True
+            events.append(Event.SCARECROW_CARD)
+        else:
+            events.append(Event.SCARECROW_FAILED)
+    elif item == Item.SYRINGE:
+        if rng.random() < SYRINGE_CHANCE:
+            # 생명력이 가득 찬 경우 카드는 남고 턴당 사용만 소모됨
+            if state.lives[player] < INITIAL_LIVES:
+                state.lives[player] += 1
+                items[item] = False
+                events.append(Event.SYRINGE_HEAL)
+        else:
+            items[item] = False
+            events.append(Event.SYRINGE_FAILED)
+    else:
+        items[item] = False
+        if rng.random() < GRENADE_CHANCE:
+            for i in range(2):
+                state.lives[i] = max(0, state.lives[i] - 1)
+            events.append(Event.GRENADE)
+        else:
+            events.append(Event.GRENADE_FAILED)
+        # 수류탄은 사용 즉시 턴 종료
+        end_turn(state)
+
+def _reload(state, magazine_rng, respawn_rng, events):
+    state.magazine.reload(magazine_rng)
+    for player in range(2):
+        items = state.items[player]
+        # 허수아비 효과로 보호 중인 플레이어의 허수아비는 재활성화하지 않음
+        if not state.scarecrow_protected[player]:
+            items[Item.SCARECROW] = respawn_rng.random() < RESPAWN_CHANCE
+        items[Item.BULLET] = True
+        items[Item.GRENADE] = respawn_rng.random() < RESPAWN_CHANCE
+        items[Item.SYRINGE] = respawn_rng.random() < RESPAWN_CHANCE
+        for item in range(NB_ITEMS):
+            state.used[player][item] = False
+    state.item_used_this_turn = False
+    events.append(Event.RELOAD)
+
+def apply_action(state, action, rng=random):
+    """state 를 직접 수정하며 액션 적용 후 발생한 이벤트 목록 반환"""
+    if not is_legal(state, action):
+        raise ValueError(f"Illegal action {action!r} for player {state.current_player + 1}")
+
+    magazine_rng, respawn_rng, activation_rng = streams(rng)
+    events = []
+    if action == Action.SHOOT_SELF:
+        _shoot(state, True, magazine_rng, events)
+    elif action == Action.SHOOT_OPPONENT:
+        _shoot(state, False, magazine_rng, events)
+    elif action == Action.RELOAD:
+        _reload(state, magazine_rng, respawn_rng, events)
+    else:
+        _use_item(state, Item(action - Action.USE_BULLET), activation_rng, events)
+
+    if check_game_over(state):
+        events.append(Event.DRAW if state.winner == -1 else Event.GAME_OVER)
+    return events
+
+def pack_state(state):
+    """판 전체 상태를 STATE_KEY_BITS 비트 정수 하나로 (같은 상태면 같은 키, unpack_state 로 복원)"""
+    magazine = state.magazine
+    lives = state.lives
+    items0, items1 = state.items
+    used0, used1 = state.used
+    enhanced = state.bullet_enhanced
+    protected = state.scarecrow_protected
+    return (
+        lives[0] << KEY_LIVES
+        | lives[1] << KEY_LIVES + LIVES_BITS
+        | magazine.bits << KEY_MAGAZINE
+        | magazine.length << KEY_LENGTH
+        | (items0[0] | items0[1] << 1 | items0[2] << 2 | items0[3] << 3) << KEY_ITEMS
+        | (items1[0] | items1[1] << 1 | items1[2] << 2 | items1[3] << 3) << KEY_ITEMS + NB_ITEMS
+        | (used0[0] | used0[1] << 1 | used0[2] << 2 | used0[3] << 3) << KEY_USED
+        | (used1[0] | used1[1] << 1 | used1[2] << 2 | used1[3] << 3) << KEY_USED + NB_ITEMS
+        | (enhanced[0] | enhanced[1] << 1) << KEY_ENHANCED
+        | (protected[0] | protected[1] << 1) << KEY_PROTECTED
+        | state.item_used_this_turn << KEY_ITEM_USED
+        | state.current_player << KEY_PLAYER
+        | _WINNER_CODES[state.winner] << KEY_WINNER
+    )
+
+def unpack_state(key):
+    """pack_state 의 키에서 MatchState 복원"""
+    state = MatchState.__new__(MatchState)
+    state.lives = [key >> KEY_LIVES & _LIVES_MASK, key >> KEY_LIVES + LIVES_BITS & _LIVES_MASK]
+    state.magazine = Magazine(key >> KEY_MAGAZINE & _FULL_MASKS[NB_SLOTS], key >> KEY_LENGTH & _LENGTH_MASK)
+    state.items = [
+        [bool(key >> KEY_ITEMS + player * NB_ITEMS + item & 1) for item in range(NB_ITEMS)]
+        for player in range(2)
+    ]
+    state.used = [
+        [bool(key >> KEY_USED + player * NB_ITEMS + item & 1) for item in range(NB_ITEMS)]
+        for player in range(2)
+    ]
+    state.bullet_enhanced = [bool(key >> KEY_ENHANCED & 1), bool(key >> KEY_ENHANCED + 1 & 1)]
+    state.scarecrow_protected = [bool(key >> KEY_PROTECTED & 1), bool(key >> KEY_PROTECTED + 1 & 1)]
+    state.item_used_this_turn = bool(key >> KEY_ITEM_USED & 1)
+    state.current_player = key >> KEY_PLAYER & 1
+    state.winner = _WINNERS[key >> KEY_WINNER & 3]
+    return state
+
+def swap_state_key(key):
+    """두 플레이어를 맞바꾼 상태의 키 (규칙이 대칭이므로 두 상태의 결과도 플레이어만 바뀜)"""
+    swapped = key & _SHARED_MASK
+    for mask, width in _SWAP_GROUPS:
+        swapped |= (key & mask) << width | key >> width & mask
+    winner = key >> KEY_WINNER & 3
+    if winner >= 2:
+        winner ^= 1  # Player 1 승리 <-> Player 2 승리
+    return swapped | (key >> KEY_PLAYER & 1 ^ 1) << KEY_PLAYER | winner << KEY_WINNER
+
+def canonical_state_key(state):
+    """현재 플레이어를 Player 1 자리로 옮긴 키 (대칭인 두 상태가 같은 키를 가짐)"""
+    key = pack_state(state)
+    return swap_state_key(key) if state.current_player else key
+
+def step(state, action, rng=random):
+    """state 를 바꾸지 않고 (다음 상태, 이벤트 목록) 반환"""
+    next_state = state.copy()
+    events = apply_action(next_state, action, rng)
+    return next_state, events
@@ -0,0 +1,482 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+import engine
+from engine import Event
+from netplay import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    LISTEN_BACKLOG,
+    MAX_LINE,
+    Connection,
+    NetplayClient,
+    NetplayServer,
+    Table,
+    encode,
+    snapshot,
+)
+from profiler import RingBuffer
+from replay import ReplayWriter
+
+# 한 이벤트 루프에서 수천 개의 판을 동시에 진행하는 게임 서버 (여러 키오스크가 한 서버에 접속)
+# 프로토콜은 netplay 와 같고, 여기에 판별 시간 제한과 상태 조회용 HTTP 엔드포인트를 더한다.
+#
+# 판마다 서버 시드 수열에서 뽑은 시드로 자기 MatchRandom 을 가지므로, 다른 판의 진행 순서와 무관하게
+# 판 시드와 액션 순서만으로 판을 다시 만들 수 있다 (replay_path 를 주면 끝난 판을 리플레이 로그에 기록).
+# 메모리 비용: MatchRandom 은 Mersenne Twister 세 개라 판마다 약 8.8KB 이고, 판 하나는 모두 약 10KB 다
+# (서버 전체가 난수 하나를 공유하던 때는 약 1KB). 더 작은 생성기를 쓰면 화면 게임과 replay.py 가 쓰는
+# engine.MatchRandom 과 스트림이 달라져 기록한 판을 그대로 다시 만들 수 없으므로 이 비용을 택했다.
+# 로그에는 이벤트 루프에서 버퍼에만 쓰고, 디스크 동기화는 SWEEP_INTERVAL 마다 작업 스레드에서 모아서 한다.
+# 델타 계산용 직전 상태 스냅샷은 액션을 처리하는 동안만 만든다.
+#
+# 시간 제한은 판마다 시각 하나로 관리하고, 한 작업이 SWEEP_INTERVAL 마다 모든 판을 훑어 처리한다.
+#   진행 중인 판 : 차례인 플레이어가 turn_timeout 안에 액션을 보내지 않으면 기권패
+#   그 외의 판   : (상대를 기다리는 판, 끝났는데 연결이 남은 판) idle_timeout 동안 변화가 없으면 닫음
+#                  {"type": "closed", "reason": "idle"} 을 보내고 연결을 끊는다.
+#
+# 관전 (spectator 포트): 접속해서 {"watch": 판 번호} 한 줄을 보내면
+#   {"type": "watching", "table": 번호}, 전체 상태, 이후 델타를 받는다 (플레이어와 같은 형식).
+#   관전자용 델타는 SPECTATE_TICK 동안 모아 하나로 합치고, 한 번만 인코딩해 모든 관전자에게 보낸다.
+#   송신 큐가 넘친 관전자는 쌓인 델타 대신 전체 상태 하나를 받고 (건너뛰기),
+#   큐를 한 번도 비우지 못한 채 계속 밀리면 연결을 끊는다 (잠깐씩 밀리는 관전자는 따라잡을 때마다 다시 셈).
+#   느린 관전자 때문에 판이 기다리는 일은 없다.
+#
+# GET /metrics (metrics 포트) 는 판 수, 초당 액션 수, 이벤트 루프 지연 등을 JSON 으로,
+# GET /tables 는 진행 중인 판 목록을 돌려준다.
+
+# --- 상수 정의 ---
+
+DEFAULT_METRICS_PORT = 8766
+DEFAULT_SPECTATOR_PORT = 8767
+TURN_TIMEOUT = 60.0  # 초, 차례인 플레이어의 제한 시간
+IDLE_TIMEOUT = 300.0  # 초, 진행 중이 아닌 판을 닫기까지의 시간
+SWEEP_INTERVAL = 1.0  # 초, 시간 초과 판을 찾는 간격
+RATE_WINDOW = 10  # 초당 액션 수를 계산하는 구간 (SWEEP_INTERVAL 단위)
+LAG_INTERVAL = 0.1  # 초, 이벤트 루프 지연 측정 간격
+LAG_SAMPLES = 600  # 보관하는 최근 지연 측정 수 (1분)
+SPECTATE_TICK = 0.1  # 초, 관전자에게 모은 델타를 보내는 간격
+SPECTATOR_QUEUE_SIZE = 16  # 관전자마다 아직 보내지 못한 메시지 최대 수
+SPECTATOR_MAX_RESYNCS = 8  # 큐를 비우지 못한 채 이보다 많이 넘친 관전자는 연결을 끊음
+
+# --- 클래스 ---
+
+class HostTable(Table):
+    # 서버 여러 판용 판: 스냅샷은 보관하지 않고 리플레이용 액션 순서를 기록
+    __slots__ = ("deadline", "spectators", "pending", "actions")
+
+    def __init__(self, table_id, seed):
+        self.id = table_id
+        self.rng = engine.MatchRandom(seed)
+        self.state = engine.new_match(self.rng)
+        self.players = [None, None]
+        self.seq = 0
+        self.snapshot = None
+        self.actions = bytearray()  # 적용한 액션 순서 (리플레이 로그에 기록하면 None)
+        self.deadline = None  # 시간 초과 시각 (time.monotonic)
+        self.spectators = None  # 관전자 Connection 집합 (처음 관전자가 올 때 만듦)
+        self.pending = None  # 관전자에게 아직 보내지 않은, 합친 델타
+
+    def state_message(self):
+        return encode({"type": "state", "seq": self.seq, "state": snapshot(self.state)})
+
+    def act(self, player, action):
+        # 직전 상태와 비교할 동안만 스냅샷을 둠
+        self.snapshot = snapshot(self.state)
+        try:
+            message = super().act(player, action)
+        finally:
+            self.snapshot = None
+        self.actions.append(int(action))
+        return message
+
+    def forfeit(self, player):
+        """player 가 시간 초과로 진 결과의 델타 메시지 반환"""
+        self.state.winner = 1 - player
+        self.seq += 1
+        return {
+            "type": "delta",
+            "seq": self.seq,
+            "events": [int(Event.GAME_OVER)],
+            "changes": {"winner": self.state.winner},
+            "timeout": player,
+        }
+
+    def coalesce(self, message):
+        # 델타를 관전자용 대기 델타에 합침 (사건은 이어 붙이고 바뀐 항목은 마지막 값으로)
+        if self.pending is None:
+            self.pending = {"type": "delta", "seq": message["seq"], "events": [], "changes": {}}
+        self.pending["seq"] = message["seq"]
+        self.pending["events"] += message["events"]
+        self.pending["changes"].update(message["changes"])
+
+class GameHost(NetplayServer):
+    def __init__(
+        self,
+        host=DEFAULT_HOST,
+        port=DEFAULT_PORT,
+        metrics_port=DEFAULT_METRICS_PORT,
+        turn_timeout=TURN_TIMEOUT,
+        idle_timeout=IDLE_TIMEOUT,
+        seed=None,
+        spectator_port=DEFAULT_SPECTATOR_PORT,
+        replay_path=None,
+    ):
+        super().__init__(host, port)
+        self.metrics_port = metrics_port
+        self.metrics_server = None
+        self.spectator_port = spectator_port
+        self.spectator_server = None
+        self.turn_timeout = turn_timeout
+        self.idle_timeout = idle_timeout
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.seeds = random.Random(seed)  # 판 시드 수열
+        self.replay_log = ReplayWriter(replay_path) if replay_path else None
+        self.recorded = 0  # 리플레이 로그에 기록한 판 수
+        self.replay_unsynced = False  # 마지막 동기화 뒤에 기록한 판이 있는지
+        self.replay_sync = None  # 진행 중인 동기화 (작업 스레드의 future)
+        self.actions = 0
+        self.turn_timeouts = 0
+        self.evictions = 0
+        self.action_counts = deque(maxlen=RATE_WINDOW + 1)  # (시각, 누적 액션 수)
+        self.loop_lag = RingBuffer(LAG_SAMPLES)  # 초
+        self.dirty = set()  # 관전자에게 보낼 델타가 쌓인 판
+        self.spectator_updates = 0  # 관전자에게 보낸 합친 델타 수 (관전자 수와 무관)
+        self.spectator_drops = 0
+        self.spectator_handlers = set()  # 관전자 연결 처리 작업
+        self.tasks = []
+
+    async def start(self):
+        await super().start()
+        self.metrics_server = await asyncio.start_server(self._serve_metrics, self.host, self.metrics_port)
+        self.metrics_port = self.metrics_server.sockets[0].getsockname()[1]
+        self.spectator_server = await asyncio.start_server(
+            self._handle_spectator, self.host, self.spectator_port, limit=MAX_LINE, backlog=LISTEN_BACKLOG
+        )
+        self.spectator_port = self.spectator_server.sockets[0].getsockname()[1]
+        self.tasks = [
+            asyncio.ensure_future(self._sweep_loop()),
+            asyncio.ensure_future(self._lag_loop()),
+            asyncio.ensure_future(self._spectate_loop()),
+        ]
+        return self
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        for server in (self.metrics_server, self.spectator_server):
+            server.close()
+            await server.wait_closed()
+        for table in self.tables.values():
+            for spectator in table.spectators or ():
+                spectator.abort()
+        if self.spectator_handlers:
+            await asyncio.wait(list(self.spectator_handlers), timeout=2.0)
+        await super().close()
+        if self.replay_log is not None:
+            for table in list(self.tables.values()):
+                self.record(table)
+            if self.replay_sync is not None:
+                await self.replay_sync
+            await asyncio.get_running_loop().run_in_executor(None, self.replay_log.sync)
+            self.replay_log.close()
+
+    def touch(self, table, now=None):
+        # 판의 다음 시간 초과 시각: 진행 중이면 차례 제한 시간, 아니면 유휴 제한 시간
+        if now is None:
+            now = time.monotonic()
+        playing = table.full and not table.state.game_over
+        table.deadline = now + (self.turn_timeout if playing else self.idle_timeout)
+
+    def sweep(self, now):
+        # 시간이 지난 판 처리: 진행 중이면 차례인 플레이어 기권패, 아니면 판을 닫음
+        expired = [table for table in self.tables.values() if table.deadline <= now]
+        for table in expired:
+            if table.full and not table.state.game_over:
+                self.publish(table, table.forfeit(table.state.current_player))
+                self.record(table)
+                self.turn_timeouts += 1
+                self.touch(table, now)
+            else:
+                self.evict(table, "idle")
+        self.action_counts.append((now, self.actions))
+
+    def evict(self, table, reason):
+        del self.tables[table.id]
+        if self.waiting is table:
+            self.waiting = None
+        message = {"type": "closed", "reason": reason}
+        table.broadcast(message)
+        for connection in table.players:
+            if connection is not None:
+                asyncio.ensure_future(connection.close())
+        self.end_spectating(table, message)
+        self.record(table)
+        self.evictions += 1
+
+    def record(self, table):
+        # 판 시드와 액션 순서를 리플레이 로그에 한 번만 기록 (시작하지 않은 판은 제외)
+        # 시간 초과 기권이나 연결 종료로 끝난 판은 로그에서 끝나지 않은 판으로 보인다.
+        if self.replay_log is None or not table.actions:
+            return
+        self.replay_log.begin(table.rng.seed)
+        for action in table.actions:
+            self.replay_log.record(action)
+        self.replay_log.end(sync=False)
+        table.actions = None
+        self.recorded += 1
+        self.replay_unsynced = True
+
+    def sync_replay(self):
+        # 쌓인 판 기록을 작업 스레드에서 디스크에 동기화 (이전 동기화가 진행 중이면 다음 번에)
+        if not self.replay_unsynced or (self.replay_sync is not None and not self.replay_sync.done()):
+            return
+        self.replay_unsynced = False
+        self.replay_sync = asyncio.get_running_loop().run_in_executor(None, self.replay_log.sync)
+
+    def publish(self, table, message):
+        # 플레이어에게는 바로, 관전자에게는 다음 틱에 합쳐서 보냄
+        table.broadcast(message)
+        if table.spectators:
+            table.coalesce(message)
+            self.dirty.add(table)
+
+    def flush(self, table):
+        # 합친 델타를 한 번 인코딩해 모든 관전자에게 보냄, 계속 밀리는 관전자는 끊음
+        self.dirty.discard(table)
+        message, table.pending = table.pending, None
+        if message is None or not table.spectators:
+            return
+        data = encode(message)
+        resync = []
+
+        def full_state():
+            # 큐가 넘친 관전자가 여럿이어도 전체 상태는 한 번만 인코딩
+            if not resync:
+                resync.append(table.state_message())
+            return resync[0]
+
+        for spectator in list(table.spectators):
+            spectator.send(data, full_state)
+            if spectator.resyncs > SPECTATOR_MAX_RESYNCS:
+                table.spectators.discard(spectator)
+                spectator.abort()
+                self.spectator_drops += 1
+        self.spectator_updates += 1
+
+    def end_spectating(self, table, message):
+        # 판이 닫힐 때 남은 델타와 마지막 메시지를 보내고 관전자 연결을 닫음
+        if not table.spectators:
+            return
+        self.flush(table)
+        data = encode(message)
+        for spectator in table.spectators:
+            # 큐가 가득 찬 관전자도 밀린 메시지 대신 마지막 메시지는 받음
+            spectator.send(data, lambda: data)
+            asyncio.ensure_future(spectator.close())
+        table.spectators = None
+
+    def metrics(self):
+        """서버 상태 (GET /metrics 응답)"""
+        playing = sum(1 for table in self.tables.values() if table.full and not table.state.game_over)
+        spectators = sum(len(table.spectators) for table in self.tables.values() if table.spectators)
+        actions_per_s = 0.0
+        if len(self.action_counts) > 1:
+            (start, start_count), (end, end_count) = self.action_counts[0], self.action_counts[-1]
+            actions_per_s = (end_count - start_count) / (end - start)
+        lag = sorted(self.loop_lag.samples())
+        last = len(lag) - 1
+        return {
+            "seed": self.seed,
+            "tables": len(self.tables),
+            "playing": playing,
+            "connections": len(self.connections),
+            "spectators": spectators,
+            "actions_total": self.actions,
+            "actions_per_s": round(actions_per_s, 1),
+            "loop_lag_p50_ms": round(lag[last // 2] * 1000, 3) if lag else 0.0,
+            "loop_lag_p99_ms": round(lag[last * 99 // 100] * 1000, 3) if lag else 0.0,
+            "loop_lag_max_ms": round(lag[last] * 1000, 3) if lag else 0.0,
+            "turn_timeouts": self.turn_timeouts,
+            "evictions": self.evictions,
+            "spectator_updates": self.spectator_updates,
+            "spectator_drops": self.spectator_drops,
+            "recorded_matches": self.recorded,
+        }
+
+    def table_list(self):
+        """진행 중인 판 목록 (GET /tables 응답)"""
+        return [
+            {
+                "table": table.id,
+                "seed": table.rng.seed,
+                "seq": table.seq,
+                "winner": table.state.winner,
+                "spectators": len(table.spectators) if table.spectators else 0,
+            }
+            for table in self.tables.values()
+            if table.full
+        ]
+
+    def _new_table(self):
+        table = HostTable(self.next_table_id, self.seeds.getrandbits(63))
+        self.next_table_id += 1
+        self.touch(table)
+        return table
+
+    def _seat(self, connection):
+        table, player = super()._seat(connection)
+        self.touch(table)  # 두 번째 플레이어가 앉으면 차례 제한 시간 시작
+        return table, player
+
+    def _act(self, table, player, action):
+        self.publish(table, table.act(player, action))
+        self.actions += 1
+        self.touch(table)
+        if table.state.game_over:
+            self.record(table)
+
+    def _leave(self, table, player):
+        closing = table.id in self.tables
+        super()._leave(table, player)
+        if closing:
+            self.end_spectating(table, {"type": "left", "player": player})
+            self.record(table)
+
+    async def _handle_spectator(self, reader, writer):
+        connection = Connection(writer, SPECTATOR_QUEUE_SIZE)
+        self.spectator_handlers.add(asyncio.current_task())
+        table = None
+        try:
+            request = json.loads(await reader.readline())
+            table = self.tables.get(request["watch"])
+            if table is None:
+                connection.send(encode({"type": "error", "message": "No such table"}))
+                return
+            # 먼저 모인 델타를 기존 관전자에게 보낸 뒤 전체 상태로 시작
+            self.flush(table)
+            if table.spectators is None:
+                table.spectators = set()
+            table.spectators.add(connection)
+            connection.send(encode({"type": "watching", "table": table.id}))
+            connection.send(table.state_message())
+            # 관전자가 보내는 것은 무시하고 연결이 끊길 때까지 기다림
+            while await reader.readline():
+                pass
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError, KeyError, TypeError):
+            pass
+        finally:
+            if table is not None and table.spectators:
+                table.spectators.discard(connection)
+            self.spectator_handlers.discard(asyncio.current_task())
+            await connection.close()
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.sweep(time.monotonic())
+            self.sync_replay()
+
+    async def _lag_loop(self):
+        # 잠든 시간이 요청한 시간을 넘은 만큼이 다른 작업이 루프를 붙잡은 시간
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.loop_lag.append(max(0.0, time.perf_counter() - start - LAG_INTERVAL))
+
+    async def _spectate_loop(self):
+        while True:
+            await asyncio.sleep(SPECTATE_TICK)
+            for table in list(self.dirty):
+                self.flush(table)
+
+    async def _serve_metrics(self, reader, writer):
+        # 요청 한 번에 응답 하나를 보내고 연결을 닫는 최소한의 HTTP
+        try:
+            request = (await reader.readline()).split()
+            while (await reader.readline()).strip():
+                pass
+            path = request[1] if len(request) > 1 and request[0] == b"GET" else None
+            if path == b"/metrics":
+                status, body = "200 OK", json.dumps(self.metrics()).encode() + b"\n"
+            elif path == b"/tables":
+                status, body = "200 OK", json.dumps(self.table_list()).encode() + b"\n"
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+# --- 함수 ---
+
+async def serve(args):
+    host = await GameHost(
+        args.host,
+        args.port,
+        args.metrics_port,
+        args.turn_timeout,
+        args.idle_timeout,
+        args.seed,
+        args.spectator_port,
+        args.replay,
+    ).start()
+    print(f"Serving on {args.host}:{host.port}, spectators on port {host.spectator_port}")
+    print(f"Metrics on http://{args.host}:{host.metrics_port}/metrics")
+    print(f"Seed {host.seed}")
+    try:
+        async with host.server:
+            await host.server.serve_forever()
+    finally:
+        await host.close()
+
+async def watch(table_id, host=DEFAULT_HOST, port=DEFAULT_SPECTATOR_PORT):
+    # 판 하나를 관전하며 받은 사건을 출력
+    client = await NetplayClient().connect(host, port)
+    client.writer.write(encode({"watch": table_id}))
+    try:
+        while True:
+            message = await client.recv()
+            if message is None:
+                return
+            if message["type"] == "delta":
+                names = ", ".join(Event(event).name for event in message["events"])
+                print(f"[{message['seq']}] {names} lives={client.snapshot['lives']}")
+            elif message["type"] != "state":
+                print(message)
+    finally:
+        await client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many netplay tables on one event loop.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--metrics-port", type=int, default=DEFAULT_METRICS_PORT)
+    parser.add_argument("--spectator-port", type=int, default=DEFAULT_SPECTATOR_PORT)
+    parser.add_argument("--turn-timeout", type=float, default=TURN_TIMEOUT, help="seconds per turn")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before closing idle tables")
+    parser.add_argument("--seed", type=int, default=None, help="server seed (table seeds are drawn from it)")
+    parser.add_argument("--replay", default=None, help="append finished hosted matches to this replay log")
+    parser.add_argument("--watch", type=int, default=None, help="watch this table instead of serving")
+    args = parser.parse_args()
+
+    try:
+        if args.watch is not None:
+            asyncio.run(watch(args.watch, args.host, args.spectator_port))
+        else:
+            asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
 import pygame
-import random
-import math
 import os
 from enum import Enum
 
+import engine
+from engine import Action, Event, Item
+from tablebase import Tablebase
+from ai import AIPlayer
+from assets import AssetRegistry, TextCache
+from renderer import DirtyRenderer, StaticLayers
+from router import InputRouter
+from replay import ReplayWriter
+from profiler import FrameProfiler
+from netplay import RemoteMatch
+
 # --- 상수 정의 ---
 
 # 색상
@@ -35,6 +44,9 @@ SCARECROW_IMAGE_PATH = os.path.join(IMAGE_DIR, "scarecrow.png")
 SYRINGE_IMAGE_PATH = os.path.join(IMAGE_DIR, "syringe.png")
 BULLET_ENHANCE_IMAGE_PATH = os.path.join(IMAGE_DIR, "bullet.png")
 
+# 미리 구운 자원 묶음 (python assets.py 로 생성, 없으면 원본 파일에서 불러옴)
+ASSET_BUNDLE_PATH = "assets.bundle"
+
 # 사운드 경로
 SOUND_DIR = "sounds"
 REAL_BULLET_SOUND_PATH = os.path.join(SOUND_DIR, "real_bullet.wav")
@@ -50,14 +62,87 @@ SCARECROW_SOUND_PATH = os.path.join(SOUND_DIR, "scarecrow.wav")
 GAME_OVER_SOUND_PATH = os.path.join(SOUND_DIR, "game_over.wav")
 DRAW_SOUND_PATH = os.path.join(SOUND_DIR, "draw.wav")
 
-# 게임 설정
-INITIAL_LIVES = 5
-NB_SLOTS = 8
+# 테이블베이스 경로 (python tablebase.py 로 생성, 없으면 힌트 비활성화)
+TABLEBASE_PATH = "tablebase.bin"
+
+# 컴퓨터 Player 2 정책 (테이블베이스가 없으면 AI_FALLBACK_POLICY 사용)
+AI_POLICY = "tablebase"
+AI_FALLBACK_POLICY = "mcts"
+
+# 힌트에 표시할 액션 이름
+ACTION_LABELS = {
+    Action.SHOOT_SELF: "Shoot Self",
+    Action.SHOOT_OPPONENT: "Shoot Opponent",
+    Action.USE_BULLET: "Bullet",
+    Action.USE_SCARECROW: "Scarecrow",
+    Action.USE_SYRINGE: "Syringe",
+    Action.USE_GRENADE: "Grenade",
+    Action.RELOAD: "Reload (R)",
+}
 
 # 아이템 카드 크기
 ITEM_WIDTH = 165
 ITEM_HEIGHT = 214
 
+# 아이템 카드 위치 좌표
+# Player 1
+SCARECROW1_POS = (55, 125)  # Player1 - 오른쪽 위
+BULLET1_POS = (225, 125)  # Player1 - 왼쪽 위
+SYRINGE1_POS = (225, 350)  # Player1 - 왼쪽 아래
+GRENADE1_POS = (55, 350)  # Player1 - 오른쪽 아래
+
+# Player 2
+SCARECROW2_POS = (1040, 125)  # Player2 - 왼쪽 위
+BULLET2_POS = (870, 125) # Player2 - 오른쪽 위
+SYRINGE2_POS = (870, 350)  # Player2 - 오른쪽 아래
+GRENADE2_POS = (1040, 350)  # Player2 - 왼쪽 아래
+
+# 버튼 위치 및 크기 설정
+BUTTON_WIDTH = WINDOW_WIDTH * 0.15
+BUTTON_HEIGHT = WINDOW_HEIGHT * 0.08
+BUTTON_MARGIN = WINDOW_WIDTH * 0.015
+shoot_self_button_rect = pygame.Rect(
+    WINDOW_WIDTH // 2 - BUTTON_WIDTH - BUTTON_MARGIN // 2,
+    WINDOW_HEIGHT - BUTTON_HEIGHT - 110,
+    BUTTON_WIDTH,
+    BUTTON_HEIGHT,
+)
+shoot_opponent_button_rect = pygame.Rect(
+    WINDOW_WIDTH // 2 + BUTTON_MARGIN // 2,
+    WINDOW_HEIGHT - BUTTON_HEIGHT - 110,
+    BUTTON_WIDTH,
+    BUTTON_HEIGHT,
+)
+
+# 온라인 대전 서버 (python netplay.py serve 로 실행)
+NETPLAY_HOST = "127.0.0.1"
+NETPLAY_PORT = 8765
+NETPLAY_EVENT = pygame.event.custom_type()  # 서버 메시지가 오면 입력 대기 중인 메인 루프를 깨움
+
+# 판 기록 파일 (None 이면 기록하지 않음)
+REPLAY_PATH = "replays.bin"
+
+# 단계별 프레임 시간 측정 (F3: 측정 시작 및 오버레이 표시, F4: 내보내기)
+PROFILE_FRAMES = False  # True 면 시작부터 측정
+PROFILE_CSV_PATH = "profile.csv"
+PROFILE_TRACE_PATH = "profile_trace.json"
+PROFILE_OVERLAY_ROWS = 15
+PROFILE_OVERLAY_REFRESH = 30  # 프레임, 오버레이 수치 갱신 간격
+
+# 프레임 속도 제한 (0 이면 제한 없음)
+TARGET_FPS = 60
+# 움직이는 것이 없을 때 입력을 기다리는 최대 시간 (ms)
+IDLE_TIMEOUT_MS = 500
+
+# 상태가 바뀔 때만 다시 그리는 화면 영역
+MAGAZINE_AREA = pygame.Rect(WINDOW_WIDTH // 2 - 130, WINDOW_HEIGHT - 250, 260, 60)
+LIVES_AREA = pygame.Rect(WINDOW_WIDTH // 2 - 150, 125, 300, 75)
+HEADER_AREA = pygame.Rect(0, 25, WINDOW_WIDTH, 40)  # 턴 표시 및 힌트
+STATUS1_AREA = pygame.Rect(45, WINDOW_HEIGHT - 85, 250, 55)
+STATUS2_AREA = pygame.Rect(WINDOW_WIDTH - 295, WINDOW_HEIGHT - 85, 250, 55)
+LOADING_AREA = pygame.Rect(45, WINDOW_HEIGHT - 75, WINDOW_WIDTH - 90, 55)
+PROFILE_AREA = pygame.Rect(WINDOW_WIDTH // 2 - 230, 195, 460, 270)
+
 # --- 열거형 정의 ---
 
 class MenuState(Enum):
@@ -70,120 +155,18 @@ class GameState(Enum):
 # --- 클래스 ---
 
 class Weapon:
-    def __init__(self, player_lives):
-        # 샷건 이미지 로드 및 크기 조정
-        try:
-            self.shotgun = pygame.image.load(SHOTGUN_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load shotgun image: {e}")
-            self.shotgun = pygame.Surface((340, 100), pygame.SRCALPHA)  # 크기 확대
-        self.shotgun = pygame.transform.scale(self.shotgun, (340, 100))  # 크기 확대
-
-        # 공포탄 이미지 로드
-        try:
-            self.blank = pygame.image.load(BLANK_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load blank bullet image: {e}")
-            self.blank = pygame.Surface((35, 18), pygame.SRCALPHA)
-        self.blank = pygame.transform.scale(self.blank, (40, 23))
-        self.blank = pygame.transform.rotate(self.blank, -90)
-
-        # 실탄 이미지 로드
-        try:
-            self.live = pygame.image.load(LIVE_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load live bullet image: {e}")
-            self.live = pygame.Surface((35, 18), pygame.SRCALPHA)
-        self.live = pygame.transform.scale(self.live, (40, 23))
-        self.live = pygame.transform.rotate(self.live, -90)
+    def __init__(self):
+        # 샷건 이미지 (크기 확대)
+        self.shotgun = assets.image(SHOTGUN_IMAGE_PATH, (340, 100))
+
+        # 공포탄/실탄 이미지
+        self.blank = assets.image(BLANK_IMAGE_PATH, (40, 23), rotation=-90)
+        self.live = assets.image(LIVE_IMAGE_PATH, (40, 23), rotation=-90)
 
         # 사운드 로드
-        try:
-            self.real_bullet_sound = pygame.mixer.Sound(REAL_BULLET_SOUND_PATH)
-            self.fake_bullet_sound = pygame.mixer.Sound(FAKE_BULLET_SOUND_PATH)
-            self.bullet_enhanced_sound = pygame.mixer.Sound(
-                BULLET_ENHANCED_SOUND_PATH
-            )  # bullet.wav 사운드 추가
-        except pygame.error as e:
-            print(f"Failed to load bullet sound: {e}")
-            self.real_bullet_sound = None
-            self.fake_bullet_sound = None
-            self.bullet_enhanced_sound = None
-
-        self.player_lives = player_lives
-        self.magazine = []
-        self.blanks = []  # 공포탄 인덱스 저장
-        self.lives = []  # 실탄 인덱스 저장
-
-    def reload(self):
-        """총알을 재장전"""
-        if not self.magazine or 0 in self.player_lives:
-            self.magazine = []
-            self.blanks = []
-            self.lives = []
-            magazine_capacity = random.randint(2, 8)
-            if magazine_capacity == 2:
-                nb_live_bullets = 1
-            else:
-                nb_live_bullets = random.uniform(
-                    magazine_capacity / 4, float(magazine_capacity // 2)
-                )
-            ceil_nb_live_bullets = math.ceil(nb_live_bullets)
-
-            # 실탄과 공포탄을 분리하여 리스트에 추가
-            for i in range(ceil_nb_live_bullets):
-                self.magazine.append(1)
-                self.lives.append(len(self.magazine) - 1)
-            for i in range(magazine_capacity - ceil_nb_live_bullets):
-                self.magazine.append(0)
-                self.blanks.append(len(self.magazine) - 1)
-
-            random.shuffle(self.magazine)  # 섞인 탄창
-
-            # 섞인 탄창을 기반으로 실탄과 공포탄 인덱스 업데이트
-            self.blanks = [i for i, x in enumerate(self.magazine) if x == 0]
-            self.lives = [i for i, x in enumerate(self.magazine) if x == 1]
-
-    def shoot(self, bullet_enhanced, current_player, scarecrow_protected, target_player):
-        """총알 발사 및 사운드 재생"""
-        if self.magazine:
-            if len(self.blanks) > 0 and len(self.lives) > 0:  # 실탄과 공포탄이 모두 있는 경우
-                if random.choice([True, False]):  # 무작위로 실탄 또는 공포탄 선택
-                    index = random.choice(self.lives)
-                else:
-                    index = random.choice(self.blanks)
-            elif len(self.lives) > 0:  # 실탄만 있는 경우
-                index = random.choice(self.lives)
-            else:  # 공포탄만 있는 경우
-                index = random.choice(self.blanks)
-
-            bullet_type = self.magazine.pop(index)
-
-            # 실탄 및 공포탄 인덱스 업데이트
-            self.blanks = [i for i in self.blanks if i < index] + [
-                i - 1 for i in self.blanks if i > index
-            ]
-            self.lives = [i for i in self.lives if i < index] + [
-                i - 1 for i in self.lives if i > index
-            ]
-
-            # 사운드 재생
-            if bullet_type == 1:
-                if not scarecrow_protected[target_player]:  # scarecrow가 비활성화 된 경우에만 실탄 사운드 재생
-                    if bullet_enhanced[current_player]:
-                        # bullet 카드 효과가 적용된 실탄일 경우 bullet.wav 재생
-                        if self.bullet_enhanced_sound:
-                            self.bullet_enhanced_sound.play()
-                    elif self.real_bullet_sound:
-                        # 일반 실탄일 경우 real_bullet.wav 재생
-                        self.real_bullet_sound.play()
-            elif bullet_type == 0 and self.fake_bullet_sound:
-                # 공포탄일 경우 fake_bullet.wav 재생
-                self.fake_bullet_sound.play()
-
-            return bullet_type
-        else:
-            return None
+        self.real_bullet_sound = assets.sound(REAL_BULLET_SOUND_PATH)
+        self.fake_bullet_sound = assets.sound(FAKE_BULLET_SOUND_PATH)
+        self.bullet_enhanced_sound = assets.sound(BULLET_ENHANCED_SOUND_PATH)  # bullet.wav 사운드 추가
 
     @staticmethod
     def display_bullet(window, pos_x, color):
@@ -211,16 +194,16 @@ class Weapon:
         # 샷건 이미지 표시
         window.blit(self.shotgun, (WINDOW_WIDTH // 2 - 170, WINDOW_HEIGHT // 2 - 50))
 
-    def display_magazine(self, window):
+    def display_magazine(self, window, magazine):
         # 화면에 현재 탄창 상태를 중앙에 렌더링 (박스 포함)
         bullets_margin = 15
         bullet_width = 15
         total_bullets_width = (
-            len(self.magazine) * (bullet_width + bullets_margin) - bullets_margin
+            len(magazine) * (bullet_width + bullets_margin) - bullets_margin
         )
         start_pos_x = (WINDOW_WIDTH - total_bullets_width) // 2
 
-        for i, bullet_type in enumerate(self.magazine):
+        for i, bullet_type in enumerate(magazine):
             pos_x = start_pos_x + i * (bullet_width + bullets_margin)
             if bullet_type == 0:
                 self.display_bullet(window, pos_x, WHITE)
@@ -229,77 +212,31 @@ class Weapon:
 
 class Syringe:
     def __init__(self, position):
-        # 주사기 이미지 로드
-        try:
-            self.image = pygame.image.load(SYRINGE_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load syringe image: {e}")
-            self.image = pygame.Surface((50, 50), pygame.SRCALPHA)
-        self.image = pygame.transform.scale(self.image, (ITEM_WIDTH, ITEM_HEIGHT))
+        # 주사기 이미지와 사운드 (자원 캐시에서 공유)
+        self.image = assets.image(SYRINGE_IMAGE_PATH, (ITEM_WIDTH, ITEM_HEIGHT))
         self.rect = self.image.get_rect(topleft=position)
         self.active = False
-        self.used_this_turn = False  # 턴당 사용 여부 추적 변수 추가
-
-        # 사운드 로드
-        try:
-            self.sound = pygame.mixer.Sound(SYRINGE_SOUND_PATH)
-        except pygame.error as e:
-            print(f"Failed to load syringe sound: {e}")
-            self.sound = None
-
-    def heal(self, player_lives, player_index):
-        # 플레이어의 생명력을 1 회복
-        if player_lives[player_index] < INITIAL_LIVES:
-            player_lives[player_index] += 1
-            self.active = False
-            if self.sound:
-                self.sound.play()
+        self.sound = assets.sound(SYRINGE_SOUND_PATH)
 
     def display_syringe(self, window):
         # 지정된 위치에 주사기 표시
-        if not self.active:
-            return
         if self.active:
             window.blit(self.image, self.rect.topleft)
 
-    def reactivate(self):
-        # 50% 확률로 주사기를 재활성화
-        self.active = random.choice([True, False])  # 수정: 50%로 다시 변경
-
     def is_clicked(self, mouse_pos):
         # 주사기가 클릭되었는지 확인
         return self.active and self.rect.collidepoint(mouse_pos)
 
 class Bullet:
-    def __init__(self, position, size=(50, 69)):
-        # 총알 이미지 로드
-        try:
-            self.image = pygame.image.load(BULLET_ENHANCE_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load bullet image: {e}")
-            self.image = pygame.Surface(size, pygame.SRCALPHA)
-        self.image = pygame.transform.scale(self.image, (ITEM_WIDTH, ITEM_HEIGHT))
+    def __init__(self, position, size=(ITEM_WIDTH, ITEM_HEIGHT)):
+        # 총알 카드 이미지와 사운드 (자원 캐시에서 공유)
+        self.image = assets.image(BULLET_ENHANCE_IMAGE_PATH, size)
         self.rect = self.image.get_rect(topleft=position)
         self.active = True
-        self.used_this_turn = False  # 턴당 사용 여부 추적 변수 추가
-
-        # 사운드 로드
-        try:
-            self.sound = pygame.mixer.Sound(BULLET_CARD_SOUND_PATH)  # bullet_card.wav 로드
-        except pygame.error as e:
-            print(f"Failed to load bullet card sound: {e}")
-            self.sound = None
-
-    def enhance(self):
-        # 총알 아이템을 사용하여 플레이어의 다음 공격을 강화하고 아이템 비활성화
-        self.active = False
-        if self.sound:
-            self.sound.play()  # bullet_card.wav 재생
+        self.sound = assets.sound(BULLET_CARD_SOUND_PATH)  # bullet_card.wav
 
     def draw(self, window):
         # 아이템 그리기
-        if not self.active:
-            return
         if self.active:
             window.blit(self.image, self.rect.topleft)
 
@@ -307,68 +244,25 @@ class Bullet:
         # 총알 아이템이 클릭되었는지 확인
         return self.active and self.rect.collidepoint(mouse_pos)
 
-    def reactivate(self):
-        # 총알 아이템 상태 재설정
-        self.active = True
-
 class Game:
     def __init__(self):
         self.game_state = GameState.PLAYING
-        # 테이블 이미지 로드
-        try:
-            self.table = pygame.image.load(TABLE_IMAGE_PATH).convert_alpha()
-            self.table_image = pygame.transform.scale(
-                self.table, (WINDOW_WIDTH, WINDOW_HEIGHT)
-            )
-        except pygame.error as e:
-            print(f"Failed to load table image: {e}")
-            self.table = pygame.Surface((860, 320), pygame.SRCALPHA)
-
-        # 흐릿한 배경 이미지 로드
-        try:
-            self.blur_background = pygame.image.load(
-                BLUR_BACKGROUND_IMAGE_PATH
-            ).convert()
-            self.blur_background = pygame.transform.scale(
-                self.blur_background, (WINDOW_WIDTH, WINDOW_HEIGHT)
-            )
-        except pygame.error as e:
-            print(f"Failed to load blur background image: {e}")
-            self.blur_background = pygame.Surface(
-                (WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA
-            )
-            self.blur_background.fill(BLACK)  # 실패 시 검은색으로 채움
-
-    def display_table(self, window):
-        # 게임 테이블 그리기
-        if self.game_state == GameState.PLAYING:
-            window.blit(self.table_image, (0, 0))
+
+        # 흐릿한 배경 이미지 (실패 시 검은색으로 채움)
+        self.blur_background = assets.image(
+            BLUR_BACKGROUND_IMAGE_PATH, (WINDOW_WIDTH, WINDOW_HEIGHT), alpha=False, fill=BLACK
+        )
 
 class Grenade:
     def __init__(self, position, size=(ITEM_WIDTH, ITEM_HEIGHT)):
-        # 수류탄 이미지 로드
-        try:
-            self.image = pygame.image.load(GRENADE_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load grenade image: {e}")
-            self.image = pygame.Surface(size, pygame.SRCALPHA)
-            self.image.fill(RED)
-        self.image = pygame.transform.scale(self.image, size)
+        # 수류탄 이미지 (실패 시 빨간색) 와 사운드
+        self.image = assets.image(GRENADE_IMAGE_PATH, size, fill=RED)
         self.rect = self.image.get_rect(topleft=position)
         self.active = False
-        self.used_this_turn = False  # 턴당 사용 여부 추적 변수 추가
-
-        # 사운드 로드
-        try:
-            self.sound = pygame.mixer.Sound(GRENADE_SOUND_PATH)
-        except pygame.error as e:
-            print(f"Failed to load grenade sound: {e}")
-            self.sound = None
+        self.sound = assets.sound(GRENADE_SOUND_PATH)
 
     def draw(self, window):
         # 수류탄 그리기
-        if not self.active:
-            return
         if self.active:
             window.blit(self.image, self.rect.topleft)
 
@@ -376,32 +270,10 @@ class Grenade:
         # 수류탄 클릭 여부 확인
         return self.active and self.rect.collidepoint(pos)
 
-    def use(self, player_lives):
-        # 수류탄 사용 처리
-        self.active = False
-        for i in range(len(player_lives)):
-            player_lives[i] = max(0, player_lives[i] - 1)
-        print("Grenade used: All players' HP decreased by 1.")
-        if self.sound:
-            self.sound.play()
-
-    def reactivate(self):
-        # 수류탄 아이템 재활성화
-        self.active = random.choice([True, False])
-
 class Card:
     def __init__(self):
-        # 테이블 이미지 로드
-        try:
-            self.table_image = pygame.image.load(TABLE_IMAGE_PATH).convert_alpha()
-            self.table_image = pygame.transform.scale(
-                self.table_image, (WINDOW_WIDTH, WINDOW_HEIGHT)
-            )
-        except pygame.error as e:
-            print(f"Failed to load table image: {e}")
-            self.table_image = pygame.Surface(
-                (WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA
-            )
+        # 테이블 이미지
+        self.table_image = assets.image(TABLE_IMAGE_PATH, (WINDOW_WIDTH, WINDOW_HEIGHT))
 
     def draw_table(self, window):
         # 게임 테이블 그리기
@@ -413,66 +285,34 @@ class Menu:
 
     @staticmethod
     def is_hovered(rect):
-        # 마우스가 버튼 위에 있는지 확인
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        return rect.collidepoint(mouse_x, mouse_y)
+        # 마우스가 버튼 위에 있는지 확인 (프레임마다 현재 화면의 라우터가 한 번 조회한 결과)
+        return router.is_hovered(rect)
 
-    def show_main_menu(self, window, play_text_rect, quit_text_rect):
+    def show_main_menu(self, window, play_text_rect, ai_text_rect, online_text_rect, quit_text_rect):
         # 메인 메뉴 표시
         # 메뉴 텍스트 그리기
         # 텍스트를 그릴 때, 텍스트의 get_rect() 함수를 써서 그리는 대신, rect 인자를 직접 사용
-
-        # 텍스트 위치 계산
-        play_text_x = WINDOW_WIDTH // 15 - play_text_rect.width // 4  # 중앙 정렬
-        quit_text_x = WINDOW_WIDTH // 15 - quit_text_rect.width // 4  # 중앙 정렬
-
-        # "Play" 텍스트 렌더링 및 위치 조정
-        if self.is_hovered(play_text_rect):
-            window.blit(
-                menu_font.render("Play", True, RED),
-                (play_text_x, play_text_rect.y),
-            )
-        else:
-            window.blit(
-                menu_font.render("Play", True, WHITE),
-                (play_text_x, play_text_rect.y),
-            )
-
-        # "Quit" 텍스트 렌더링 및 위치 조정
-        if self.is_hovered(quit_text_rect):
-            window.blit(
-                menu_font.render("Quit", True, RED),
-                (quit_text_x, quit_text_rect.y),
-            )
-        else:
-            window.blit(
-                menu_font.render("Quit", True, WHITE),
-                (quit_text_x, quit_text_rect.y),
-            )
+        for label, rect in (
+            ("Play", play_text_rect),
+            ("Play vs AI", ai_text_rect),
+            ("Play Online", online_text_rect),
+            ("Quit", quit_text_rect),
+        ):
+            # 텍스트 위치 계산 후 마우스 오버 시 빨간색으로 렌더링
+            text_x = WINDOW_WIDTH // 15 - rect.width // 4  # 중앙 정렬
+            color = RED if self.is_hovered(rect) else WHITE
+            window.blit(render_menu_text(label, color), (text_x, rect.y))
 
 class Scarecrow:
     def __init__(self, position, size=(ITEM_WIDTH, ITEM_HEIGHT)):
         self.position = position
         self.size = size
-        # 허수아비 이미지 로드
-        try:
-            self.image = pygame.image.load(SCARECROW_IMAGE_PATH).convert_alpha()
-        except pygame.error as e:
-            print(f"Failed to load Scarecrow image: {e}")
-            self.image = pygame.Surface(self.size, pygame.SRCALPHA)
-        self.image = pygame.transform.scale(self.image, self.size)
+        # 허수아비 이미지와 사운드 (자원 캐시에서 공유)
+        self.image = assets.image(SCARECROW_IMAGE_PATH, self.size)
         self.rect = self.image.get_rect(topleft=self.position)
         self.active = False
-        self.used_this_turn = False  # 턴당 사용 여부 추적 변수 추가
-
-        # 사운드 로드
-        try:
-            self.sound = pygame.mixer.Sound(SCARECROW_CARD_SOUND_PATH)
-            self.scarecrow_sound = pygame.mixer.Sound(SCARECROW_SOUND_PATH)
-        except pygame.error as e:
-            print(f"Failed to load scarecrow sound: {e}")
-            self.sound = None
-            self.scarecrow_sound = None
+        self.sound = assets.sound(SCARECROW_CARD_SOUND_PATH)
+        self.scarecrow_sound = assets.sound(SCARECROW_SOUND_PATH)
 
     def draw(self, screen):
         # 화면에 아이템 그리기
@@ -483,31 +323,20 @@ class Scarecrow:
         # 아이템 클릭 여부 확인
         return self.active and self.rect.collidepoint(mouse_pos)
 
-    def apply_effect(self):
-        # 허수아비 아이템 효과 적용
-        self.active = False
-        if self.sound:
-            self.sound.play()
-        print("Scarecrow activated!")
-
-    def reactivate(self, new_position=None):
-        # 아이템 재활성화 및 선택적으로 위치 변경
-        if new_position:
-            self.position = new_position
-            self.rect.topleft = self.position
-        self.active = random.choice([True, False])
-
 # --- 함수 ---
 
+def render_menu_text(text, color):
+    # 메뉴 폰트(굵은 기본 폰트)로 렌더링한 문자열 (캐시 공유)
+    return texts.render(text, color, MENU_FONT_SIZE, bold=BOLD_FONT, name=FONT_NAME, system=False)
+
 def display_lives(window, lives):
     # 두 플레이어의 생명력을 화면 중앙에 표시
-    life_font = pygame.font.SysFont(FONT_NAME, 36)
     window_rect = window.get_rect()
     text_y = window_rect.centery - 215
 
     for i, life in enumerate(lives):
         text = f"Player {i+1} HP: {life}"
-        text_surface = life_font.render(text, True, WHITE)
+        text_surface = texts.render(text, WHITE, 36, name=FONT_NAME)
         text_rect = text_surface.get_rect(center=(window_rect.centerx, text_y))
         window.blit(text_surface, text_rect)
         text_y += 35
@@ -515,20 +344,17 @@ def display_lives(window, lives):
 # display_turn 함수 정의
 def display_turn(window, current_player):
     # 현재 플레이어 턴 표시
-    turn_font = pygame.font.SysFont(FONT_NAME, 36)
     if current_player == 0:
-        turn_text = turn_font.render("Player 1 Turn", True, RED)
+        turn_text = texts.render("Player 1 Turn", RED, 36, name=FONT_NAME)
         turn_text_rect = turn_text.get_rect(topleft=(50, 30))
     else:
-        turn_text = turn_font.render("Player 2 Turn", True, RED)
+        turn_text = texts.render("Player 2 Turn", RED, 36, name=FONT_NAME)
         turn_text_rect = turn_text.get_rect(topright=(WINDOW_WIDTH - 50, 30))
 
     window.blit(turn_text, turn_text_rect)
 
 def display_status_effects(window, bullet_enhanced, scarecrow_protected):
     # 각 플레이어의 Bullet 및 Scarecrow 효과 활성화 상태를 텍스트로 표시
-    font = pygame.font.SysFont(FONT_NAME, 25)
-
     # Player 1 상태 텍스트
     player1_bullet_text = "Bullet: " + ("ON" if bullet_enhanced[0] else "OFF")
     player1_scarecrow_text = "Scarecrow: " + ("ON" if scarecrow_protected[0] else "OFF")
@@ -538,10 +364,10 @@ def display_status_effects(window, bullet_enhanced, scarecrow_protected):
     player2_scarecrow_text = "Scarecrow: " + ("ON" if scarecrow_protected[1] else "OFF")
 
     # 텍스트 Surface 생성
-    player1_bullet_surface = font.render(player1_bullet_text, True, WHITE)
-    player1_scarecrow_surface = font.render(player1_scarecrow_text, True, WHITE)
-    player2_bullet_surface = font.render(player2_bullet_text, True, WHITE)
-    player2_scarecrow_surface = font.render(player2_scarecrow_text, True, WHITE)
+    player1_bullet_surface = texts.render(player1_bullet_text, WHITE, 25, name=FONT_NAME)
+    player1_scarecrow_surface = texts.render(player1_scarecrow_text, WHITE, 25, name=FONT_NAME)
+    player2_bullet_surface = texts.render(player2_bullet_text, WHITE, 25, name=FONT_NAME)
+    player2_scarecrow_surface = texts.render(player2_scarecrow_text, WHITE, 25, name=FONT_NAME)
 
     # 텍스트 위치 설정
     player1_bullet_rect = player1_bullet_surface.get_rect(
@@ -563,61 +389,90 @@ def display_status_effects(window, bullet_enhanced, scarecrow_protected):
     window.blit(player2_bullet_surface, player2_bullet_rect)
     window.blit(player2_scarecrow_surface, player2_scarecrow_rect)
 
-def check_game_over(lives):
-    # 게임 종료 조건 확인
-    global game_state
-
-    if lives[0] <= 0 and lives[1] <= 0:
-        game_state = GameState.GAME_OVER
-        if draw_sound:  # 무승부일 때 draw.wav 재생
-            draw_sound.play()
-        return True, -1  # 무승부
-    elif lives[0] <= 0:
-        game_state = GameState.GAME_OVER
-        if game_over_sound:  # 다른 경우에는 game_over.wav 재생
-            game_over_sound.play()
-        return True, 1  # Player 2 승리
-    elif lives[1] <= 0:
-        game_state = GameState.GAME_OVER
-        if game_over_sound:  # 다른 경우에는 game_over.wav 재생
-            game_over_sound.play()
-        return True, 0  # Player 1 승리
-    else:
-        return False, -1  # 게임 진행 중
+def header_signature():
+    # 턴 표시와, 힌트를 보일 때는 힌트가 달라질 수 있는 상태 전체 (압축한 상태 정수)
+    hint = show_hint and tablebase is not None
+    return match.current_player, hint, engine.pack_state(match) if hint else None
+
+def display_hint(window, state):
+    # 테이블베이스에서 찾은 현재 플레이어의 최선의 액션과 승률 표시
+    result = tablebase.probe(state)
+    if result is None:
+        return
+    win, draw, action = result
+    hint_text = f"Hint: {ACTION_LABELS[action]} (win {win:.1%}, draw {draw:.1%})"
+    hint_surface = texts.render(hint_text, WHITE, 30, name=FONT_NAME)
+    hint_rect = hint_surface.get_rect(midtop=(WINDOW_WIDTH // 2, 30))
+    window.blit(hint_surface, hint_rect)
+
+def display_loading_progress(window, done, total):
+    # 메뉴 아래쪽에 자원 로딩 진행 막대 표시
+    bar_rect = pygame.Rect(50, WINDOW_HEIGHT - 40, WINDOW_WIDTH - 100, 12)
+    fill_rect = bar_rect.copy()
+    fill_rect.width = bar_rect.width * done // max(total, 1)
+    pygame.draw.rect(window, WHITE, fill_rect, 0)
+    pygame.draw.rect(window, WHITE, bar_rect, 1)
+    loading_text = texts.render(f"Loading {done}/{total}", WHITE, 24, name=FONT_NAME)
+    window.blit(loading_text, loading_text.get_rect(bottomleft=(bar_rect.x, bar_rect.y - 6)))
+
+def display_profile(window):
+    # 단계별 프레임 시간 p50/p95/p99 (ms) 를 반투명 상자에 표시
+    overlay = pygame.Surface(PROFILE_AREA.size, pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 180))
+    window.blit(overlay, PROFILE_AREA)
+
+    # 단계 이름은 왼쪽, 수치는 열마다 오른쪽 정렬
+    rows = [("phase", "p50", "p95", "p99")] + [
+        (name, f"{p50:.3f}", f"{p95:.3f}", f"{p99:.3f}")
+        for name, count, p50, p95, p99, worst in profiler.summary()[:PROFILE_OVERLAY_ROWS]
+    ]
+    line_y = PROFILE_AREA.y + 8
+    for row in rows:
+        name_surface = texts.render(row[0], WHITE, 18, name=FONT_NAME)
+        window.blit(name_surface, (PROFILE_AREA.x + 10, line_y))
+        for column, text in enumerate(row[1:]):
+            surface = texts.render(text, WHITE, 18, name=FONT_NAME)
+            right = PROFILE_AREA.right - 10 - (2 - column) * 80
+            window.blit(surface, surface.get_rect(topright=(right, line_y)))
+        line_y += 16
+
+def profile_signature():
+    # 오버레이를 켜고 끄거나 수치를 갱신할 때만 다시 그림
+    if not show_profile:
+        return None
+    return profiler.frames // PROFILE_OVERLAY_REFRESH
+
+def export_profile():
+    profiler.write_csv(PROFILE_CSV_PATH)
+    profiler.write_chrome_trace(PROFILE_TRACE_PATH)
+    print(f"Wrote {PROFILE_CSV_PATH} and {PROFILE_TRACE_PATH}")
+
+def game_over_quit_rect():
+    # 게임 종료 화면의 "Quit" 텍스트 위치
+    quit_text = texts.render("Quit", WHITE, FONT_SIZE, bold=BOLD_FONT, name=FONT_NAME, system=False)
+    return quit_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 50))
 
 def draw_game_over(window, winner_index):
     # 게임 종료 화면을 그리고 Quit 버튼을 표시, 마우스 오버 시 Quit 텍스트 색상 변경
-    global quit_text
-
     # 흐릿한 배경 이미지 렌더링
     window.blit(game.blur_background, (0, 0))
 
-    game_over_font = pygame.font.SysFont(FONT_NAME, 72)
-
     # 무승부 처리
     if winner_index == -1:
         winner_text = "Draw!"
     else:
         winner_text = f"Player {winner_index + 1} Wins!"
 
-    game_over_text = game_over_font.render(winner_text, True, WHITE)
-
-    # "Quit" 텍스트를 위한 폰트 설정
-    quit_font = pygame.font.Font(FONT_NAME, FONT_SIZE)
-    if BOLD_FONT:
-        quit_font.set_bold(True)
+    game_over_text = texts.render(winner_text, WHITE, 72, name=FONT_NAME)
 
     # "Quit" 텍스트 렌더링
-    quit_text = quit_font.render("Quit", True, WHITE)
+    quit_text = texts.render("Quit", WHITE, FONT_SIZE, bold=BOLD_FONT, name=FONT_NAME, system=False)
 
-    mouse_pos = pygame.mouse.get_pos()
-    quit_text_rect = quit_text.get_rect(
-        center=(window.get_width() // 2, window.get_height() // 2 + 50)
-    )
+    quit_text_rect = game_over_quit_rect()
 
     # "Quit" 텍스트의 마우스 오버 효과
-    if quit_text_rect.collidepoint(mouse_pos):
-        quit_text = quit_font.render("Quit", True, RED)
+    if menu.is_hovered(quit_text_rect):
+        quit_text = texts.render("Quit", RED, FONT_SIZE, bold=BOLD_FONT, name=FONT_NAME, system=False)
 
     # winner_text와 quit_text를 화면에 그림
     text_x = window.get_width() // 2
@@ -627,6 +482,7 @@ def draw_game_over(window, winner_index):
         (text_x - game_over_text.get_width() // 2, text_y - game_over_text.get_height() // 2),
     )
     window.blit(quit_text, quit_text_rect)
+    return quit_text_rect
 
 def draw_buttons(
     window,
@@ -663,411 +519,389 @@ def draw_buttons(
         shoot_opponent_text_rect,
     )
 
-def handle_bullet_click(mouse_pos, bullets, bullet_enhanced, current_player):
-    # 총알 아이템 클릭 처리
-    global item_used_this_turn
-    for bullet in bullets:
-        if bullet.is_clicked(mouse_pos) and not bullet.used_this_turn and not item_used_this_turn:
-            # 아이템 발동/삭제 여부 결정
-            bullet.enhance()
-            bullet_enhanced[current_player] = True
-            bullet.used_this_turn = True
-            item_used_this_turn = True
-            return True
-    return False
-
-def handle_scarecrow_click(
-    mouse_pos, scarecrow1, scarecrow2, current_player, scarecrow_protected
-):
-    # 허수아비 아이템 클릭 처리
-    global item_used_this_turn
-    if current_player == 0:
-        if scarecrow1.active and scarecrow1.click(mouse_pos) and not scarecrow1.used_this_turn and not item_used_this_turn:
-            if random.random() < 0.3:  # 30% 확률로 발동
-                scarecrow1.apply_effect()
-                scarecrow_protected[0] = True
-            else:
-                print("Scarecrow effect did not activate!")
-                scarecrow1.active = False
-                if card_delete_sound:
-                    card_delete_sound.play()
-            scarecrow1.used_this_turn = True
-            item_used_this_turn = True
-            return True
-    elif current_player == 1:
-        if scarecrow2.active and scarecrow2.click(mouse_pos) and not scarecrow2.used_this_turn and not item_used_this_turn:
-            if random.random() < 0.3:  # 30% 확률로 발동
-                scarecrow2.apply_effect()
-                scarecrow_protected[1] = True
-            else:
-                print("Scarecrow effect did not activate!")
-                scarecrow2.active = False
-                if card_delete_sound:
-                    card_delete_sound.play()
-            scarecrow2.used_this_turn = True
-            item_used_this_turn = True
-            return True
-    return False
-
-def handle_grenade_click(mouse_pos, grenades, player_lives):
-    # 수류탄 아이템 클릭 처리
-    global item_used_this_turn
-    global current_player
-    global game_state
-    global winner_index
-
-    for grenade in grenades:
-        if grenade.is_clicked(mouse_pos) and not grenade.used_this_turn and not item_used_this_turn:
-            if random.random() < 0.5:  # 50% 확률로 발동
-                grenade.use(player_lives)
-                print("Grenade effect activated!")
-            else:
-                grenade.active = False
-                if card_delete_sound:
-                    card_delete_sound.play()
-                print("Grenade effect did not activate!")
-
-            grenade.used_this_turn = True
-            item_used_this_turn = True
-
-            # 즉시 턴 종료 후 게임 종료 여부 확인
-            current_player = (current_player + 1) % 2
-            item_used_this_turn = False
-
-            for bullet in bullets:
-                bullet.used_this_turn = False
-            for g in grenades:
-                g.used_this_turn = False
-            syringe1.used_this_turn = False
-            syringe2.used_this_turn = False
-            scarecrow1.used_this_turn = False
-            scarecrow2.used_this_turn = False
-
-            game_over, winner_index = check_game_over(player_lives)
-            if game_over:
-                game_state = GameState.GAME_OVER
-
-            return True
-    return False
-
-def handle_syringe_click(mouse_pos, syringe, player_lives, player_index):
-    # 주사기 클릭 처리 (card_delete.wav 재생)
-    global item_used_this_turn
-    if syringe.active and syringe.rect.collidepoint(mouse_pos) and not syringe.used_this_turn and not item_used_this_turn:
-        if random.random() < 0.7:  # 70% 확률로 발동
-            syringe.heal(player_lives, player_index)
+def play_sound(sound):
+    if sound:
+        sound.play()
+
+def play_events(events):
+    # 규칙 엔진이 돌려준 이벤트에 맞는 사운드 재생
+    for event in events:
+        if event == Event.BLANK:
+            play_sound(weapon.fake_bullet_sound)
+        elif event == Event.LIVE:
+            play_sound(weapon.real_bullet_sound)
+        elif event == Event.ENHANCED_LIVE:
+            play_sound(weapon.bullet_enhanced_sound)
+        elif event == Event.BLOCKED:
+            play_sound(scarecrow_sound)
+            print("Shot blocked by Scarecrow!")
+        elif event == Event.BULLET_CARD:
+            play_sound(bullets[0].sound)
+        elif event == Event.SCARECROW_CARD:
+            play_sound(scarecrow_card_sound)
+            print("Scarecrow activated!")
+        elif event == Event.SYRINGE_HEAL:
+            play_sound(syringe_sound)
             print("Syringe effect activated!")
-        else:
-            print("Syringe effect did not activate!")
-            syringe.active = False
-            if card_delete_sound:
-                card_delete_sound.play()
-        syringe.used_this_turn = True
-        item_used_this_turn = True
+        elif event == Event.GRENADE:
+            play_sound(grenade_sound)
+            print("Grenade used: All players' HP decreased by 1.")
+        elif event in (Event.SCARECROW_FAILED, Event.SYRINGE_FAILED, Event.GRENADE_FAILED):
+            play_sound(card_delete_sound)
+            print(f"{event.name.split('_')[0].capitalize()} effect did not activate!")
+        elif event == Event.RELOAD:
+            play_sound(card_sound)
+        elif event == Event.GAME_OVER:
+            play_sound(game_over_sound)
+        elif event == Event.DRAW:
+            play_sound(draw_sound)
+
+def sync_cards():
+    # 엔진 상태의 카드 활성화 여부를 화면의 카드에 반영
+    for player in range(2):
+        items = match.items[player]
+        bullets[player].active = items[Item.BULLET]
+        scarecrows[player].active = items[Item.SCARECROW]
+        syringes[player].active = items[Item.SYRINGE]
+        grenades[player].active = items[Item.GRENADE]
+
+def perform(action):
+    # 액션을 엔진에 전달하고 결과 반영 (온라인 대전이면 서버로 보내고 결과는 서버 메시지로 반영)
+    global match
+    if not engine.is_legal(match, action):
+        return False
+    if remote is not None:
+        remote.send(action)
         return True
-
-
-def handle_shoot_action(
-        weapon,
-        current_player,
-        player_lives,
-        bullet_enhanced,
-        scarecrow_protected,
-        target_self,
-):
-    # 발사 액션 처리 및 총알 타입 반환
-    global item_used_this_turn
-    target_player = current_player if target_self else (current_player + 1) % 2
-    bullet_type = weapon.shoot(bullet_enhanced, current_player, scarecrow_protected, target_player)
-
-    if bullet_type is not None:
-        damage = calculate_damage(bullet_enhanced, current_player)
-
-        if bullet_type == 1:
-            apply_damage(target_player, damage, scarecrow_protected, player_lives)
-
-        # 총알 발사 후 턴 변경
-        if not (
-                bullet_type == 0 and target_self
-        ):  # "Shoot Self"를 클릭했고, 데미지를 입지 않은 경우가 아닐 때만 턴을 넘김
-            (current_player + 1) % 2
-        item_used_this_turn = False
-
-        return True, bullet_type
-    return False, None
-
-def handle_shoot_buttons_click(
-    mouse_pos,
-    shoot_self_button_rect,
-    shoot_opponent_button_rect,
-    weapon,
-    current_player,
-    player_lives,
-    bullet_enhanced,
-    scarecrow_protected
-):
-    # 발사 버튼 클릭 처리
-    if shoot_self_button_rect.collidepoint(mouse_pos):
-        return handle_shoot_action(
-            weapon,
-            current_player,
-            player_lives,
-            bullet_enhanced,
-            scarecrow_protected,
-            target_self=True
-        )
-    elif shoot_opponent_button_rect.collidepoint(mouse_pos):
-        return handle_shoot_action(
-            weapon,
-            current_player,
-            player_lives,
-            bullet_enhanced,
-            scarecrow_protected,
-            target_self=False
-        )
-
-    return False, None
-
-def calculate_damage(bullet_enhanced, current_player):
-    # 피해량 계산
-    damage = 1
-    if bullet_enhanced[current_player]:
-        damage *= 2
-        bullet_enhanced[current_player] = False
-    return damage
-
-
-def apply_damage(target_player, damage, scarecrow_protected, player_lives):
-    # 피해 적용
-    global scarecrow1, scarecrow2
-
-    if current_player == 0:
-        scarecrow = scarecrow2
-    else:
-        scarecrow = scarecrow1
-
-    if not scarecrow_protected[target_player]:
-        player_lives[target_player] = max(0, player_lives[target_player] - damage)
-    else:
-        if scarecrow.scarecrow_sound:
-            scarecrow.scarecrow_sound.play()
-        print(f"Player {target_player + 1} is protected by Scarecrow!")
-        scarecrow_protected[target_player] = False
-
-def handle_reload(weapon, syringe1, syringe2, scarecrow1, scarecrow2, bullets, grenades):
-    # 재장전 및 아이템 재활성화 처리
-    global item_used_this_turn
-    if not weapon.magazine:
-        weapon.reload()
-
-        # Scarecrow 카드 처리
-        if not scarecrow_protected[0]: # scarecrow1 (Player 1)이 보호 중이 아닐 때만 reactivate
-            scarecrow1.reactivate(new_position=scarecrow1_position)
-        if not scarecrow_protected[1]: # scarecrow2 (Player 2)가 보호 중이 아닐 때만 reactivate
-            scarecrow2.reactivate(new_position=scarecrow2_position)
-
-        for bullet in bullets:
-            bullet.reactivate()
-            bullet.used_this_turn = False
-        for grenade in grenades:
-            grenade.reactivate()
-            grenade.used_this_turn = False
-        syringe1.reactivate()
-        syringe2.reactivate()
-        syringe1.used_this_turn = False
-        syringe2.used_this_turn = False
-        scarecrow1.used_this_turn = False
-        scarecrow2.used_this_turn = False
-        item_used_this_turn = False
-
-        if card_sound:
-            card_sound.play()
+    with profiler.phase("engine.step"):
+        match, events = engine.step(match, action, match_rng)
+    if replay_log:
+        replay_log.record(action)
+        if match.game_over:
+            replay_log.end()
+    play_events(events)
+    sync_cards()
+    return True
+
+def handle_click(mouse_pos):
+    # 클릭 위치의 영역을 한 번에 찾아 그 액션 실행 (현재 플레이어의 카드와 발사 버튼만)
+    with profiler.phase("handle_click"):
+        region = game_router.hit(mouse_pos)
+        if region is None or region.owner not in (None, match.current_player):
+            return False
+        return perform(region.action)
+
+def handle_reload():
+    # 재장전 및 아이템 재활성화 처리 (탄창이 비어 있을 때만)
+    with profiler.phase("handle_reload"):
+        return perform(Action.RELOAD)
 
 # --- 초기화 ---
 
-# Pygame 초기화
-pygame.init()
-
-# 사운드 시스템 초기화
-pygame.mixer.init()
-
-# 창 생성
-window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption(WINDOW_TITLE)
-
-# 배경 이미지 로드
-try:
-    background = pygame.image.load(BACKGROUND_IMAGE_PATH).convert()
-except pygame.error as e:
-    print(f"Failed to load background image: {e}")
-    background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-
-# 메뉴 폰트 로드
-menu_font = pygame.font.Font(FONT_NAME, MENU_FONT_SIZE)
-if BOLD_FONT:
-    menu_font.set_bold(True)
-
-# 일반 폰트 로드
-font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
-
-# 클래스 인스턴스 생성
-game = Game()
-menu = Menu()
-player_lives = [INITIAL_LIVES, INITIAL_LIVES]
-weapon = Weapon(player_lives)
-card = Card()
-
-# 사운드 로드
-try:
-    card_sound = pygame.mixer.Sound(CARD_SOUND_PATH)
-    card_delete_sound = pygame.mixer.Sound(CARD_DELETE_SOUND_PATH)
-    syringe_sound = pygame.mixer.Sound(SYRINGE_SOUND_PATH)
-    grenade_sound = pygame.mixer.Sound(GRENADE_SOUND_PATH)
-    scarecrow_card_sound = pygame.mixer.Sound(SCARECROW_CARD_SOUND_PATH)
-    scarecrow_sound = pygame.mixer.Sound(SCARECROW_SOUND_PATH)
-    game_over_sound = pygame.mixer.Sound(GAME_OVER_SOUND_PATH)
-    draw_sound = pygame.mixer.Sound(DRAW_SOUND_PATH)
-except pygame.error as e:
-    print(f"Failed to load card sound: {e}")
-    card_sound = None
-    card_delete_sound = None
-    syringe_sound = None
-    grenade_sound = None
-    scarecrow_card_sound = None
-    scarecrow_sound = None
-    game_over_sound = None
-    draw_sound = None
-
-# 아이템 카드 크기
-ITEM_WIDTH = 165
-ITEM_HEIGHT = 214
-
-# 아이템 카드 위치 좌표
-# Player 1
-SCARECROW1_POS = (55, 125)  # Player1 - 오른쪽 위
-BULLET1_POS = (225, 125)  # Player1 - 왼쪽 위
-SYRINGE1_POS = (225, 350)  # Player1 - 왼쪽 아래
-GRENADE1_POS = (55, 350)  # Player1 - 오른쪽 아래
+def preload_assets():
+    # 게임 화면 자원을 백그라운드에서 미리 디코딩 (각 클래스가 요청하는 인자와 같게)
+    item_size = (ITEM_WIDTH, ITEM_HEIGHT)
+    window_size = (WINDOW_WIDTH, WINDOW_HEIGHT)
+    assets.preload_image(TABLE_IMAGE_PATH, window_size)
+    assets.preload_image(BLUR_BACKGROUND_IMAGE_PATH, window_size, alpha=False, fill=BLACK)
+    assets.preload_image(SHOTGUN_IMAGE_PATH, (340, 100))
+    assets.preload_image(BLANK_IMAGE_PATH, (40, 23), rotation=-90)
+    assets.preload_image(LIVE_IMAGE_PATH, (40, 23), rotation=-90)
+    assets.preload_image(SCARECROW_IMAGE_PATH, item_size)
+    assets.preload_image(BULLET_ENHANCE_IMAGE_PATH, item_size)
+    assets.preload_image(SYRINGE_IMAGE_PATH, item_size)
+    assets.preload_image(GRENADE_IMAGE_PATH, item_size, fill=RED)
+    for path in (
+        REAL_BULLET_SOUND_PATH,
+        FAKE_BULLET_SOUND_PATH,
+        BULLET_ENHANCED_SOUND_PATH,
+        BULLET_CARD_SOUND_PATH,
+        CARD_SOUND_PATH,
+        CARD_DELETE_SOUND_PATH,
+        SYRINGE_SOUND_PATH,
+        GRENADE_SOUND_PATH,
+        SCARECROW_CARD_SOUND_PATH,
+        SCARECROW_SOUND_PATH,
+        GAME_OVER_SOUND_PATH,
+        DRAW_SOUND_PATH,
+    ):
+        assets.preload_sound(path)
+
+def init():
+    # 메뉴에 필요한 것만 준비하고 나머지 자원은 백그라운드에서 불러옴
+    global assets, texts, window, background, menu_font, menu, game
+    global match, tablebase, show_hint, ai_player, remote
+    global play_text_rect, ai_text_rect, online_text_rect, quit_text_rect, menu_renderer, menu_router
+    global router, match_rng, replay_log, profiler, show_profile
+
+    # Pygame 초기화
+    pygame.init()
+
+    # 사운드 시스템 초기화
+    pygame.mixer.init()
+
+    # 창 생성
+    window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption(WINDOW_TITLE)
+
+    # 이미지/사운드 공유 캐시 (모든 클래스가 여기서 자원을 받음)
+    assets = AssetRegistry(ASSET_BUNDLE_PATH)
+
+    # 메뉴 배경은 바로 필요하므로 먼저 요청하고, 게임 화면 자원은 그 뒤에 요청
+    assets.preload_image(BACKGROUND_IMAGE_PATH, alpha=False)
+    preload_assets()
+    background = assets.image(BACKGROUND_IMAGE_PATH, alpha=False)
+
+    # 메뉴 폰트 로드
+    texts = TextCache()
+    menu_font = texts.font(MENU_FONT_SIZE, bold=BOLD_FONT, name=FONT_NAME, system=False)
+
+    menu = Menu()
+    game = None  # 게임 화면 객체는 처음 판을 시작할 때 생성
+
+    # 단계별 프레임 시간 측정기 (F3 로 켬)
+    profiler = FrameProfiler()
+    profiler.enabled = PROFILE_FRAMES
+    show_profile = False
+
+    # 메뉴 텍스트 위치 계산
+    PLAY_TEXT_Y = WINDOW_HEIGHT // 2 + 40
+    AI_TEXT_Y = PLAY_TEXT_Y + menu_font.get_height() + 20
+    ONLINE_TEXT_Y = AI_TEXT_Y + menu_font.get_height() + 20
+    QUIT_TEXT_Y = ONLINE_TEXT_Y + menu_font.get_height() + 20
+    play_text_rect = render_menu_text("Play", WHITE).get_rect()
+    play_text_rect.x = WINDOW_WIDTH // 15 - play_text_rect.width // 4
+    play_text_rect.y = PLAY_TEXT_Y
+    ai_text_rect = render_menu_text("Play vs AI", WHITE).get_rect()
+    ai_text_rect.x = WINDOW_WIDTH // 15 - ai_text_rect.width // 4
+    ai_text_rect.y = AI_TEXT_Y
+    online_text_rect = render_menu_text("Play Online", WHITE).get_rect()
+    online_text_rect.x = WINDOW_WIDTH // 15 - online_text_rect.width // 4
+    online_text_rect.y = ONLINE_TEXT_Y
+    quit_text_rect = render_menu_text("Quit", WHITE).get_rect()
+    quit_text_rect.x = WINDOW_WIDTH // 15 - quit_text_rect.width // 4
+    quit_text_rect.y = QUIT_TEXT_Y
+
+    # 메뉴 클릭 / 오버 영역
+    menu_router = InputRouter()
+    for rect, action in (
+        (play_text_rect, "play"),
+        (ai_text_rect, "play_ai"),
+        (online_text_rect, "play_online"),
+        (quit_text_rect, "quit"),
+    ):
+        menu_router.add(rect, action, enabled=lambda: menu.menu_state == MenuState.MAIN)
+    router = menu_router  # 마우스 오버를 조회할 현재 화면의 라우터
+
+    # 메뉴 화면: 마우스 오버와 로딩 진행 상황이 바뀔 때만 다시 그림
+    menu_renderer = DirtyRenderer(window, draw_menu_screen, profiler)
+    for rect in (play_text_rect, ai_text_rect, online_text_rect, quit_text_rect):
+        menu_renderer.add_region(rect, lambda rect=rect: menu.is_hovered(rect))
+    menu_renderer.add_region(LOADING_AREA, assets.progress)
+    menu_renderer.add_region(PROFILE_AREA, profile_signature)
+
+    # 게임 상태 (메뉴에서 Play 클릭 시 새로 생성)
+    match = engine.MatchState()
+
+    # 힌트용 테이블베이스 (mmap 이므로 열 때 비용이 거의 없음)
+    try:
+        tablebase = Tablebase(TABLEBASE_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Failed to load tablebase: {e}")
+        tablebase = None
+    show_hint = False
+
+    # 컴퓨터 Player 2 (메뉴에서 "Play vs AI" 선택 시 생성)
+    ai_player = None
+
+    # 온라인 대전 연결 (메뉴에서 "Play Online" 선택 시 생성)
+    remote = None
+
+    # 판 기록 (판마다 시드와 액션만 저장)
+    match_rng = None
+    try:
+        replay_log = ReplayWriter(REPLAY_PATH) if REPLAY_PATH else None
+    except (OSError, ValueError) as e:
+        print(f"Failed to open replay log: {e}")
+        replay_log = None
+
+def init_game():
+    # 게임 화면 객체 생성 (아직 디코딩 중인 자원만 기다림)
+    global game, weapon, card
+    global card_sound, card_delete_sound, syringe_sound, grenade_sound
+    global scarecrow_card_sound, scarecrow_sound, game_over_sound, draw_sound
+    global scarecrow1, scarecrow2, scarecrows, bullets, syringe1, syringe2, syringes, grenades
+    global shoot_self_text, shoot_opponent_text
+    global game_layers, game_renderer, game_over_renderer, game_router, game_over_router
+
+    # 클래스 인스턴스 생성
+    game = Game()
+    weapon = Weapon()
+    card = Card()
+
+    # 사운드 로드 (카드 클래스와 같은 Sound 객체를 공유)
+    card_sound = assets.sound(CARD_SOUND_PATH)
+    card_delete_sound = assets.sound(CARD_DELETE_SOUND_PATH)
+    syringe_sound = assets.sound(SYRINGE_SOUND_PATH)
+    grenade_sound = assets.sound(GRENADE_SOUND_PATH)
+    scarecrow_card_sound = assets.sound(SCARECROW_CARD_SOUND_PATH)
+    scarecrow_sound = assets.sound(SCARECROW_SOUND_PATH)
+    game_over_sound = assets.sound(GAME_OVER_SOUND_PATH)
+    draw_sound = assets.sound(DRAW_SOUND_PATH)
+
+    # 1. Scarecrow 생성
+    scarecrow_size = (ITEM_WIDTH, ITEM_HEIGHT)
+    scarecrow1 = Scarecrow(SCARECROW1_POS, size=scarecrow_size)
+    scarecrow2 = Scarecrow(SCARECROW2_POS, size=scarecrow_size)
+    scarecrows = [scarecrow1, scarecrow2]
+
+    # 2. Bullet 생성
+    bullet_size = (ITEM_WIDTH, ITEM_HEIGHT)
+    bullets = [Bullet(pos, size=bullet_size) for pos in [BULLET1_POS, BULLET2_POS]]
+
+    # 3. Syringe 생성
+    syringe1 = Syringe(SYRINGE1_POS)
+    syringe2 = Syringe(SYRINGE2_POS)
+    syringes = [syringe1, syringe2]
+
+    # 4. Grenade 생성
+    grenade_size = (ITEM_WIDTH, ITEM_HEIGHT)
+    grenades = [
+        Grenade(pos, size=grenade_size) for pos in [GRENADE1_POS, GRENADE2_POS]
+    ]
+
+    # 버튼 텍스트
+    shoot_self_text = texts.render("Shoot Self", WHITE, FONT_SIZE, name=FONT_NAME)
+    shoot_opponent_text = texts.render("Shoot Opponent", WHITE, FONT_SIZE, name=FONT_NAME)
+
+    # 게임 화면 클릭 / 오버 영역: 카드는 주인 플레이어만, 발사 버튼은 현재 플레이어가 사용
+    game_router = InputRouter()
+    for player in range(2):
+        for item, action in (
+            (bullets[player], Action.USE_BULLET),
+            (scarecrows[player], Action.USE_SCARECROW),
+            (grenades[player], Action.USE_GRENADE),
+            (syringes[player], Action.USE_SYRINGE),
+        ):
+            game_router.add(item.rect, action, owner=player, enabled=lambda item=item: item.active)
+    game_router.add(shoot_self_button_rect, Action.SHOOT_SELF)
+    game_router.add(shoot_opponent_button_rect, Action.SHOOT_OPPONENT)
+
+    game_over_router = InputRouter()
+    game_over_router.add(game_over_quit_rect(), "quit")
+
+    # 판 진행 중 바뀌지 않는 레이어
+    game_layers = StaticLayers(
+        lambda surface: surface.blit(background, (0, 0)),
+        card.draw_table,
+        weapon.display_shotgun,
+    )
 
-# Player 2
-SCARECROW2_POS = (1040, 125)  # Player2 - 왼쪽 위
-BULLET2_POS = (870, 125) # Player2 - 오른쪽 위
-SYRINGE2_POS = (870, 350)  # Player2 - 오른쪽 아래
-GRENADE2_POS = (1040, 350)  # Player2 - 왼쪽 아래
+    # 게임 화면: 생명력, 탄창, 턴/힌트, 카드, 버튼 오버, 효과 상태가 바뀔 때만 다시 그림
+    game_renderer = DirtyRenderer(window, draw_game_screen, profiler)
+    game_renderer.add_region(MAGAZINE_AREA, lambda: (match.magazine.bits, match.magazine.length))
+    game_renderer.add_region(LIVES_AREA, lambda: tuple(match.lives))
+    game_renderer.add_region(HEADER_AREA, header_signature)
+    for item in scarecrows + bullets + syringes + grenades:
+        game_renderer.add_region(item.rect, lambda item=item: item.active)
+    for rect in (shoot_self_button_rect, shoot_opponent_button_rect):
+        game_renderer.add_region(rect, lambda rect=rect: menu.is_hovered(rect))
+    for area in (STATUS1_AREA, STATUS2_AREA):
+        game_renderer.add_region(
+            area, lambda: (tuple(match.bullet_enhanced), tuple(match.scarecrow_protected))
+        )
+    game_renderer.add_region(PROFILE_AREA, profile_signature)
 
-# 버튼 위치 및 크기 설정
-BUTTON_WIDTH = WINDOW_WIDTH * 0.15
-BUTTON_HEIGHT = WINDOW_HEIGHT * 0.08
-BUTTON_MARGIN = WINDOW_WIDTH * 0.015
-shoot_self_button_rect = pygame.Rect(
-    WINDOW_WIDTH // 2 - BUTTON_WIDTH - BUTTON_MARGIN // 2,
-    WINDOW_HEIGHT - BUTTON_HEIGHT - 110,
-    BUTTON_WIDTH,
-    BUTTON_HEIGHT,
-)
-shoot_opponent_button_rect = pygame.Rect(
-    WINDOW_WIDTH // 2 + BUTTON_MARGIN // 2,
-    WINDOW_HEIGHT - BUTTON_HEIGHT - 110,
-    BUTTON_WIDTH,
-    BUTTON_HEIGHT,
-)
+    # 게임 종료 화면: Quit 마우스 오버만 바뀜
+    game_over_renderer = DirtyRenderer(window, draw_game_over_screen, profiler)
+    game_over_renderer.add_region(game_over_quit_rect(), lambda: menu.is_hovered(game_over_quit_rect()))
+    game_over_renderer.add_region(PROFILE_AREA, profile_signature)
 
-# 1. Scarecrow 위치 설정
-scarecrow_size = (ITEM_WIDTH, ITEM_HEIGHT)
-scarecrow1_position = SCARECROW1_POS
-scarecrow2_position = SCARECROW2_POS
-scarecrow1 = Scarecrow(scarecrow1_position, size=scarecrow_size)
-scarecrow2 = Scarecrow(scarecrow2_position, size=scarecrow_size)
-
-# 2. Bullet 위치 설정
-bullet_size = (ITEM_WIDTH, ITEM_HEIGHT)
-bullet_positions = [
-    BULLET1_POS,
-    BULLET2_POS
-]
-bullets = [Bullet(pos, size=bullet_size) for pos in bullet_positions]
-
-# 3. Syringe 위치 설정
-syringe_size = (ITEM_WIDTH, ITEM_HEIGHT)
-syringe1_position = SYRINGE1_POS
-syringe2_position = SYRINGE2_POS
-syringe1 = Syringe(syringe1_position)
-syringe2 = Syringe(syringe2_position)
-
-# 4. Grenade 위치 설정
-grenade_size = (ITEM_WIDTH, ITEM_HEIGHT)
-grenade1_position = GRENADE1_POS
-grenade2_position = GRENADE2_POS
-grenades = [
-    Grenade(pos, size=grenade_size) for pos in [grenade1_position, grenade2_position]
-]
-
-# 버튼 텍스트
-shoot_self_text = font.render("Shoot Self", True, WHITE)
-shoot_opponent_text = font.render("Shoot Opponent", True, WHITE)
-
-# 변수 초기화
-current_player = 0
-game_over = False
-in_menu = True
-game_state = GameState.PLAYING
-bullet_enhanced = [False, False]
-scarecrow_protected = [False, False]
-item_used_this_turn = False
+    print(assets.report())
 
 # --- 메인 루프 ---
 
-run = True
-while run:
+def start_match(vs_ai, seed=None):
+    # 새 판 시작, vs_ai 면 Player 2 를 컴퓨터가 조작
+    # 판의 모든 난수는 seed 에서 나오므로 seed 와 액션만 기록하면 다시 재생할 수 있음
+    global match, match_rng, ai_player
+    if game is None:
+        init_game()
+    leave_online()
+    if vs_ai and ai_player is None:
+        ai_player = AIPlayer(AI_POLICY if tablebase else AI_FALLBACK_POLICY)
+    elif not vs_ai and ai_player is not None:
+        ai_player.close()
+        ai_player = None
+    game.game_state = GameState.PLAYING
+    match_rng = engine.MatchRandom(seed)
+    match = engine.new_match(match_rng)
+    if replay_log:
+        replay_log.begin(match_rng.seed)
+    sync_cards()
+    game_renderer.invalidate()
+
+def start_online():
+    # 서버 접속을 시작하고 바로 게임 화면으로, 판 상태는 서버가 보내는 대로만 바뀜
+    # 접속에 실패하면 연결 종료와 같이 메뉴로 돌아감
+    global match, remote, ai_player
+    if game is None:
+        init_game()
+    leave_online()
+    remote = RemoteMatch(
+        NETPLAY_HOST, NETPLAY_PORT, wake=lambda: pygame.event.post(pygame.event.Event(NETPLAY_EVENT))
+    )
+    if ai_player is not None:
+        ai_player.close()
+        ai_player = None
+    game.game_state = GameState.PLAYING
+    match = engine.MatchState()  # 상대가 들어올 때까지 빈 판
+    sync_cards()
+    game_renderer.invalidate()
+
+def leave_online():
+    global remote
+    if remote is not None:
+        remote.close()
+        remote = None
+
+def apply_remote_updates():
+    """서버에서 받은 상태를 판에 반영, 연결이 끊기면 False"""
+    global match
+    for update in remote.poll():
+        if update is None:
+            leave_online()
+            return False
+        match, events = update
+        play_events(events)
+        sync_cards()
+    return True
+
+def draw_menu_screen():
+    # 메인 메뉴 화면 전체 그리기
     window.blit(background, (0, 0))
-
-    if in_menu:
-        # 메뉴 텍스트 위치 계산
-        PLAY_TEXT_Y = WINDOW_HEIGHT // 2 + 70
-        QUIT_TEXT_Y = PLAY_TEXT_Y + menu_font.get_height() + 20
-
-        # 메뉴 버튼 텍스트 렌더링
-        play_text = menu_font.render("Play", True, WHITE)
-        quit_text = menu_font.render("Quit", True, WHITE)
-
-        # rect 객체를 이벤트 루프 바깥에서 생성
-        play_text_rect = play_text.get_rect()
-        play_text_rect.x = WINDOW_WIDTH // 15 - play_text_rect.width // 4
-        play_text_rect.y = PLAY_TEXT_Y
-        quit_text_rect = quit_text.get_rect()
-        quit_text_rect.x = WINDOW_WIDTH // 15 - quit_text_rect.width // 4
-        quit_text_rect.y = QUIT_TEXT_Y
-
-        if menu.menu_state == MenuState.MAIN:
-            menu.show_main_menu(window, play_text_rect, quit_text_rect)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if menu.menu_state == MenuState.MAIN:
-                    if play_text_rect.collidepoint(pygame.mouse.get_pos()):
-                        in_menu = False
-                        game.game_state = GameState.PLAYING
-                        weapon.reload()
-                        scarecrow1.reactivate(new_position=scarecrow1_position)
-                        scarecrow2.reactivate(new_position=scarecrow2_position)
-                        for bullet in bullets:
-                            bullet.reactivate()
-                        for grenade in grenades:
-                            grenade.reactivate()
-                        syringe1.active = True
-                        syringe2.active = True
-                    elif quit_text_rect.collidepoint(pygame.mouse.get_pos()):
-                        run = False
-
-    elif game.game_state == GameState.PLAYING:
-        # 게임 화면
-        card.draw_table(window)
-        weapon.display_shotgun(window)
-        weapon.display_magazine(window)
-        display_lives(window, player_lives)
-        display_turn(window, current_player)
+    if menu.menu_state == MenuState.MAIN:
+        menu.show_main_menu(window, play_text_rect, ai_text_rect, online_text_rect, quit_text_rect)
+
+    # 게임 화면 자원을 불러오는 동안 진행 상황 표시
+    if assets.loading:
+        display_loading_progress(window, *assets.progress())
+
+    if show_profile:
+        display_profile(window)
+
+def draw_game_screen():
+    # 게임 화면 전체 그리기 (배경, 테이블, 샷건은 합쳐 둔 한 장으로)
+    phase = profiler.phase
+    with phase("static_layers"):
+        game_layers.draw(window)
+    with phase("display_magazine"):
+        weapon.display_magazine(window, match.magazine)
+    with phase("display_lives"):
+        display_lives(window, match.lives)
+    with phase("display_turn"):
+        display_turn(window, match.current_player)
+    with phase("draw_buttons"):
         draw_buttons(
             window,
             shoot_self_button_rect,
@@ -1076,6 +910,7 @@ while run:
             shoot_opponent_text
         )
 
+    with phase("cards"):
         scarecrow1.draw(window)
         scarecrow2.draw(window)
         syringe1.display_syringe(window)
@@ -1087,104 +922,161 @@ while run:
         for grenade in grenades:
             grenade.draw(window)
 
-        # Bullet 및 Scarecrow 효과 상태 표시
-        display_status_effects(window, bullet_enhanced, scarecrow_protected)
-
-        for event in pygame.event.get():
-            # 허수아비, 돌아가기 버튼 관련 변수는 이벤트 루프 밖에서 한 번만 정의
-            if event.type == pygame.QUIT:
-                run = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-
-                # 아이템 클릭 여부 확인
-                bullet_clicked = handle_bullet_click(
-                    mouse_pos, bullets, bullet_enhanced, current_player
-                )
-
-                scarecrow_clicked = handle_scarecrow_click(
-                    mouse_pos,
-                    scarecrow1,
-                    scarecrow2,
-                    current_player,
-                    scarecrow_protected,
-                )
-
-                grenade_clicked = handle_grenade_click(
-                    mouse_pos, grenades, player_lives
-                )
-
-                syringe_clicked = False
-                if current_player == 0:
-                    syringe_clicked = handle_syringe_click(mouse_pos, syringe1, player_lives, 0)
-                elif current_player == 1:
-                    syringe_clicked = handle_syringe_click(mouse_pos, syringe2, player_lives, 1)
-
-                if not (bullet_clicked or scarecrow_clicked or grenade_clicked or syringe_clicked):
-                    # 발사 버튼 클릭 및 총알 발사 여부 확인
-                    shoot_clicked, bullet_type = handle_shoot_buttons_click(
-                        mouse_pos,
-                        shoot_self_button_rect,
-                        shoot_opponent_button_rect,
-                        weapon,
-                        current_player,
-                        player_lives,
-                        bullet_enhanced,
-                        scarecrow_protected,
-                    )
-
-                    if shoot_clicked:
-                        # "Shoot Self"를 클릭했고 공포탄
-                        if bullet_type == 0 and (mouse_pos[0] >= shoot_self_button_rect.left and mouse_pos[
-                            0] <= shoot_self_button_rect.right and shoot_self_button_rect.top <= mouse_pos[
-                                                     1] <= shoot_self_button_rect.bottom):
-                            pass
-                        else:
-                            current_player = (current_player + 1) % 2
-                            for bullet in bullets:
-                                bullet.used_this_turn = False
-                            for grenade in grenades:
-                                grenade.used_this_turn = False
-                            syringe1.used_this_turn = False
-                            syringe2.used_this_turn = False
-                            scarecrow1.used_this_turn = False
-                            scarecrow2.used_this_turn = False
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    if game.game_state == GameState.PLAYING:
-                        handle_reload(
-                            weapon,
-                            syringe1,
-                            syringe2,
-                            scarecrow1,
-                            scarecrow2,
-                            bullets,
-                            grenades
-                        )
-
-        # 게임 종료 여부 확인
-        game_over, winner_index = check_game_over(player_lives)
-        if game_over:
-            game.game_state = GameState.GAME_OVER
-
-        pygame.display.update()
-
-    elif game.game_state == GameState.GAME_OVER:
-        # 게임 종료 상태
-        # noinspection PyUnboundLocalVariable
-        draw_game_over(window, winner_index)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                # noinspection PyUnboundLocalVariable
-                quit_text_rect = quit_text.get_rect(center=(window.get_width() // 2, window.get_height() // 2 + 50))
-                if quit_text_rect.collidepoint(mouse_pos):
+    # Bullet 및 Scarecrow 효과 상태 표시
+    with phase("display_status_effects"):
+        display_status_effects(window, match.bullet_enhanced, match.scarecrow_protected)
+
+    # H 키로 켜고 끄는 힌트
+    if show_hint and tablebase:
+        with phase("display_hint"):
+            display_hint(window, match)
+
+    if show_profile:
+        display_profile(window)
+
+def draw_game_over_screen():
+    # 흐릿한 배경이 화면 전체를 덮으므로 일반 배경은 그리지 않음
+    draw_game_over(window, match.winner)
+    if show_profile:
+        display_profile(window)
+
+def is_idle(in_menu):
+    # 로딩이나 컴퓨터 차례처럼 입력 없이 화면이 바뀌는 일이 없으면 유휴 상태
+    if in_menu:
+        return not assets.loading
+    if game.game_state == GameState.PLAYING:
+        return not (ai_player is not None and ai_player.controls(match))
+    return True
+
+def next_events(idle):
+    # 유휴 상태면 이벤트가 올 때까지 잠들고 (CPU 사용 없음), 아니면 쌓인 이벤트만 가져옴
+    if not idle:
+        with profiler.phase("events"):
+            return pygame.event.get()
+    event = pygame.event.wait(IDLE_TIMEOUT_MS)
+    if event.type == pygame.NOEVENT:
+        return []
+    with profiler.phase("events"):
+        return [event] + pygame.event.get()
+
+def handle_profile_keys(events):
+    # F3: 측정을 켜고 오버레이 표시 전환, F4: CSV 와 Chrome trace 로 내보내기
+    global show_profile
+    for event in events:
+        if event.type != pygame.KEYDOWN:
+            continue
+        if event.key == pygame.K_F3:
+            show_profile = not show_profile
+            profiler.enabled = True
+        elif event.key == pygame.K_F4:
+            export_profile()
+
+def main():
+    global match, show_hint, router
+
+    init()
+    clock = pygame.time.Clock()
+    in_menu = True
+    renderer = None
+
+    run = True
+    while run:
+        events = next_events(is_idle(in_menu))
+        profiler.begin_frame()
+        handle_profile_keys(events)
+
+        # 창이 가려졌다 다시 보이면 화면 전체를 다시 그림
+        if renderer is not None and any(event.type == pygame.WINDOWEXPOSED for event in events):
+            renderer.invalidate()
+
+        if in_menu:
+            for event in events:
+                if event.type == pygame.QUIT:
                     run = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    region = menu_router.hit(event.pos)
+                    if region is None:
+                        continue
+                    if region.action == "play":
+                        in_menu = False
+                        start_match(vs_ai=False)
+                    elif region.action == "play_ai":
+                        in_menu = False
+                        start_match(vs_ai=True)
+                    elif region.action == "play_online":
+                        in_menu = False
+                        start_online()
+                    elif region.action == "quit":
+                        run = False
 
-    pygame.display.update()
+        elif game.game_state == GameState.PLAYING:
+            # 온라인 대전이면 서버가 보낸 상태를 반영하고, 판 도중 연결이 끊기면 (상대가 나감) 메뉴로 돌아감
+            if remote is not None and not apply_remote_updates() and not match.game_over:
+                print("Disconnected from server")
+                in_menu = True
+
+            # 컴퓨터나 온라인 상대 차례면 사람 입력은 무시하고 결정된 액션만 반영 (기다리지 않음)
+            ai_turn = ai_player is not None and ai_player.controls(match)
+            if ai_turn:
+                with profiler.phase("ai_player.update"):
+                    action = ai_player.update(match)
+                if action is not None:
+                    perform(action)
+            elif remote is not None:
+                ai_turn = match.current_player != remote.player
+
+            for event in events:
+                if event.type == pygame.QUIT:
+                    run = False
+                if event.type == pygame.MOUSEBUTTONDOWN and not ai_turn:
+                    handle_click(event.pos)
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_r and not ai_turn:
+                        handle_reload()
+                    elif event.key == pygame.K_h:
+                        show_hint = not show_hint
+
+            # 게임 종료 여부 확인
+            with profiler.phase("check_game_over"):
+                if match.game_over:
+                    game.game_state = GameState.GAME_OVER
+
+        elif game.game_state == GameState.GAME_OVER:
+            # 게임 종료 상태
+            for event in events:
+                if event.type == pygame.QUIT:
+                    run = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    region = game_over_router.hit(event.pos)
+                    if region is not None and region.action == "quit":
+                        run = False
 
-pygame.quit()
\ No newline at end of file
+        # 현재 화면의 마우스 오버 영역을 한 번 조회하고 바뀐 영역만 다시 그림 (화면이 바뀌면 전체를 그림)
+        if in_menu:
+            next_renderer, router = menu_renderer, menu_router
+        elif game.game_state == GameState.PLAYING:
+            next_renderer, router = game_renderer, game_router
+        else:
+            next_renderer, router = game_over_renderer, game_over_router
+        router.point(pygame.mouse.get_pos())
+        if next_renderer is not renderer:
+            renderer = next_renderer
+            renderer.invalidate()
+        with profiler.phase("render"):
+            renderer.render()
+        profiler.end_frame()
+
+        clock.tick(TARGET_FPS)
+
+    # 계산 중인 컴퓨터 플레이어도 기다리지 않고 종료
+    if ai_player is not None:
+        ai_player.close()
+    leave_online()
+    if replay_log:
+        replay_log.close()
+    assets.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
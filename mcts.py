@@ -0,0 +1,212 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+
+# 몬테카를로 트리 탐색(MCTS) 봇
+# 엔진 규칙을 그대로 써서 무작위 플레이아웃으로 액션을 평가하므로
+# NB_SLOTS, INITIAL_LIVES 를 키운 규칙에서도 그대로 동작한다.
+#
+# 액션 결과가 확률적이므로 노드의 자식은 (액션, 결과 위치) 로 구분한다.
+# 탄창은 종류를 먼저 고르고 쏘므로 위치 키에는 실탄/공포탄 수만 넣는다.
+
+# --- 상수 정의 ---
+
+DEFAULT_SIMULATIONS = 2000
+EXPLORATION = 1.4  # UCB1 탐험 계수
+MAX_ROLLOUT_ACTIONS = 1000  # 끝나지 않는 플레이아웃은 무승부로 처리
+REUSE_DEPTH = 8  # 이전 트리에서 현재 위치를 찾을 최대 깊이 (결정 노드 기준)
+
+# --- 클래스 ---
+
+class Node:
+    # 결정 노드: 통계는 이 노드에서 움직이는 플레이어 기준 (승 1, 무 0.5, 패 0)
+    __slots__ = ("player", "actions", "visits", "totals", "outcomes")
+
+    def __init__(self, state):
+        self.player = state.current_player
+        self.actions = engine.legal_actions(state)
+        self.visits = [0] * len(self.actions)
+        self.totals = [0.0] * len(self.actions)
+        self.outcomes = [{} for _ in self.actions]  # 결과 위치 키 -> 자식 노드
+
+    def select(self, exploration):
+        # 방문하지 않은 액션 먼저, 이후 UCB1 최대 액션
+        visits = self.visits
+        log_total = math.log(sum(visits) or 1)
+        best_index = 0
+        best_score = -1.0
+        for index, count in enumerate(visits):
+            if count == 0:
+                return index
+            score = self.totals[index] / count + exploration * math.sqrt(log_total / count)
+            if score > best_score:
+                best_index, best_score = index, score
+        return best_index
+
+class MCTS:
+    """시뮬레이션 횟수 또는 시간(ms) 예산으로 탐색하는 MCTS 검색기"""
+
+    def __init__(
+        self,
+        simulations=None,
+        time_ms=None,
+        workers=1,
+        exploration=EXPLORATION,
+        rollout_policy=None,
+        seed=None,
+    ):
+        if simulations is None and time_ms is None:
+            simulations = DEFAULT_SIMULATIONS
+        self.simulations = simulations
+        self.time_ms = time_ms
+        self.workers = workers or os.cpu_count() or 1
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy  # None 이면 무작위 플레이아웃
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_key = None
+        self.reused = 0  # 마지막 탐색에서 이전 트리로부터 이어받은 시뮬레이션 수
+        self.executor = None
+
+    def search(self, state):
+        """루트 액션별 방문 횟수 {액션: 방문 수} 반환"""
+        if state.game_over:
+            raise ValueError("Match is already over")
+        if self.workers > 1:
+            return self._search_parallel(state)
+
+        key = position_key(state)
+        root = self._reuse(key) or Node(state)
+        self.reused = sum(root.visits)
+        self._run(root, state)
+        self.root, self.root_key = root, key
+        return dict(zip(root.actions, root.visits))
+
+    def best_action(self, state):
+        visits = self.search(state)
+        return max(visits, key=visits.get)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def _reuse(self, key):
+        # 이전 탐색 트리에서 현재 위치와 같은 노드를 너비 우선으로 찾음 (없으면 None)
+        if self.root is None:
+            return None
+        level = [(self.root_key, self.root)]
+        for _ in range(REUSE_DEPTH):
+            next_level = []
+            for node_key, node in level:
+                if node_key == key:
+                    return node
+                for outcomes in node.outcomes:
+                    next_level.extend(outcomes.items())
+            if not next_level:
+                break
+            level = next_level
+        return None
+
+    def _run(self, root, state):
+        rng = self.rng
+        exploration = self.exploration
+        deadline = None if self.time_ms is None else time.perf_counter() + self.time_ms / 1000
+        count = 0
+        while True:
+            if self.simulations is not None and count >= self.simulations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            count += 1
+
+            # 선택 및 확장: 처음 보는 결과 위치에 도달하면 노드를 하나 만들고 멈춤
+            current = state.copy()
+            node = root
+            path = []
+            while True:
+                index = node.select(exploration)
+                engine.apply_action(current, node.actions[index], rng)
+                path.append((node, index))
+                if current.game_over:
+                    break
+                outcomes = node.outcomes[index]
+                key = position_key(current)
+                child = outcomes.get(key)
+                if child is None:
+                    outcomes[key] = Node(current)
+                    break
+                node = child
+
+            winner = rollout(current, rng, self.rollout_policy)
+            for node, index in path:
+                node.visits[index] += 1
+                if winner == node.player:
+                    node.totals[index] += 1.0
+                elif winner == -1:
+                    node.totals[index] += 0.5
+
+    def _search_parallel(self, state):
+        # 루트 병렬화: 작업마다 독립된 새 트리로 탐색 후 루트 방문 수 합산 (이전 탐색 트리는 쓰지 않음)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [
+            self.executor.submit(
+                _search_worker,
+                state,
+                self.simulations,
+                self.time_ms,
+                self.exploration,
+                self.rollout_policy,
+                self.rng.random(),
+            )
+            for _ in range(self.workers)
+        ]
+        total = {}
+        for future in futures:
+            for action, count in future.result().items():
+                total[action] = total.get(action, 0) + count
+        return total
+
+# --- 함수 ---
+
+def position_key(state):
+    # 미래에 영향을 주는 상태만 담은 위치 키 (탄창 배치 순서는 제외)
+    magazine = state.magazine
+    return (
+        state.current_player,
+        *state.lives,
+        magazine.nb_live,
+        magazine.length,
+        *state.items[0],
+        *state.items[1],
+        *state.used[0],
+        *state.used[1],
+        *state.bullet_enhanced,
+        *state.scarecrow_protected,
+        state.item_used_this_turn,
+    )
+
+def rollout(state, rng, policy=None):
+    """state 에서 끝날 때까지 진행 후 승자 반환 (-1: 무승부), state 를 수정함
+
+    policy 가 없으면 가능한 액션 중 무작위로 선택한다.
+    """
+    for _ in range(MAX_ROLLOUT_ACTIONS):
+        if state.game_over:
+            return state.winner
+        if policy is None:
+            action = rng.choice(engine.legal_actions(state))
+        else:
+            action = policy(state)
+        engine.apply_action(state, action, rng)
+    return state.winner if state.game_over else -1
+
+def _search_worker(state, simulations, time_ms, exploration, rollout_policy, seed):
+    # 요청마다 새 트리로 탐색: 같은 프로세스가 요청 여러 개를 받아도 방문 수가 겹치지 않고
+    # 이번 요청의 예산과 매개변수만 반영된다.
+    return MCTS(simulations, time_ms, 1, exploration, rollout_policy, seed).search(state)
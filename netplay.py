@@ -0,0 +1,427 @@
+import argparse
+import asyncio
+import json
+import queue
+import threading
+
+import engine
+from engine import Action, Event
+from policies import load_policy
+
+# 두 플레이어 네트워크 대전
+# asyncio 서버가 판 상태와 난수를 가지고 규칙을 적용하고, 클라이언트는 액션만 보낸다.
+# 서버는 액션마다 바뀐 항목만 담은 델타를 두 플레이어에게 보낸다 (상태 전체는 입장할 때와 재동기화할 때만).
+#
+# 메시지는 한 줄에 JSON 하나
+#   클라이언트 -> 서버 : {"action": 액션 번호}
+#   서버 -> 클라이언트 : {"type": "welcome", "table": 번호, "player": 0/1}
+#                        {"type": "state", "seq": n, "state": {...}}   전체 상태
+#                        {"type": "delta", "seq": n, "events": [...], "changes": {...}}
+#                        {"type": "left", "player": 0/1}                상대가 나감 (판 종료)
+#                        {"type": "error", "message": "..."}
+# 연결마다 보낼 메시지 큐 크기를 제한하고, 가득 차면 쌓인 델타를 버리고 전체 상태 하나로 바꾼다.
+
+# --- 상수 정의 ---
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+SEND_QUEUE_SIZE = 64  # 연결마다 아직 보내지 못한 메시지 최대 수
+MAX_LINE = 4096  # 클라이언트가 보내는 한 줄의 최대 길이
+LISTEN_BACKLOG = 4096  # 수락을 기다리는 접속 수 (넘치면 한꺼번에 접속한 클라이언트가 멈춤)
+CONNECT_TIMEOUT = 3.0  # 초, RemoteMatch 가 서버 접속을 기다리는 최대 시간
+
+# --- 클래스 ---
+
+class Connection:
+    # 한 클라이언트 연결의 송신 큐와 송신 작업
+    def __init__(self, writer, queue_size=SEND_QUEUE_SIZE):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.resyncs = 0  # 큐를 다 보내기 전까지 연달아 넘쳐 전체 상태로 바꾼 횟수
+        self.task = asyncio.ensure_future(self._send_loop())
+
+    def send(self, data, resync=None):
+        """인코딩된 메시지를 큐에 넣음, 넘치면 쌓인 메시지를 버리고 resync() 결과만 남김"""
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            if resync is None:
+                return
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync())
+            self.resyncs += 1
+
+    async def close(self):
+        # 큐에 남은 메시지를 보낸 뒤 연결 종료
+        if not self.task.done():
+            self.send(None)
+            await asyncio.wait([self.task], timeout=1.0)
+            self.task.cancel()
+        self.writer.close()
+
+    def abort(self):
+        # 밀린 메시지를 버리고 바로 연결 종료
+        self.task.cancel()
+        self.writer.close()
+
+    async def _send_loop(self):
+        try:
+            while True:
+                data = await self.queue.get()
+                if data is None:
+                    return
+                self.writer.write(data)
+                await self.writer.drain()
+                if self.queue.empty():
+                    self.resyncs = 0  # 밀린 메시지를 모두 보냄 (따라잡음)
+        except (ConnectionError, OSError):
+            return
+
+class Table:
+    # 한 판: 서버만 상태와 난수를 가짐
+    __slots__ = ("id", "state", "rng", "players", "seq", "snapshot")
+
+    def __init__(self, table_id, seed=None):
+        self.id = table_id
+        self.rng = engine.MatchRandom(seed)
+        self.state = engine.new_match(self.rng)
+        self.players = [None, None]  # 자리별 Connection
+        self.seq = 0  # 적용한 액션 수
+        self.snapshot = snapshot(self.state)
+
+    @property
+    def full(self):
+        return None not in self.players
+
+    def state_message(self):
+        return encode({"type": "state", "seq": self.seq, "state": self.snapshot})
+
+    def act(self, player, action):
+        """player 의 액션을 적용하고 델타 메시지 반환 (할 수 없는 액션이면 ValueError)"""
+        if not self.full:
+            raise ValueError("Waiting for opponent")
+        if self.state.game_over:
+            raise ValueError("Match is over")
+        if player != self.state.current_player:
+            raise ValueError("Not your turn")
+        action = Action(action)
+        if not engine.is_legal(self.state, action):
+            raise ValueError(f"Illegal action {action.name}")
+        events = engine.apply_action(self.state, action, self.rng)
+        self.seq += 1
+        changes, self.snapshot = diff(self.snapshot, snapshot(self.state))
+        return {"type": "delta", "seq": self.seq, "events": [int(event) for event in events], "changes": changes}
+
+    def broadcast(self, message):
+        # 한 번만 인코딩해 두 플레이어에게 보냄
+        data = encode(message)
+        for connection in self.players:
+            if connection is not None:
+                connection.send(data, self.state_message)
+
+class NetplayServer:
+    # 접속 순서대로 두 명씩 한 판에 앉힘
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.connections = {}  # 플레이어 Connection -> 처리 작업
+        self.tables = {}
+        self.waiting = None  # 상대를 기다리는 판
+        self.next_table_id = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_LINE, backlog=LISTEN_BACKLOG
+        )
+        self.port = self.server.sockets[0].getsockname()[1]  # port 0 이면 실제 포트
+        return self
+
+    async def close(self):
+        # 접속 중인 클라이언트의 연결도 끊고 처리 작업이 끝날 때까지 기다림
+        self.server.close()
+        handlers = list(self.connections.values())
+        for connection in list(self.connections):
+            connection.writer.close()
+        if handlers:
+            await asyncio.wait(handlers, timeout=2.0)
+        await self.server.wait_closed()
+
+    def _seat(self, connection):
+        # 기다리는 판에 앉히거나 새 판을 만듦, (판, 자리) 반환
+        table = self.waiting
+        if table is None:
+            table = self._new_table()
+            self.tables[table.id] = table
+            self.waiting = table
+        player = table.players.index(None)
+        table.players[player] = connection
+        if table.full:
+            self.waiting = None
+        return table, player
+
+    def _new_table(self):
+        table = Table(self.next_table_id)
+        self.next_table_id += 1
+        return table
+
+    def _act(self, table, player, action):
+        table.broadcast(table.act(player, action))
+
+    async def _handle(self, reader, writer):
+        connection = Connection(writer)
+        self.connections[connection] = asyncio.current_task()
+        table, player = self._seat(connection)
+        connection.send(encode({"type": "welcome", "table": table.id, "player": player}))
+        if table.full:
+            # 두 번째 플레이어가 들어오면 두 사람 모두에게 시작 상태 전송
+            table.broadcast({"type": "state", "seq": table.seq, "state": snapshot(table.state)})
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    self._act(table, player, request["action"])
+                except (ValueError, KeyError, TypeError) as e:
+                    connection.send(encode({"type": "error", "message": str(e)}))
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self._leave(table, player)
+            await connection.close()
+            self.connections.pop(connection, None)
+
+    def _leave(self, table, player):
+        table.players[player] = None
+        if self.waiting is table:
+            self.waiting = None
+        if table.id in self.tables:
+            # 한 명이라도 나가면 판을 닫고 남은 플레이어에게 알림
+            del self.tables[table.id]
+            table.broadcast({"type": "left", "player": player})
+
+class NetplayClient:
+    # 스크립트용 asyncio 클라이언트: 받은 전체 상태와 델타로 판 상태를 유지
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.player = None
+        self.table = None
+        self.seq = None
+        self.snapshot = None
+        self.left = False
+
+    async def connect(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        return self
+
+    async def recv(self):
+        """메시지 하나를 받아 상태에 반영 후 반환, 연결이 끊기면 None"""
+        line = await self.reader.readline()
+        if not line:
+            return None
+        message = json.loads(line)
+        kind = message["type"]
+        if kind == "welcome":
+            self.player = message["player"]
+            self.table = message["table"]
+        elif kind == "state":
+            self.snapshot = message["state"]
+            self.seq = message["seq"]
+        elif kind == "delta":
+            self.snapshot = dict(self.snapshot, **message["changes"])
+            self.seq = message["seq"]
+        elif kind == "left":
+            self.left = True
+        return message
+
+    async def act(self, action):
+        self.writer.write(encode({"action": int(action)}))
+        await self.writer.drain()
+
+    def my_turn(self):
+        return (
+            self.snapshot is not None
+            and not self.left
+            and self.snapshot["winner"] is None
+            and self.snapshot["turn"] == self.player
+        )
+
+    async def close(self):
+        self.writer.close()
+
+class RemoteMatch:
+    # 게임 화면용: 별도 스레드의 이벤트 루프에서 NetplayClient 를 돌리고 받은 상태를 큐로 넘김
+    # 메시지가 오면 wake() 를 호출해 (예: pygame 이벤트 전송) 입력 대기 중인 화면 루프를 깨운다.
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, wake=None):
+        self.client = NetplayClient()
+        self.updates = queue.Queue()  # (MatchState, [Event]) 또는 연결 종료 시 None
+        self.wake = wake
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        # 접속도 루프 스레드에서 하므로 바로 돌아옴 (실패나 시간 초과는 updates 의 None 으로 알림)
+        asyncio.run_coroutine_threadsafe(self._connect(host, port), self.loop)
+
+    @property
+    def player(self):
+        return self.client.player
+
+    def poll(self):
+        """받은 갱신 목록 (절대 대기하지 않음)"""
+        updates = []
+        while True:
+            try:
+                updates.append(self.updates.get_nowait())
+            except queue.Empty:
+                return updates
+
+    def send(self, action):
+        asyncio.run_coroutine_threadsafe(self.client.act(action), self.loop)
+
+    def close(self):
+        # 연결을 끊고 루프를 멈춘 뒤, 스레드가 끝나면 루프를 닫음
+        if self.loop.is_closed():
+            return
+        if self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        self.thread.join(1.0)
+        if not self.thread.is_alive():
+            self.loop.close()
+
+    async def _shutdown(self):
+        # 접속 중이거나 수신 중인 작업을 취소하고 소켓이 닫힐 때까지 기다린 뒤 루프를 멈춤
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        writer = self.client.writer
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        self.loop.stop()
+
+    async def _connect(self, host, port):
+        try:
+            await asyncio.wait_for(self.client.connect(host, port), CONNECT_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f"Failed to connect to {host}:{port}: {str(e) or 'timed out'}")
+            self._closed()
+            return
+        await self._receive()
+
+    def _closed(self):
+        # 연결이 끝났음을 화면 루프에 알림
+        self.updates.put(None)
+        if self.wake:
+            self.wake()
+
+    async def _receive(self):
+        client = self.client
+        try:
+            while True:
+                message = await client.recv()
+                if message is None or message["type"] == "left":
+                    break
+                if message["type"] in ("state", "delta"):
+                    events = [Event(event) for event in message.get("events", ())]
+                    self.updates.put((state_from_snapshot(client.snapshot), events))
+                elif message["type"] == "error":
+                    print(f"Server: {message['message']}")
+                if self.wake:
+                    self.wake()
+        except (ConnectionError, OSError):
+            pass
+        self._closed()
+
+# --- 함수 ---
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+def snapshot(state):
+    # 화면에 보이는 상태 전체 (탄창은 화면처럼 순서까지 포함)
+    return {
+        "lives": list(state.lives),
+        "magazine": [state.magazine.bits, state.magazine.length],
+        "items": [[int(flag) for flag in items] for items in state.items],
+        "used": [[int(flag) for flag in used] for used in state.used],
+        "enhanced": [int(flag) for flag in state.bullet_enhanced],
+        "protected": [int(flag) for flag in state.scarecrow_protected],
+        "item_used": int(state.item_used_this_turn),
+        "turn": state.current_player,
+        "winner": state.winner,
+    }
+
+def diff(old, new):
+    """(바뀐 항목만 담은 dict, new)"""
+    return {key: value for key, value in new.items() if old.get(key) != value}, new
+
+def state_from_snapshot(data):
+    # 받은 상태로 화면/정책용 MatchState 를 만듦
+    state = engine.MatchState()
+    state.lives = list(data["lives"])
+    bits, length = data["magazine"]
+    state.magazine.bits = bits
+    state.magazine.length = length
+    state.magazine.nb_live = bin(bits).count("1")
+    state.items = [[bool(flag) for flag in items] for items in data["items"]]
+    state.used = [[bool(flag) for flag in used] for used in data["used"]]
+    state.bullet_enhanced = [bool(flag) for flag in data["enhanced"]]
+    state.scarecrow_protected = [bool(flag) for flag in data["protected"]]
+    state.item_used_this_turn = bool(data["item_used"])
+    state.current_player = data["turn"]
+    state.winner = data["winner"]
+    return state
+
+async def play_bot(policy_name, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """정책으로 한 판을 두고 (내 자리, 승자) 반환"""
+    policy = load_policy(policy_name)
+    client = await NetplayClient().connect(host, port)
+    try:
+        while True:
+            message = await client.recv()
+            if message is None or client.left:
+                return client.player, None
+            if client.snapshot is not None and client.snapshot["winner"] is not None:
+                return client.player, client.snapshot["winner"]
+            # 델타마다 차례를 확인 (오류 메시지에는 다시 시도하지 않음)
+            if message["type"] in ("state", "delta") and client.my_turn():
+                await client.act(policy(state_from_snapshot(client.snapshot)))
+    finally:
+        await client.close()
+
+async def serve(host, port):
+    server = await NetplayServer(host, port).start()
+    print(f"Serving on {host}:{server.port}")
+    async with server.server:
+        await server.server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the netplay server or a bot client.")
+    parser.add_argument("mode", choices=("serve", "bot"))
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--policy", default="odds", help="bot policy name or module:function")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        player, winner = asyncio.run(play_bot(args.policy, args.host, args.port))
+        if winner is None:
+            print("Opponent left")
+        else:
+            print(f"Player {player + 1}: {'draw' if winner == -1 else 'won' if winner == player else 'lost'}")
+
+if __name__ == "__main__":
+    main()
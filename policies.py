@@ -0,0 +1,87 @@
+import importlib
+import os
+import random
+
+import engine
+from engine import Action, INITIAL_LIVES
+from mcts import MCTS
+from tablebase import DEFAULT_PATH as TABLEBASE_PATH, Tablebase
+
+# 봇 정책: 플레이어가 화면에서 볼 수 있는 상태(MatchState)를 받아 액션을 반환하는 함수
+# 탄창 내용은 화면에 표시되므로 정책도 그대로 볼 수 있다. 정책은 state 를 수정하면 안 된다.
+
+def random_policy(state):
+    # 가능한 액션 중 무작위 선택
+    return random.choice(engine.legal_actions(state))
+
+def aggressive_policy(state):
+    # 항상 상대에게 발사, 실탄이 있으면 bullet 카드 먼저 사용
+    if engine.is_legal(state, Action.RELOAD):
+        return Action.RELOAD
+    if state.magazine.nb_live and engine.is_legal(state, Action.USE_BULLET):
+        return Action.USE_BULLET
+    return Action.SHOOT_OPPONENT
+
+def odds_policy(state):
+    # 탄창 상황과 생명력을 보고 아이템/발사 대상을 결정
+    if engine.is_legal(state, Action.RELOAD):
+        return Action.RELOAD
+
+    player = state.current_player
+    opponent = 1 - player
+    lives = state.lives
+    magazine = state.magazine
+
+    if lives[player] < INITIAL_LIVES and engine.is_legal(state, Action.USE_SYRINGE):
+        return Action.USE_SYRINGE
+    if not state.scarecrow_protected[player] and engine.is_legal(state, Action.USE_SCARECROW):
+        return Action.USE_SCARECROW
+    # 수류탄은 양쪽 모두 피해를 입으므로 상대만 쓰러뜨릴 수 있을 때 사용
+    if lives[opponent] == 1 < lives[player] and engine.is_legal(state, Action.USE_GRENADE):
+        return Action.USE_GRENADE
+
+    # 공포탄만 남았으면 자신에게 쏘아 턴 유지
+    if magazine.nb_live == 0:
+        return Action.SHOOT_SELF
+    if not state.bullet_enhanced[player] and engine.is_legal(state, Action.USE_BULLET):
+        return Action.USE_BULLET
+    return Action.SHOOT_OPPONENT
+
+_tablebase = None
+
+def tablebase_policy(state):
+    # 미리 계산한 테이블베이스의 최선의 액션 (프로세스마다 처음 호출 시 mmap)
+    global _tablebase
+    if _tablebase is None:
+        _tablebase = Tablebase()
+    return _tablebase.best_action(state)
+
+_mcts = None
+
+def mcts_policy(state):
+    # 기본 예산(시뮬레이션 수)의 MCTS, 플레이아웃은 odds_policy 로 진행
+    # 프로세스마다 검색기 하나를 두고 턴 사이에 트리 재사용
+    global _mcts
+    if _mcts is None:
+        _mcts = MCTS(rollout_policy=odds_policy)
+    return _mcts.best_action(state)
+
+POLICIES = {
+    "random": random_policy,
+    "aggressive": aggressive_policy,
+    "odds": odds_policy,
+    "tablebase": tablebase_policy,
+    "mcts": mcts_policy,
+}
+
+def load_policy(name):
+    # 이름 또는 "모듈:함수" 형식으로 정책 함수 찾기
+    if name in POLICIES:
+        # 테이블베이스는 첫 액션에서야 열리므로 (워커 안에서) 파일이 없는지 미리 확인
+        if name == "tablebase" and not os.path.exists(TABLEBASE_PATH):
+            raise FileNotFoundError(f"{TABLEBASE_PATH} not found: run `python tablebase.py` first")
+        return POLICIES[name]
+    module_name, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown policy {name!r} (expected one of {sorted(POLICIES)} or module:function)")
+    return getattr(importlib.import_module(module_name), attr)
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import time
+from array import array
+from collections import deque
+
+# 메인 루프 단계별 시간 측정 (기본은 꺼져 있고 켜면 단계마다 perf_counter 두 번만 추가됨)
+# 단계별 최근 PROFILE_CAPACITY 개의 시간을 링 버퍼에 보관해 p50/p95/p99 를 계산하고,
+# 같은 기간의 구간 기록을 Chrome trace (chrome://tracing, Perfetto) 형식으로 내보낸다.
+#
+#     with profiler.phase("display_lives"):
+#         display_lives(window, lives)
+
+# --- 상수 정의 ---
+
+PROFILE_CAPACITY = 600  # 단계별로 보관하는 최근 측정 수 (60fps 기준 10초)
+TRACE_CAPACITY = 20000  # Chrome trace 로 내보낼 최근 구간 수
+FRAME_PHASE = "frame"
+PERCENTILES = (50, 95, 99)
+
+# --- 클래스 ---
+
+class RingBuffer:
+    # 고정 크기 float 링 버퍼 (가득 차면 가장 오래된 값을 덮어씀)
+    __slots__ = ("values", "count")
+
+    def __init__(self, capacity):
+        self.values = array("d", bytes(8 * capacity))
+        self.count = 0  # 지금까지 넣은 값 수
+
+    def append(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def samples(self):
+        return self.values[: min(self.count, len(self.values))]
+
+class Phase:
+    # 한 단계의 시간 측정기 (profiler.phase(name) 가 이름마다 하나씩 만들어 재사용)
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            self.profiler.record(self.name, self.start, time.perf_counter())
+            self.start = None
+        return False
+
+class FrameProfiler:
+    def __init__(self, capacity=PROFILE_CAPACITY, trace_capacity=TRACE_CAPACITY):
+        self.enabled = False
+        self.capacity = capacity
+        self.phases = {}  # 이름 -> Phase
+        self.histograms = {}  # 이름 -> RingBuffer (초 단위)
+        self.trace = deque(maxlen=trace_capacity)  # (이름, 시작, 끝)
+        self.origin = time.perf_counter()
+        self.frame_start = None
+        self.frames = 0
+
+    def phase(self, name):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+        return phase
+
+    def record(self, name, start, end):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RingBuffer(self.capacity)
+        histogram.append(end - start)
+        self.trace.append((name, start, end))
+
+    def begin_frame(self):
+        # 입력을 받은 뒤 프레임 작업을 시작할 때 호출 (입력 대기와 프레임 제한 대기는 제외)
+        self.frame_start = time.perf_counter() if self.enabled else None
+
+    def end_frame(self):
+        # 화면을 그린 뒤 호출: begin_frame 부터의 시간을 FRAME_PHASE 로 기록
+        if self.frame_start is not None:
+            self.record(FRAME_PHASE, self.frame_start, time.perf_counter())
+            self.frames += 1
+            self.frame_start = None
+
+    def clear(self):
+        self.histograms.clear()
+        self.trace.clear()
+        self.frames = 0
+
+    def summary(self):
+        """[(단계 이름, 측정 수, p50, p95, p99, 최대)] (ms), 프레임 전체가 맨 앞"""
+        rows = []
+        for name, histogram in self.histograms.items():
+            samples = sorted(histogram.samples())
+            if not samples:
+                continue
+            last = len(samples) - 1
+            values = [samples[last * p // 100] * 1000 for p in PERCENTILES]
+            rows.append((name, histogram.count, *values, samples[last] * 1000))
+        rows.sort(key=lambda row: (row[0] != FRAME_PHASE, -row[3]))
+        return rows
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["phase", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for name, count, *values in self.summary():
+                writer.writerow([name, count, *(f"{value:.4f}" for value in values)])
+
+    def write_chrome_trace(self, path):
+        # 완료 이벤트("X") 목록, 시간은 마이크로초
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+            }
+            for name, start, end in self.trace
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,81 @@
+import pygame
+
+from profiler import FrameProfiler
+
+# 바뀐 영역만 다시 그려 화면에 보내는 렌더러
+# 화면을 영역(rect) 과 그 영역의 상태 값(signature) 으로 등록해 두고,
+# 매 프레임 상태 값이 바뀐 영역만 클리핑한 채 장면 전체를 다시 그린 뒤 그 영역만 display.update 한다.
+# 장면 그리기 함수는 그대로 두고 클리핑으로 겹친 레이어(배경, 테이블, 카드)를 올바르게 합성한다.
+# 판 진행 중 바뀌지 않는 레이어(배경, 테이블, 샷건)는 StaticLayers 로 미리 한 장에 합쳐 둔다.
+
+# --- 클래스 ---
+
+class DirtyRenderer:
+    def __init__(self, window, draw_scene, profiler=None):
+        self.window = window
+        self.draw_scene = draw_scene  # 화면 전체를 그리는 함수 (클리핑 영역 밖은 무시됨)
+        self.profiler = profiler or FrameProfiler()  # 기본은 꺼진 측정기
+        self.regions = []  # [(rect, signature 함수)]
+        self.signatures = []
+        self.full = True  # 다음 프레임에 화면 전체를 다시 그림
+        self.frames = 0
+        self.updated_pixels = 0  # 화면으로 보낸 픽셀 수 누계 (통계용)
+
+    def add_region(self, rect, signature):
+        """signature() 값이 바뀔 때마다 rect 를 다시 그림"""
+        self.regions.append((pygame.Rect(rect), signature))
+        self.signatures.append(None)
+
+    def invalidate(self):
+        # 화면 전환 등으로 전체를 다시 그려야 할 때
+        self.full = True
+
+    def render(self):
+        """바뀐 영역을 다시 그리고 화면에 보낸 rect 목록 반환"""
+        dirty = []
+        for index, (rect, signature) in enumerate(self.regions):
+            value = signature()
+            if value != self.signatures[index]:
+                self.signatures[index] = value
+                dirty.append(rect)
+        self.frames += 1
+
+        if self.full:
+            self.full = False
+            self.draw_scene()
+            with self.profiler.phase("display.update"):
+                pygame.display.update()
+            self.updated_pixels += self.window.get_width() * self.window.get_height()
+            return [self.window.get_rect()]
+
+        for rect in dirty:
+            self.window.set_clip(rect)
+            self.draw_scene()
+        self.window.set_clip(None)
+        if dirty:
+            with self.profiler.phase("display.update"):
+                pygame.display.update(dirty)
+            self.updated_pixels += sum(rect.width * rect.height for rect in dirty)
+        return dirty
+
+class StaticLayers:
+    # 바뀌지 않는 레이어들을 불투명한 Surface 한 장으로 합쳐 캐시
+    # 창 크기가 바뀌거나 invalidate() 를 호출하면 (그림 교체 등) 다시 합성한다.
+    def __init__(self, *layers):
+        self.layers = layers  # 아래쪽부터 차례로 surface 에 그리는 함수들
+        self.surface = None
+        self.builds = 0  # 합성 횟수 (통계용)
+
+    def invalidate(self):
+        self.surface = None
+
+    def draw(self, window):
+        """캐시한 합성 결과를 window 에 한 번에 복사"""
+        size = window.get_size()
+        if self.surface is None or self.surface.get_size() != size:
+            # 창과 같은 픽셀 형식의 불투명 Surface 라 복사 시 알파 합성이 없음
+            self.surface = pygame.Surface(size, 0, window)
+            for layer in self.layers:
+                layer(self.surface)
+            self.builds += 1
+        window.blit(self.surface, (0, 0))
@@ -0,0 +1,224 @@
+import argparse
+import os
+import struct
+import time
+
+import engine
+from engine import Action
+
+# 판 기록 (리플레이 로그)
+# 규칙 엔진의 난수(engine.MatchRandom)는 판 시드로 정해지므로 시드와 액션 순서만 기록하면 판 전체를 다시 만들 수 있다.
+#
+# 파일 구조
+#   헤더 : HEADER (magic, version)
+#   판   : varint(시드), varint(액션 + 1) ..., 0 (판 끝)
+# 액션은 1 바이트씩이라 한 판이 수십 바이트이고, 파일 끝에 판을 계속 이어 붙인다.
+# 끝 표시(0) 가 없는 판은 기록 중 프로그램이 종료된 판이고, 다음에 ReplayWriter 로 열 때 잘라낸다.
+
+# --- 상수 정의 ---
+
+DEFAULT_PATH = "replays.bin"
+MAGIC = b"BRRP"
+VERSION = 2  # 2: 시드가 MatchRandom 의 하위 시스템별 스트림을 정함
+HEADER = struct.Struct("<4sH")
+
+END_OF_MATCH = 0
+PLAYBACK_INTERVAL = 0.6  # 초, 속도 1 로 화면에 재생할 때 액션 사이 간격
+
+# --- 클래스 ---
+
+class ReplayWriter:
+    # 판 기록을 파일 끝에 이어 씀 (버퍼 사용, 판이 끝날 때 디스크에 동기화)
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.file = open(path, "ab")
+        self.recording = False
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version = HEADER.unpack(data[: HEADER.size].ljust(HEADER.size, b"\0"))
+            if magic != MAGIC or version != VERSION:
+                self.file.close()
+                raise ValueError(f"{path} is not a version {VERSION} replay log")
+            # 이전 실행이 판 도중 (varint 중간 포함) 종료되었으면 마지막으로 끝난 판 뒤를 잘라
+            # 다음 판과 섞이지 않게 함
+            end = complete_length(data)
+            if end < len(data):
+                self.file.truncate(end)
+
+    def begin(self, seed):
+        if self.recording:
+            self.end()
+        self.file.write(encode_varint(seed))
+        self.recording = True
+
+    def record(self, action):
+        self.file.write(encode_varint(int(action) + 1))
+
+    def end(self, sync=True):
+        # 판 끝 표시 후 디스크에 동기화 (중단된 판도 끝 표시는 남김)
+        # sync=False 면 버퍼에만 쓰고, 동기화는 호출한 쪽이 나중에 sync() 로 한다.
+        if not self.recording:
+            return
+        self.file.write(bytes([END_OF_MATCH]))
+        self.recording = False
+        if sync:
+            self.sync()
+
+    def sync(self):
+        # 버퍼를 비우고 디스크에 동기화 (다른 스레드에서 불러도 됨)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.end()
+        self.file.close()
+
+# --- 함수 ---
+
+def encode_varint(value):
+    # LEB128 부호 없는 정수
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def complete_length(data):
+    """로그 data 에서 판 끝 표시까지 온전히 기록된 부분의 길이 (헤더 포함)"""
+    position = end = HEADER.size
+    size = len(data)
+    in_match = False
+    start = position  # 지금 읽는 varint 의 시작 위치
+    while position < size:
+        byte = data[position]
+        position += 1
+        if byte >= 0x80:
+            continue
+        # varint 의 마지막 바이트: 한 바이트짜리 0 만 값이 0
+        if not in_match:
+            in_match = True  # 판 시드
+        elif byte == END_OF_MATCH and position - start == 1:
+            in_match = False
+            end = position
+        start = position
+    return end
+
+def read_matches(path=DEFAULT_PATH):
+    """(시드, [액션]) 를 파일 순서대로 생성"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} replay log")
+
+    position = HEADER.size
+    size = len(data)
+    while position < size:
+        values = []
+        while position < size:
+            value = 0
+            shift = 0
+            complete = False
+            while position < size:
+                byte = data[position]
+                position += 1
+                value |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    complete = True
+                    break
+            if not complete:
+                break  # 기록 중 종료로 잘린 마지막 varint 는 버림
+            if value == END_OF_MATCH and values:
+                break
+            values.append(value)
+        if values:
+            yield values[0], [Action(value - 1) for value in values[1:]]
+
+def replay(seed, actions):
+    """기록된 판을 화면 없이 다시 진행해 마지막 상태 반환 (불가능한 액션이면 ValueError)"""
+    rng = engine.MatchRandom(seed)
+    state = engine.new_match(rng)
+    for index, action in enumerate(actions):
+        if not engine.is_legal(state, action):
+            raise ValueError(f"Illegal action {action.name} at move {index}")
+        engine.apply_action(state, action, rng)
+    return state
+
+def play_back(seed, actions, speed=1.0):
+    # 게임 화면으로 판을 재생 (speed 배속), 창을 닫으면 중단
+    import pygame
+    import main as game
+
+    game.REPLAY_PATH = None  # 재생하는 판을 다시 기록하지 않음
+    game.init()
+    game.start_match(vs_ai=False, seed=seed)
+    game.router = game.game_router
+    game.game_renderer.render()
+
+    interval = PLAYBACK_INTERVAL / speed
+    for action in actions:
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                pygame.quit()
+                return
+            pygame.time.wait(10)
+        if not game.perform(action):
+            print(f"Illegal action {action.name}, playback stopped")
+            break
+        game.game_renderer.render()
+    pygame.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify, summarize or play back recorded matches.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--match", type=int, default=None, help="play back this match (0-based index)")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed for --match")
+    args = parser.parse_args()
+    if not args.speed > 0:  # 0, 음수, nan
+        parser.error("--speed must be greater than 0")
+
+    if args.match is not None:
+        for index, (seed, actions) in enumerate(read_matches(args.path)):
+            if index == args.match:
+                play_back(seed, actions, args.speed)
+                return
+        raise SystemExit(f"{args.path} has no match {args.match}")
+
+    # 모든 판을 최대 속도로 다시 진행해 결과 집계
+    start = time.perf_counter()
+    matches = 0
+    wins = [0, 0]
+    draws = 0
+    unfinished = 0
+    invalid = 0
+    nb_actions = 0
+    for seed, actions in read_matches(args.path):
+        matches += 1
+        nb_actions += len(actions)
+        try:
+            state = replay(seed, actions)
+        except ValueError as e:
+            print(f"Match {matches - 1}: {e}")
+            invalid += 1
+            continue
+        if not state.game_over:
+            unfinished += 1
+        elif state.winner == -1:
+            draws += 1
+        else:
+            wins[state.winner] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.path}: {matches} matches, {nb_actions} actions")
+    print(f"  player 1 wins: {wins[0]}, player 2 wins: {wins[1]}, draws: {draws}")
+    print(f"  unfinished: {unfinished}, invalid: {invalid}")
+    print(f"  {elapsed:.2f}s ({matches / max(elapsed, 1e-9):.0f} matches/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import pygame
+
+# 클릭 / 마우스 오버 대상 영역을 격자로 색인해 위치 하나로 바로 찾는 입력 라우터
+# 영역마다 액션과 주인 플레이어를 붙여 두면 클릭 처리는 찾은 영역의 액션 하나만 실행하면 된다.
+# 영역 수가 늘어도 (여러 테이블) 한 번의 조회는 그 칸에 걸친 영역만 확인한다.
+
+# --- 상수 정의 ---
+
+CELL_SIZE = 64  # 격자 한 칸의 크기 (픽셀)
+
+# --- 클래스 ---
+
+class Region:
+    __slots__ = ("rect", "action", "owner", "enabled")
+
+    def __init__(self, rect, action, owner, enabled):
+        self.rect = rect
+        self.action = action
+        self.owner = owner  # 이 영역을 쓸 수 있는 플레이어 (None: 누구나)
+        self.enabled = enabled  # 지금 눌릴 수 있는지 확인하는 함수 (None: 항상)
+
+class InputRouter:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (칸 x, 칸 y) -> [Region], 나중에 추가한 영역이 뒤쪽
+        self.hovered = None  # 마지막 point() 위치의 영역
+
+    def add(self, rect, action, owner=None, enabled=None):
+        """rect 영역을 등록하고 Region 반환 (겹치면 나중에 추가한 영역이 위)"""
+        region = Region(pygame.Rect(rect), action, owner, enabled)
+        size = self.cell_size
+        rect = region.rect
+        for cell_x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                self.cells.setdefault((cell_x, cell_y), []).append(region)
+        return region
+
+    def hit(self, pos):
+        """pos 에 있는 맨 위의 활성 영역, 없으면 None"""
+        x, y = pos
+        regions = self.cells.get((x // self.cell_size, y // self.cell_size))
+        if regions:
+            for region in reversed(regions):
+                if region.rect.collidepoint(x, y) and (region.enabled is None or region.enabled()):
+                    return region
+        return None
+
+    def point(self, pos):
+        # 프레임마다 한 번 마우스 위치로 오버 영역을 정함
+        self.hovered = self.hit(pos)
+        return self.hovered
+
+    def is_hovered(self, rect):
+        return self.hovered is not None and self.hovered.rect == rect
@@ -0,0 +1,375 @@
+import time
+from array import array
+
+import engine
+from engine import (
+    Action,
+    Item,
+    INITIAL_LIVES,
+    SCARECROW_CHANCE,
+    GRENADE_CHANCE,
+    SYRINGE_CHANCE,
+    DAMAGE,
+    ENHANCED_DAMAGE,
+)
+
+# 정확한 기댓값 탐색(expectimax) 해석기
+# 현재 차례인 플레이어 입장에서 (승리 확률, 무승부 확률) 과 최선의 액션을 계산한다.
+#
+# 탄창에서는 실탄/공포탄 종류를 먼저 고르므로 위치와 무관하게 (실탄 수, 공포탄 수) 만 중요하다.
+# 상태는 "움직이는 플레이어 / 상대" 기준의 정수 키로 압축해 두 플레이어가 같은 표를 공유한다.
+#
+# 주사기 회복과 허수아비 방어 때문에 재장전을 거쳐 같은 상태로 돌아오는 순환이 있으므로,
+# 재장전 결과가 (생명력, bullet/허수아비 효과) 에만 의존한다는 점을 이용해
+# 재장전 지점의 값만 반복 갱신(Gauss-Seidel)하고 탄창 한 개 구간은 메모이제이션으로 푼다.
+
+# --- 상수 정의 ---
+
+DEFAULT_TABLE_BITS = 23  # 치환표 크기 (2^23 칸)
+TOLERANCE = 1e-12  # 재장전 값 반복 갱신 종료 기준 (승리 + 무승부/2 기준)
+MAX_SWEEPS = 100
+
+# 위치 키 비트 배치 (움직이는 플레이어 = "나" 기준)
+MY_LIVES, OPP_LIVES = 0, 3  # 3비트씩
+NB_LIVE, NB_BLANK = 6, 10  # 4비트씩
+MY_ITEMS, OPP_ITEMS = 14, 18  # 4비트씩, Item 순서
+SYRINGE_USED = 22  # 카드가 남아 있는 내 주사기를 이번 턴에 이미 사용함
+MY_ENHANCED, OPP_ENHANCED = 23, 24
+MY_PROTECTED, OPP_PROTECTED = 25, 26
+ITEM_USED = 27
+
+_BULLET, _SCARECROW, _SYRINGE, _GRENADE = (1 << (MY_ITEMS + item) for item in Item)
+_ANY_ITEM_USED = 1 << ITEM_USED
+_SYRINGE_USED = 1 << SYRINGE_USED
+_MY_ENHANCED, _OPP_ENHANCED = 1 << MY_ENHANCED, 1 << OPP_ENHANCED
+_MY_PROTECTED, _OPP_PROTECTED = 1 << MY_PROTECTED, 1 << OPP_PROTECTED
+_ROUND_LIVE, _ROUND_BLANK = 1 << NB_LIVE, 1 << NB_BLANK
+_MAGAZINE = 0xFF << NB_LIVE
+_MY_HIT, _OPP_HIT = 1 << MY_LIVES, 1 << OPP_LIVES
+_LIVE_COUNT, _BLANK_COUNT = 15 << NB_LIVE, 15 << NB_BLANK
+
+# 탐색 중 비교 비용을 줄이기 위한 정수 액션 코드
+_SHOOT_SELF, _SHOOT_OPPONENT, _USE_BULLET, _USE_SCARECROW, _USE_SYRINGE, _USE_GRENADE, _RELOAD = (
+    int(action) for action in Action
+)
+
+_MIX = 0x9E3779B97F4A7C15  # 치환표 인덱스용 곱셈 해시
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# --- 클래스 ---
+
+class TranspositionTable:
+    # 크기가 고정된 직접 사상(direct-mapped) 치환표: 충돌 시 새 값으로 교체
+    # 칸마다 (키, 승리 확률, 무승부 확률) 을 배열에 저장하므로 메모리는 크기에만 비례한다.
+    def __init__(self, bits=DEFAULT_TABLE_BITS):
+        self.bits = bits
+        self.shift = 64 - bits
+        self.hits = 0
+        self.stores = 0
+        self.clear()
+
+    def clear(self):
+        size = 1 << self.bits
+        self.keys = array("q", [-1]) * size
+        self.wins = array("d", [0.0]) * size
+        self.draws = array("d", [0.0]) * size
+
+    def index(self, key):
+        return ((key * _MIX) & _MASK64) >> self.shift
+
+    @property
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.keys, self.wins, self.draws))
+
+    def occupancy(self):
+        return sum(1 for key in self.keys if key >= 0)
+
+class Solver:
+    def __init__(self, table_bits=DEFAULT_TABLE_BITS):
+        self.table = TranspositionTable(table_bits)
+        self.reload_distribution = [
+            (nb_live << NB_LIVE | nb_blank << NB_BLANK, p)
+            for (nb_live, nb_blank), p in engine.reload_distribution()
+        ]
+        # 재장전 지점 키 (생명력, bullet/허수아비 효과만 남긴 위치 키) -> (승리, 무승부)
+        self.reload_values = {}
+        self.sweeps = 0
+        self.solve_time = 0.0
+
+    def prepare(self):
+        # 재장전 지점 값이 수렴할 때까지 반복 (처음 한 번만 필요)
+        if self.reload_values:
+            return
+        start = time.perf_counter()
+        keys = [
+            my_lives << MY_LIVES
+            | opp_lives << OPP_LIVES
+            | my_enhanced << MY_ENHANCED
+            | opp_enhanced << OPP_ENHANCED
+            | my_protected << MY_PROTECTED
+            | opp_protected << OPP_PROTECTED
+            for my_lives in range(1, INITIAL_LIVES + 1)
+            for opp_lives in range(1, INITIAL_LIVES + 1)
+            for my_enhanced in (0, 1)
+            for opp_enhanced in (0, 1)
+            for my_protected in (0, 1)
+            for opp_protected in (0, 1)
+        ]
+        # 생명력이 적은 지점부터 갱신해야 빨리 수렴
+        keys.sort(key=lambda k: (k >> MY_LIVES & 7) + (k >> OPP_LIVES & 7))
+        self.reload_values = {key: (0.5, 0.0) for key in keys}
+
+        for self.sweeps in range(1, MAX_SWEEPS + 1):
+            self.table.clear()
+            delta = 0.0
+            for key in keys:
+                win, draw = self._reload(key)
+                old_win, old_draw = self.reload_values[key]
+                delta = max(delta, abs(win + draw / 2 - old_win - old_draw / 2))
+                self.reload_values[key] = (win, draw)
+            if delta < TOLERANCE:
+                break
+        self.solve_time = time.perf_counter() - start
+
+    def evaluate(self, state):
+        """현재 플레이어의 (승리 확률, 무승부 확률, 최선의 액션) 반환"""
+        if state.game_over:
+            raise ValueError("Match is already over")
+        return self.evaluate_key(pack_position(state))
+
+    def evaluate_key(self, key):
+        # 위치 키 기준 evaluate (테이블베이스 생성에서도 사용)
+        self.prepare()
+        best = None
+        for action in candidate_actions(key):
+            win, draw = self._action(key, action)
+            if best is None or win + draw / 2 > best[0] + best[1] / 2:
+                best = (win, draw, Action(action))
+        return best
+
+    def best_action(self, state):
+        return self.evaluate(state)[2]
+
+    def action_values(self, state):
+        # 가능한 액션별 (승리 확률, 무승부 확률)
+        self.prepare()
+        key = pack_position(state)
+        return {action: self._action(key, action) for action in engine.legal_actions(state)}
+
+    def _reload(self, key):
+        # 재장전: 탄창 분포 x 아이템 재활성화(bullet 항상, 나머지 50%) 기댓값
+        # 보호 중인 플레이어의 허수아비는 이미 사용된 상태로 남는다
+        my_cards = [_BULLET | syringe | grenade for syringe in (0, _SYRINGE) for grenade in (0, _GRENADE)]
+        if not key & _MY_PROTECTED:
+            my_cards += [cards | _SCARECROW for cards in my_cards]
+        opp_cards = [cards >> MY_ITEMS << OPP_ITEMS for cards in my_cards[:4]]
+        if not key & _OPP_PROTECTED:
+            opp_cards += [cards | _SCARECROW >> MY_ITEMS << OPP_ITEMS for cards in opp_cards]
+        p_cards = 1.0 / (len(my_cards) * len(opp_cards))
+
+        value = self._value
+        win = draw = 0.0
+        for magazine, p_magazine in self.reload_distribution:
+            p = p_magazine * p_cards
+            for my_items in my_cards:
+                for opp_items in opp_cards:
+                    w, d = value(key | magazine | my_items | opp_items)
+                    win += p * w
+                    draw += p * d
+        return win, draw
+
+    def _value(self, key):
+        # 결정 노드: 가능한 액션 중 (승리 + 무승부/2) 최대값
+        table = self.table
+        index = ((key * _MIX) & _MASK64) >> table.shift
+        if table.keys[index] == key:
+            table.hits += 1
+            return table.wins[index], table.draws[index]
+
+        best_win = best_draw = 0.0
+        best_score = -1.0
+        action = self._action
+        # candidate_actions 와 같은 규칙 (호출 비용을 줄이려고 인라인)
+        if key & _MAGAZINE:
+            candidates = [_SHOOT_OPPONENT, _SHOOT_SELF]
+        else:
+            candidates = [_RELOAD]
+        if not key & _ANY_ITEM_USED:
+            if key & _BULLET:
+                candidates.append(_USE_BULLET)
+            if key & _SCARECROW:
+                candidates.append(_USE_SCARECROW)
+            if key & _SYRINGE and not key & _SYRINGE_USED:
+                candidates.append(_USE_SYRINGE)
+            if key & _GRENADE:
+                candidates.append(_USE_GRENADE)
+        for candidate in candidates:
+            win, draw = action(key, candidate)
+            score = win + draw / 2
+            if score > best_score:
+                best_win, best_draw, best_score = win, draw, score
+
+        table.keys[index] = key
+        table.wins[index] = best_win
+        table.draws[index] = best_draw
+        table.stores += 1
+        return best_win, best_draw
+
+    def _child(self, key, my_lives, opp_lives, switch):
+        # 자식 상태 값 (현재 플레이어 기준), 턴이 넘어가면 상대 기준 값을 뒤집음
+        if my_lives <= 0 or opp_lives <= 0:
+            if my_lives <= 0 and opp_lives <= 0:
+                return 0.0, 1.0
+            return (0.0, 0.0) if my_lives <= 0 else (1.0, 0.0)
+        if not switch:
+            return self._value(key)
+        win, draw = self._value(swap_players(key))
+        return 1.0 - win - draw, draw
+
+    def _action(self, key, action):
+        my_lives = key >> MY_LIVES & 7
+        opp_lives = key >> OPP_LIVES & 7
+        child = self._child
+
+        if action <= _SHOOT_OPPONENT:
+            target_self = action == _SHOOT_SELF
+            damage = ENHANCED_DAMAGE if key & _MY_ENHANCED else DAMAGE
+            # bullet 효과는 공포탄이어도 소모, 발사 후 아이템 사용 여부 초기화
+            base = key & ~(_MY_ENHANCED | _ANY_ITEM_USED)
+            has_live = key & _LIVE_COUNT
+            has_blank = key & _BLANK_COUNT
+
+            live_value = blank_value = None
+            if has_live:
+                if target_self:
+                    if key & _MY_PROTECTED:
+                        live_value = child(base - _ROUND_LIVE - _MY_PROTECTED, my_lives, opp_lives, True)
+                    else:
+                        live_value = child(base - _ROUND_LIVE - damage * _MY_HIT, my_lives - damage, opp_lives, True)
+                elif key & _OPP_PROTECTED:
+                    live_value = child(base - _ROUND_LIVE - _OPP_PROTECTED, my_lives, opp_lives, True)
+                else:
+                    live_value = child(base - _ROUND_LIVE - damage * _OPP_HIT, my_lives, opp_lives - damage, True)
+            if has_blank:
+                # "Shoot Self" 로 공포탄을 쏜 경우에만 턴 유지
+                blank_value = child(base - _ROUND_BLANK, my_lives, opp_lives, not target_self)
+            if live_value is None:
+                return blank_value
+            if blank_value is None:
+                return live_value
+            return (
+                (live_value[0] + blank_value[0]) / 2,
+                (live_value[1] + blank_value[1]) / 2,
+            )
+
+        if action == _RELOAD:
+            return self.reload_values[key & _RELOAD_FIELDS]
+
+        used = key | _ANY_ITEM_USED
+        if action == _USE_BULLET:
+            return child(used & ~_BULLET | _MY_ENHANCED, my_lives, opp_lives, False)
+
+        if action == _USE_SCARECROW:
+            base = used & ~_SCARECROW
+            w1, d1 = child(base | _MY_PROTECTED, my_lives, opp_lives, False)
+            w0, d0 = child(base, my_lives, opp_lives, False)
+            p = SCARECROW_CHANCE
+
+        elif action == _USE_SYRINGE:
+            base = used & ~_SYRINGE
+            if my_lives < INITIAL_LIVES:
+                w1, d1 = child(base + _MY_HIT, my_lives + 1, opp_lives, False)
+            else:
+                # 생명력이 가득 차 있으면 카드는 남고 이번 턴 사용만 소모됨
+                w1, d1 = child(used | _SYRINGE_USED, my_lives, opp_lives, False)
+            w0, d0 = child(base, my_lives, opp_lives, False)
+            p = SYRINGE_CHANCE
+
+        else:
+            # 수류탄: 양쪽 생명력 1 감소 후 즉시 턴 종료
+            base = key & ~_GRENADE
+            w1, d1 = child(base - _MY_HIT - _OPP_HIT, my_lives - 1, opp_lives - 1, True)
+            w0, d0 = child(base, my_lives, opp_lives, True)
+            p = GRENADE_CHANCE
+
+        return p * w1 + (1 - p) * w0, p * d1 + (1 - p) * d0
+
+# 재장전 결과에 영향을 주는 필드
+_RELOAD_FIELDS = (
+    (7 << MY_LIVES) | (7 << OPP_LIVES)
+    | _MY_ENHANCED | _OPP_ENHANCED
+    | _MY_PROTECTED | _OPP_PROTECTED
+)
+
+# --- 함수 ---
+
+def candidate_actions(key):
+    # 위치 키에서 가능한 액션 코드 목록 (engine.legal_actions 와 같은 규칙)
+    if key & _MAGAZINE:
+        candidates = [_SHOOT_OPPONENT, _SHOOT_SELF]
+    else:
+        candidates = [_RELOAD]
+    if not key & _ANY_ITEM_USED:
+        if key & _BULLET:
+            candidates.append(_USE_BULLET)
+        if key & _SCARECROW:
+            candidates.append(_USE_SCARECROW)
+        if key & _SYRINGE and not key & _SYRINGE_USED:
+            candidates.append(_USE_SYRINGE)
+        if key & _GRENADE:
+            candidates.append(_USE_GRENADE)
+    return candidates
+
+def swap_players(key):
+    # 상대 차례 기준 키로 변환 (이번 턴 사용 여부 플래그는 초기화)
+    return (
+        (key & 7 << MY_LIVES) << 3
+        | (key & 7 << OPP_LIVES) >> 3
+        | (key & 15 << MY_ITEMS) << 4
+        | (key & 15 << OPP_ITEMS) >> 4
+        | (key & _MY_ENHANCED) << 1
+        | (key & _OPP_ENHANCED) >> 1
+        | (key & _MY_PROTECTED) << 1
+        | (key & _OPP_PROTECTED) >> 1
+        | key & _MAGAZINE
+    )
+
+def pack_position(state):
+    # MatchState 를 현재 플레이어 기준 위치 키로 압축
+    me = state.current_player
+    opp = 1 - me
+    key = (
+        state.lives[me] << MY_LIVES
+        | state.lives[opp] << OPP_LIVES
+        | state.magazine.nb_live << NB_LIVE
+        | state.magazine.nb_blank << NB_BLANK
+        | int(state.bullet_enhanced[me]) << MY_ENHANCED
+        | int(state.bullet_enhanced[opp]) << OPP_ENHANCED
+        | int(state.scarecrow_protected[me]) << MY_PROTECTED
+        | int(state.scarecrow_protected[opp]) << OPP_PROTECTED
+        | int(state.item_used_this_turn) << ITEM_USED
+    )
+    for item in Item:
+        if state.items[me][item]:
+            key |= 1 << (MY_ITEMS + item)
+        if state.items[opp][item]:
+            key |= 1 << (OPP_ITEMS + item)
+    # 사용 여부는 카드가 남아 있는 주사기에서만 의미가 있음
+    if state.items[me][Item.SYRINGE] and state.used[me][Item.SYRINGE]:
+        key |= 1 << SYRINGE_USED
+    return key
+
+def main():
+    solver = Solver()
+    solver.prepare()
+    table = solver.table
+    print(
+        f"Solved in {solver.solve_time:.1f}s ({solver.sweeps} sweeps), "
+        f"table {table.occupancy()} / {len(table.keys)} slots, {table.nbytes >> 20} MiB"
+    )
+    state = engine.new_match()
+    win, draw, action = solver.evaluate(state)
+    print(f"Opening {state.magazine!r}: win {win:.4f}, draw {draw:.4f}, best {action.name}")
+
+if __name__ == "__main__":
+    main()
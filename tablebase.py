@@ -0,0 +1,138 @@
+import argparse
+import mmap
+import struct
+import time
+
+from engine import Action
+import solver
+
+# 해석기 결과를 미리 계산해 둔 고정 크기 레코드 파일 (테이블베이스)
+# 실행 중에는 파일을 mmap 해서 해석 없이 위치 키로 바로 값을 찾는다.
+# 여러 프로세스가 같은 파일을 열면 페이지를 공유한다.
+#
+# 파일 구조
+#   헤더      : HEADER
+#   디렉터리  : (2^bucket_bits + 1) 개의 uint32, 버킷별 첫 레코드 번호
+#   레코드    : RECORD (키, 승리 확률, 무승부 확률, 최선의 액션), 버킷 순 -> 키 순 정렬
+# 버킷은 위치 키의 해시로 정하므로 버킷당 레코드 수가 평균 몇 개 수준이다.
+
+# --- 상수 정의 ---
+
+DEFAULT_PATH = "tablebase.bin"
+MAGIC = b"BRTB"
+VERSION = 1
+BUCKET_BITS = 18
+
+HEADER = struct.Struct("<4sHHI")  # magic, version, bucket_bits, 레코드 수
+DIRECTORY_ENTRY = struct.Struct("<I")
+RECORD = struct.Struct("<IHHB")  # 확률은 0..65535 로 양자화
+
+PROBABILITY_SCALE = 65535
+
+# 버킷 해시 (파일 형식의 일부이므로 해석기 치환표 해시와 별도로 고정)
+BUCKET_MIX = 0x9E3779B97F4A7C15
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# --- 클래스 ---
+
+class Tablebase:
+    # mmap 으로 연 읽기 전용 테이블베이스
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.bucket_bits, self.nb_records = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        self.shift = 64 - self.bucket_bits
+        self.directory_offset = HEADER.size
+        self.records_offset = self.directory_offset + DIRECTORY_ENTRY.size * ((1 << self.bucket_bits) + 1)
+        expected = self.records_offset + RECORD.size * self.nb_records
+        if len(self.data) != expected:
+            self.data.close()
+            raise ValueError(f"{path} is truncated ({len(self.data)} bytes, expected {expected})")
+
+    def close(self):
+        self.data.close()
+
+    def lookup(self, key):
+        """위치 키의 (승리 확률, 무승부 확률, 최선의 액션), 없으면 None"""
+        data = self.data
+        offset = self.directory_offset + DIRECTORY_ENTRY.size * bucket(key, self.shift)
+        first, = DIRECTORY_ENTRY.unpack_from(data, offset)
+        end, = DIRECTORY_ENTRY.unpack_from(data, offset + DIRECTORY_ENTRY.size)
+        for index in range(first, end):
+            record_key, win, draw, action = RECORD.unpack_from(data, self.records_offset + RECORD.size * index)
+            if record_key == key:
+                return win / PROBABILITY_SCALE, draw / PROBABILITY_SCALE, Action(action)
+        return None
+
+    def probe(self, state):
+        # 현재 플레이어 기준 값 (끝난 판이면 None)
+        if state.game_over:
+            return None
+        return self.lookup(solver.pack_position(state))
+
+    def best_action(self, state):
+        result = self.probe(state)
+        if result is None:
+            raise KeyError("Position is not in the tablebase")
+        return result[2]
+
+class _RecordingSolver(solver.Solver):
+    # 탐색 중 방문한 모든 결정 노드 키를 기록 (도달 가능한 위치 열거용)
+    def __init__(self, table_bits=solver.DEFAULT_TABLE_BITS):
+        super().__init__(table_bits)
+        self.positions = set()
+
+    def _value(self, key):
+        self.positions.add(key)
+        return super()._value(key)
+
+# --- 함수 ---
+
+def bucket(key, shift):
+    return ((key * BUCKET_MIX) & _MASK64) >> shift
+
+def quantize(probability):
+    return min(PROBABILITY_SCALE, max(0, round(probability * PROBABILITY_SCALE)))
+
+def build(path=DEFAULT_PATH, bucket_bits=BUCKET_BITS, table_bits=solver.DEFAULT_TABLE_BITS):
+    """재장전 지점부터 도달 가능한 모든 위치를 풀어 path 에 기록, 레코드 수 반환"""
+    recorder = _RecordingSolver(table_bits)
+    recorder.prepare()
+
+    shift = 64 - bucket_bits
+    keys = sorted(recorder.positions, key=lambda key: (bucket(key, shift), key))
+    counts = [0] * (1 << bucket_bits)
+    for key in keys:
+        counts[bucket(key, shift)] += 1
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bucket_bits, len(keys)))
+        first = 0
+        for count in counts:
+            f.write(DIRECTORY_ENTRY.pack(first))
+            first += count
+        f.write(DIRECTORY_ENTRY.pack(first))
+
+        records = bytearray()
+        for key in keys:
+            win, draw, action = recorder.evaluate_key(key)
+            records += RECORD.pack(key, quantize(win), quantize(draw), action)
+        f.write(records)
+    return len(keys)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the strategy tablebase from the exact solver.")
+    parser.add_argument("-o", "--output", default=DEFAULT_PATH)
+    parser.add_argument("--bucket-bits", type=int, default=BUCKET_BITS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    nb_records = build(args.output, args.bucket_bits)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {nb_records} positions to {args.output} in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈이 저장소 최상위에 있으므로 어디서 pytest 를 실행해도 import 할 수 있게 함
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,199 @@
+import asyncio
+import random
+import socket
+
+import engine
+import host
+from host import GameHost
+from netplay import NetplayClient, encode, snapshot
+
+# 127.0.0.1 의 임의 포트에 GameHost 를 띄우고 스크립트 클라이언트로 시간 제한과 관전을 확인하는 회귀 테스트
+
+# --- 상수 정의 ---
+
+HOST = "127.0.0.1"
+RECV_TIMEOUT = 5.0  # 초, 메시지 하나를 기다리는 최대 시간
+NB_SPECTATORS = 300
+NB_FAST_SPECTATORS = 10
+NB_SLOW_SPECTATORS = 3
+SLOW_BUFFER = 1024  # 바이트, 느린 관전자의 소켓 버퍼 크기
+FLOOD_UPDATES = 600  # 느린 관전자를 밀리게 하는 합친 델타 수
+FLOOD_PADDING = 2000  # 바이트, 합친 델타 하나에 붙이는 크기
+
+# --- 함수 ---
+
+async def recv(client, kind):
+    """kind 종류의 메시지가 올 때까지 받아 반환"""
+    while True:
+        message = await asyncio.wait_for(client.recv(), RECV_TIMEOUT)
+        assert message is not None, f"connection closed while waiting for {kind}"
+        if message["type"] == kind:
+            return message
+
+async def start_host(**options):
+    return await GameHost(HOST, 0, 0, spectator_port=0, **options).start()
+
+async def connect_pair(game_host):
+    # 두 플레이어를 한 판에 앉히고 시작 상태까지 받음
+    players = [await NetplayClient().connect(HOST, game_host.port) for _ in range(2)]
+    for player in players:
+        await recv(player, "welcome")
+        await recv(player, "state")
+    return players
+
+async def watch(game_host, table_id):
+    # 관전자 하나를 연결하고 시작 상태까지 받음
+    spectator = await NetplayClient().connect(HOST, game_host.spectator_port)
+    spectator.writer.write(encode({"watch": table_id}))
+    await recv(spectator, "watching")
+    await recv(spectator, "state")
+    return spectator
+
+async def close_all(clients):
+    for client in clients:
+        await client.close()
+
+def test_turn_timeout_forfeits_then_idle_eviction(monkeypatch):
+    monkeypatch.setattr(host, "SWEEP_INTERVAL", 0.05)
+
+    async def run():
+        game_host = await start_host(turn_timeout=0.2, idle_timeout=0.3)
+        players = await connect_pair(game_host)
+        try:
+            mover = players[0].snapshot["turn"]
+            for player in players:
+                delta = await recv(player, "delta")
+                assert delta["timeout"] == mover
+                assert delta["changes"] == {"winner": 1 - mover}
+            assert game_host.turn_timeouts == 1
+
+            # 끝난 판에 연결이 남아 있으면 idle_timeout 뒤에 닫음
+            for player in players:
+                closed = await recv(player, "closed")
+                assert closed["reason"] == "idle"
+            assert not game_host.tables
+            assert game_host.evictions == 1
+        finally:
+            await close_all(players)
+            await game_host.close()
+
+    asyncio.run(run())
+
+def test_waiting_table_is_evicted_when_idle(monkeypatch):
+    monkeypatch.setattr(host, "SWEEP_INTERVAL", 0.05)
+
+    async def run():
+        game_host = await start_host(idle_timeout=0.2)
+        player = await NetplayClient().connect(HOST, game_host.port)
+        try:
+            await recv(player, "welcome")
+            closed = await recv(player, "closed")
+            assert closed["reason"] == "idle"
+            assert game_host.waiting is None
+            assert not game_host.tables
+        finally:
+            await player.close()
+            await game_host.close()
+
+    asyncio.run(run())
+
+def test_spectators_get_one_coalesced_delta_per_tick():
+    async def run():
+        game_host = await start_host()
+        players = await connect_pair(game_host)
+        table = game_host.tables[players[0].table]
+        spectators = await asyncio.gather(*(watch(game_host, table.id) for _ in range(NB_SPECTATORS)))
+        try:
+            assert len(table.spectators) == NB_SPECTATORS
+
+            # 한 틱 안에 액션 여러 개 (사이에 await 가 없으므로 틱이 끼어들 수 없음)
+            policy = random.Random(0)
+            events = []
+            for _ in range(4):
+                if table.state.game_over:
+                    break
+                action = policy.choice(engine.legal_actions(table.state))
+                before = len(table.pending["events"]) if table.pending else 0
+                game_host._act(table, table.state.current_player, action)
+                events += table.pending["events"][before:]
+            updates = game_host.spectator_updates
+
+            deltas = await asyncio.gather(*(recv(spectator, "delta") for spectator in spectators))
+            for spectator, delta in zip(spectators, deltas):
+                assert delta["seq"] == table.seq
+                assert delta["events"] == events
+                assert spectator.snapshot == snapshot(table.state)
+            assert game_host.spectator_updates == updates + 1
+
+            # 다음 틱에는 보낼 것이 없음
+            await asyncio.sleep(host.SPECTATE_TICK * 3)
+            assert game_host.spectator_updates == updates + 1
+            extra = await asyncio.gather(
+                *(asyncio.wait_for(spectator.reader.readline(), 0.05) for spectator in spectators),
+                return_exceptions=True,
+            )
+            assert all(isinstance(result, asyncio.TimeoutError) for result in extra)
+        finally:
+            await close_all(spectators)
+            await close_all(players)
+            await game_host.close()
+
+    asyncio.run(run())
+
+def test_slow_spectators_are_dropped(monkeypatch):
+    monkeypatch.setattr(host, "SPECTATOR_QUEUE_SIZE", 4)
+
+    async def run():
+        game_host = await start_host()
+        players = await connect_pair(game_host)
+        table = game_host.tables[players[0].table]
+        fast = [await watch(game_host, table.id) for _ in range(NB_FAST_SPECTATORS)]
+
+        # 읽지 않는 관전자: 양쪽 소켓 버퍼를 줄여 곧 밀리게 함
+        slow = []
+        for _ in range(NB_SLOW_SPECTATORS):
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_BUFFER)
+            sock.connect((HOST, game_host.spectator_port))
+            sock.sendall(encode({"watch": table.id}))
+            slow.append(sock)
+        slow_ports = {sock.getsockname()[1] for sock in slow}
+        while len(table.spectators) < NB_FAST_SPECTATORS + NB_SLOW_SPECTATORS:
+            await asyncio.sleep(0.01)
+        for connection in table.spectators:
+            if connection.writer.get_extra_info("peername")[1] in slow_ports:
+                connection.writer.get_extra_info("socket").setsockopt(
+                    socket.SOL_SOCKET, socket.SO_SNDBUF, SLOW_BUFFER
+                )
+                connection.writer.transport.set_write_buffer_limits(high=SLOW_BUFFER)
+
+        async def read_all(spectator):
+            while await spectator.recv() is not None:
+                pass
+
+        readers = [asyncio.ensure_future(read_all(spectator)) for spectator in fast]
+        try:
+            for _ in range(FLOOD_UPDATES):
+                game_host.publish(
+                    table,
+                    {"type": "delta", "seq": table.seq, "events": [], "changes": {"pad": "x" * FLOOD_PADDING}},
+                )
+                game_host.flush(table)
+                await asyncio.sleep(0.001)
+                if game_host.spectator_drops == NB_SLOW_SPECTATORS:
+                    break
+
+            # 읽지 않는 관전자만 끊기고, 따라잡는 관전자는 남음
+            assert game_host.spectator_drops == NB_SLOW_SPECTATORS
+            assert len(table.spectators) == NB_FAST_SPECTATORS
+            assert all(not reader.done() for reader in readers)
+        finally:
+            for reader in readers:
+                reader.cancel()
+            for sock in slow:
+                sock.close()
+            await close_all(fast)
+            await close_all(players)
+            await game_host.close()
+
+    asyncio.run(run())
@@ -0,0 +1,147 @@
+import asyncio
+import random
+
+import engine
+from netplay import (
+    Connection,
+    NetplayClient,
+    NetplayServer,
+    Table,
+    snapshot,
+    state_from_snapshot,
+)
+
+# 127.0.0.1 의 임의 포트에 서버를 띄우고 스크립트 클라이언트로 진행하는 netplay 회귀 테스트
+
+# --- 상수 정의 ---
+
+HOST = "127.0.0.1"
+TABLE_SEED = 1234
+RECV_TIMEOUT = 5.0  # 초, 메시지 하나를 기다리는 최대 시간
+
+# --- 클래스 ---
+
+class SeededServer(NetplayServer):
+    # 판 시드를 고정해 테스트가 같은 시드의 engine 과 결과를 비교할 수 있게 함
+    def _new_table(self):
+        table = Table(self.next_table_id, TABLE_SEED + self.next_table_id)
+        self.next_table_id += 1
+        return table
+
+class GatedWriter:
+    # drain 이 gate 가 열릴 때까지 멈추는 가짜 StreamWriter (느린 클라이언트)
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        await self.gate.wait()
+
+    def close(self):
+        pass
+
+# --- 함수 ---
+
+async def recv(client, kind):
+    """kind 종류의 메시지가 올 때까지 받아 반환"""
+    while True:
+        message = await asyncio.wait_for(client.recv(), RECV_TIMEOUT)
+        assert message is not None, f"connection closed while waiting for {kind}"
+        if message["type"] == kind:
+            return message
+
+async def connect_pair(port):
+    # 두 클라이언트를 한 판에 앉히고 시작 상태까지 받음
+    clients = [await NetplayClient().connect(HOST, port) for _ in range(2)]
+    for client in clients:
+        await recv(client, "welcome")
+        await recv(client, "state")
+    return clients
+
+def test_match_deltas_match_engine():
+    async def run():
+        server = await SeededServer(HOST, 0).start()
+        clients = await connect_pair(server.port)
+        try:
+            assert {client.player for client in clients} == {0, 1}
+            assert clients[0].table == clients[1].table
+
+            rng = engine.MatchRandom(TABLE_SEED + clients[0].table)
+            reference = engine.new_match(rng)
+            assert clients[0].snapshot == snapshot(reference)
+
+            policy = random.Random(0)
+            seq = 0
+            while not reference.game_over:
+                mover = clients[0] if clients[0].my_turn() else clients[1]
+                action = policy.choice(engine.legal_actions(state_from_snapshot(mover.snapshot)))
+                await mover.act(action)
+                events = engine.apply_action(reference, action, rng)
+                seq += 1
+                for client in clients:
+                    delta = await recv(client, "delta")
+                    assert delta["seq"] == seq
+                    assert delta["events"] == [int(event) for event in events]
+                    assert client.snapshot == snapshot(reference)
+        finally:
+            for client in clients:
+                await client.close()
+            await server.close()
+
+    asyncio.run(run())
+
+def test_out_of_turn_action_is_rejected():
+    async def run():
+        server = await SeededServer(HOST, 0).start()
+        clients = await connect_pair(server.port)
+        try:
+            waiting = clients[1] if clients[0].my_turn() else clients[0]
+            await waiting.act(engine.Action.SHOOT_OPPONENT)
+            error = await recv(waiting, "error")
+            assert error["message"] == "Not your turn"
+            assert server.tables[waiting.table].seq == 0
+        finally:
+            for client in clients:
+                await client.close()
+            await server.close()
+
+    asyncio.run(run())
+
+def test_leaving_closes_table():
+    async def run():
+        server = await SeededServer(HOST, 0).start()
+        clients = await connect_pair(server.port)
+        try:
+            await clients[0].close()
+            left = await recv(clients[1], "left")
+            assert left["player"] == clients[0].player
+            assert not server.tables
+        finally:
+            await clients[1].close()
+            await server.close()
+
+    asyncio.run(run())
+
+def test_overflow_replaces_backlog_with_resync():
+    async def run():
+        writer = GatedWriter()
+        connection = Connection(writer, queue_size=4)
+        # 첫 메시지는 보내는 중 drain 에서 멈추고, 이후 메시지가 큐를 넘치게 함
+        connection.send(b"delta0\n", lambda: b"state\n")
+        await asyncio.sleep(0)
+        for index in range(1, 10):
+            connection.send(b"delta%d\n" % index, lambda: b"state\n")
+        assert connection.resyncs == 2
+        assert connection.queue.qsize() == 1
+
+        # 넘친 뒤에는 쌓인 델타 대신 전체 상태 하나가 가고, 따라잡으면 넘친 횟수를 다시 셈
+        writer.gate.set()
+        await asyncio.sleep(0.01)
+        assert writer.written == [b"delta0\n", b"state\n"]
+        assert connection.resyncs == 0
+        await connection.close()
+
+    asyncio.run(run())
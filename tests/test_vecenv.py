@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from vecenv import VectorEnv, sample_actions
+
+# 환경별 시드 회귀 테스트: 환경 하나의 진행은 그 시드와 그 환경의 액션으로만 정해져야 함
+
+# --- 상수 정의 ---
+
+STEPS = 200
+TRACKED_SEED = 42
+
+# --- 함수 ---
+
+def trajectory(seeds, index):
+    """index 환경을 고정된 정책으로, 나머지는 무작위로 진행한 index 환경의 (관측, 보상, 종료) 목록"""
+    env = VectorEnv(len(seeds))
+    observations, masks = env.reset(seeds)
+    others = np.random.default_rng(len(seeds))  # 다른 환경의 액션은 N 마다 다름
+    history = [observations[index].copy()]
+    for _ in range(STEPS):
+        actions = sample_actions(masks, others)
+        actions[index] = np.flatnonzero(masks[index])[0]
+        observations, rewards, dones, masks = env.step(actions)
+        history.append(np.concatenate([observations[index], [rewards[index], dones[index]]]))
+    return history
+
+def test_env_trajectory_depends_only_on_its_seed():
+    small = trajectory([1, 2, TRACKED_SEED, 3], 2)
+    large = trajectory(list(range(100, 150)) + [TRACKED_SEED] + list(range(20)), 50)
+    assert all(np.array_equal(a, b) for a, b in zip(small, large))
+
+def test_single_seed_spawns_stable_per_env_streams():
+    # 정수 시드 하나면 환경 i 는 그 시드의 i 번째 자식 스트림 (N 과 무관)
+    small = VectorEnv(4)
+    large = VectorEnv(64)
+    small_observations, _ = small.reset(7)
+    large_observations, _ = large.reset(7)
+    assert np.array_equal(small_observations, large_observations[:4])
+
+def test_seed_list_must_match_env_count():
+    env = VectorEnv(4)
+    with pytest.raises(ValueError):
+        env.reset([1, 2, 3])
@@ -0,0 +1,151 @@
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from engine import Action, Item, NB_ITEMS
+from policies import load_policy
+
+# 정책 A 와 정책 B 를 M 판 대결시키는 토너먼트 (모든 CPU 코어 사용)
+
+# --- 상수 정의 ---
+
+MAX_ACTIONS = 10000  # 끝나지 않는 판을 무승부로 처리할 액션 수
+CHUNKS_PER_WORKER = 4  # 작업 분배 단위 (코어 간 부하 균형)
+Z_95 = 1.959963984540054
+
+# --- 클래스 ---
+
+class Tally:
+    # 한 묶음의 대결 결과 (워커별로 모은 뒤 merge 로 합침)
+    def __init__(self):
+        self.matches = 0
+        self.wins = [0, 0]  # [정책 A, 정책 B]
+        self.draws = 0
+        self.forfeits = [0, 0]  # 불가능한 액션을 반환해 패배 처리된 판
+        self.actions = 0
+        self.turns = 0
+        self.item_uses = [[0] * NB_ITEMS, [0] * NB_ITEMS]
+
+    def merge(self, other):
+        self.matches += other.matches
+        self.draws += other.draws
+        self.actions += other.actions
+        self.turns += other.turns
+        for side in range(2):
+            self.wins[side] += other.wins[side]
+            self.forfeits[side] += other.forfeits[side]
+            for item in range(NB_ITEMS):
+                self.item_uses[side][item] += other.item_uses[side][item]
+        return self
+
+# --- 함수 ---
+
+def wilson_interval(successes, n, z=Z_95):
+    # 승률의 Wilson 점수 신뢰구간
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return center - margin, center + margin
+
+def play_match(policies, rng, tally, swap):
+    # 한 판 진행 (swap 이면 정책 B 가 Player 1)
+    sides = (1, 0) if swap else (0, 1)
+    state = engine.new_match(rng)
+    nb_actions = 0
+    while not state.game_over and nb_actions < MAX_ACTIONS:
+        side = sides[state.current_player]
+        action = policies[side](state)
+        if not engine.is_legal(state, action):
+            tally.forfeits[side] += 1
+            tally.wins[1 - side] += 1
+            tally.actions += nb_actions  # 기권한 판도 평균에 들어가므로 둔 액션까지는 셈
+            return
+        if action >= Action.USE_BULLET and action != Action.RELOAD:
+            tally.item_uses[side][action - Action.USE_BULLET] += 1
+        player = state.current_player
+        engine.apply_action(state, action, rng)
+        nb_actions += 1
+        tally.turns += state.current_player != player
+    tally.actions += nb_actions
+    if state.winner is None or state.winner == -1:
+        tally.draws += 1
+    else:
+        tally.wins[sides[state.winner]] += 1
+
+def play_chunk(policy_a, policy_b, first_match, nb_matches, seed):
+    # 워커 프로세스에서 실행: 판마다 독립된 시드 스트림을 써서 워커 수와 무관하게 재현 가능
+    policies = (load_policy(policy_a), load_policy(policy_b))
+    tally = Tally()
+    for match_index in range(first_match, first_match + nb_matches):
+        rng = engine.MatchRandom(f"{seed}:{match_index}")
+        random.seed(f"{seed}:{match_index}:policy")  # random 모듈을 쓰는 정책용
+        play_match(policies, rng, tally, swap=match_index % 2 == 1)
+        tally.matches += 1
+    return tally
+
+def run_tournament(policy_a, policy_b, nb_matches, seed=0, workers=None):
+    # 판을 묶음으로 나눠 프로세스 풀에서 실행 후 결과 합산
+    workers = workers or os.cpu_count() or 1
+    nb_chunks = max(1, min(nb_matches, workers * CHUNKS_PER_WORKER))
+    bounds = [nb_matches * i // nb_chunks for i in range(nb_chunks + 1)]
+
+    total = Tally()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play_chunk, policy_a, policy_b, start, end - start, seed)
+            for start, end in zip(bounds, bounds[1:])
+            if end > start
+        ]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+def format_report(policy_a, policy_b, tally):
+    n = tally.matches
+    lines = [f"{policy_a} vs {policy_b}: {n} matches"]
+    for side, name in enumerate((policy_a, policy_b)):
+        low, high = wilson_interval(tally.wins[side], n)
+        lines.append(
+            f"  {name:>12} wins: {tally.wins[side]:>9} ({tally.wins[side] / n:.2%}, "
+            f"95% CI {low:.2%} - {high:.2%}), forfeits: {tally.forfeits[side]}"
+        )
+        uses = ", ".join(
+            f"{item.name.lower()} {tally.item_uses[side][item] / n:.2f}" for item in Item
+        )
+        lines.append(f"  {'':>12} items/match: {uses}")
+    low, high = wilson_interval(tally.draws, n)
+    lines.append(f"  {'draws':>12}: {tally.draws:>9} ({tally.draws / n:.2%}, 95% CI {low:.2%} - {high:.2%})")
+    lines.append(f"  average turns: {tally.turns / n:.2f}, average actions: {tally.actions / n:.2f}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Play two bot policies against each other.")
+    parser.add_argument("policy_a", help="policy name or module:function")
+    parser.add_argument("policy_b", help="policy name or module:function")
+    parser.add_argument("-n", "--matches", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: all CPU cores")
+    args = parser.parse_args()
+
+    # 잘못된 정책 이름은 워커를 띄우기 전에 확인
+    try:
+        load_policy(args.policy_a)
+        load_policy(args.policy_b)
+    except (ValueError, FileNotFoundError) as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    tally = run_tournament(args.policy_a, args.policy_b, args.matches, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(format_report(args.policy_a, args.policy_b, tally))
+    print(f"  {elapsed:.1f}s ({tally.matches / elapsed:.0f} matches/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import time
+
+import numpy as np
+
+import batch
+from engine import INITIAL_LIVES, NB_SLOTS, NB_ITEMS, NB_ACTIONS
+
+# 강화학습용 벡터 환경 (gym 의 VectorEnv 와 같은 reset/step 형태)
+# batch.BatchMatch 로 N 판을 동시에 진행하고, 관측/보상/종료/액션 마스크를
+# 미리 만들어 둔 배열에 매 step 덮어쓴다 (반환 배열은 항상 같은 객체이므로 보관하려면 복사).
+#
+# 자기 대국(self-play) 형식: 관측은 지금 둘 차례인 플레이어 시점이고,
+# 보상은 방금 액션을 둔 플레이어 기준 (이기면 +1, 지면 -1, 무승부와 진행 중은 0).
+# 끝난 판은 step 안에서 바로 새 판으로 초기화되고, 그 판의 dones 가 True 가 된다.
+
+# --- 상수 정의 ---
+
+# 관측 벡터의 열 위치 (my = 둘 차례인 플레이어, opp = 상대)
+OBS_MY_LIVES = 0
+OBS_OPP_LIVES = 1
+OBS_MAG_LEN = 2
+OBS_MAG_LIVE = 3
+OBS_MY_ITEMS = 4  # NB_ITEMS 칸: 활성화된 카드
+OBS_MY_USED = OBS_MY_ITEMS + NB_ITEMS  # NB_ITEMS 칸: 이번 턴에 사용한 카드
+OBS_OPP_ITEMS = OBS_MY_USED + NB_ITEMS
+OBS_MY_ENHANCED = OBS_OPP_ITEMS + NB_ITEMS
+OBS_OPP_ENHANCED = OBS_MY_ENHANCED + 1
+OBS_MY_PROTECTED = OBS_OPP_ENHANCED + 1
+OBS_OPP_PROTECTED = OBS_MY_PROTECTED + 1
+OBS_ITEM_USED = OBS_OPP_PROTECTED + 1
+OBS_SIZE = OBS_ITEM_USED + 1
+
+BENCH_ENVS = 4096
+BENCH_SECONDS = 3.0
+
+# --- 클래스 ---
+
+class VectorEnv:
+    # N 개의 환경, 관측은 (N, OBS_SIZE) float32
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.batch = batch.BatchMatch(n, seed)
+        self.players = self.batch.current_player  # 판마다 둘 차례인 플레이어 (0/1)
+
+        self.observations = np.zeros((n, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.dones = np.zeros(n, dtype=bool)
+        self.masks = np.zeros((n, NB_ACTIONS), dtype=bool)
+
+        # 플레이어 축을 펼친 (N * 2, ...) 보기와 행마다의 인덱스 버퍼
+        self._lives = self.batch.lives.reshape(-1)
+        self._items = self.batch.items.reshape(n * 2, NB_ITEMS)
+        self._used = self.batch.used.reshape(n * 2, NB_ITEMS)
+        self._enhanced = self.batch.bullet_enhanced.reshape(-1)
+        self._protected = self.batch.scarecrow_protected.reshape(-1)
+        self._base = np.arange(n, dtype=np.intp) * 2
+        self._my = np.empty(n, dtype=np.intp)
+        self._opp = np.empty(n, dtype=np.intp)
+        self._movers = np.empty(n, dtype=np.int8)
+        self._lives_buffer = np.empty(n, dtype=np.int8)
+        self._flag_buffer = np.empty(n, dtype=bool)
+        self._items_buffer = np.empty((n, NB_ITEMS), dtype=bool)
+
+    def reset(self, seeds=None):
+        """모든 판을 새로 시작해 (관측, 마스크) 반환
+        seeds: 길이 N 목록이면 환경 i 의 규칙 난수를 seeds[i] 로, 정수 하나면 그 시드의 i 번째 자식 스트림으로 초기화
+        (환경 i 의 진행은 그 시드와 그 환경의 액션으로만 정해짐), None 이면 이어서 진행"""
+        if seeds is not None:
+            self.batch.seed(seeds)
+        self.batch.reset()
+        self.rewards.fill(0)
+        self.dones.fill(False)
+        self._observe()
+        return self.observations, self.masks
+
+    def step(self, actions):
+        """판마다 액션 하나씩 적용해 (관측, 보상, 종료, 마스크) 반환
+        마스크에서 불가능한 액션이 하나라도 있으면 아무 판도 진행하지 않고 ValueError"""
+        actions = np.asarray(actions)
+        legal = self.masks[self.batch.rows, actions]
+        if not legal.all():
+            index = int(np.argmin(legal))
+            raise ValueError(f"Illegal action {int(actions[index])} in env {index}")
+
+        np.copyto(self._movers, self.batch.current_player)
+        self.batch.step(actions)
+
+        # 보상: 방금 둔 플레이어가 이겼으면 +1, 상대가 이겼으면 -1
+        winner = self.batch.winner
+        np.not_equal(winner, batch.ONGOING, out=self.dones)
+        np.equal(winner, self._movers, out=self._flag_buffer)
+        np.copyto(self.rewards, self._flag_buffer)
+        np.bitwise_xor(self._movers, 1, out=self._movers)
+        np.equal(winner, self._movers, out=self._flag_buffer)
+        np.subtract(self.rewards, self._flag_buffer, out=self.rewards)
+
+        if self.dones.any():
+            self.batch.reset(np.flatnonzero(self.dones))
+        self._observe()
+        return self.observations, self.rewards, self.dones, self.masks
+
+    def _observe(self):
+        # 둘 차례인 플레이어 시점의 관측과 액션 마스크를 버퍼에 씀
+        obs = self.observations
+        np.add(self._base, self.batch.current_player, out=self._my)
+        np.bitwise_xor(self._my, 1, out=self._opp)
+
+        np.take(self._lives, self._my, out=self._lives_buffer)
+        np.multiply(self._lives_buffer, 1 / INITIAL_LIVES, out=obs[:, OBS_MY_LIVES])
+        np.take(self._lives, self._opp, out=self._lives_buffer)
+        np.multiply(self._lives_buffer, 1 / INITIAL_LIVES, out=obs[:, OBS_OPP_LIVES])
+        np.multiply(self.batch.mag_len, 1 / NB_SLOTS, out=obs[:, OBS_MAG_LEN])
+        np.multiply(self.batch.mag_live, 1 / NB_SLOTS, out=obs[:, OBS_MAG_LIVE])
+
+        for column, source, index in (
+            (OBS_MY_ITEMS, self._items, self._my),
+            (OBS_MY_USED, self._used, self._my),
+            (OBS_OPP_ITEMS, self._items, self._opp),
+        ):
+            np.take(source, index, axis=0, out=self._items_buffer)
+            np.copyto(obs[:, column : column + NB_ITEMS], self._items_buffer)
+
+        for column, source, index in (
+            (OBS_MY_ENHANCED, self._enhanced, self._my),
+            (OBS_OPP_ENHANCED, self._enhanced, self._opp),
+            (OBS_MY_PROTECTED, self._protected, self._my),
+            (OBS_OPP_PROTECTED, self._protected, self._opp),
+        ):
+            np.take(source, index, out=self._flag_buffer)
+            np.copyto(obs[:, column], self._flag_buffer)
+        np.copyto(obs[:, OBS_ITEM_USED], self.batch.item_used_this_turn)
+
+        # 활성화된 카드 중 이번 턴에 쓰지 않은 것만, 카드를 이미 쓴 턴이면 카드 액션 불가
+        self.batch.legal_mask(out=self.masks)
+
+# --- 함수 ---
+
+def sample_actions(masks, rng):
+    # 마스크에서 가능한 액션 중 하나를 판마다 균등하게 선택
+    scores = rng.random(masks.shape)
+    scores[~masks] = -1.0
+    return scores.argmax(axis=1)
+
+def benchmark(n=BENCH_ENVS, seconds=BENCH_SECONDS, seed=0):
+    """무작위 액션으로 seconds 초 동안 진행해 (초당 env-step, 끝난 판 수) 반환"""
+    env = VectorEnv(n, seed)
+    rng = np.random.default_rng(seed)
+    observations, masks = env.reset()
+    steps = 0
+    episodes = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        observations, rewards, dones, masks = env.step(sample_actions(masks, rng))
+        steps += n
+        episodes += int(dones.sum())
+    return steps / (time.perf_counter() - start), episodes
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure vectorized environment throughput.")
+    parser.add_argument("--envs", type=int, default=BENCH_ENVS, help="number of environments")
+    parser.add_argument("--seconds", type=float, default=BENCH_SECONDS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rate, episodes = benchmark(args.envs, args.seconds, args.seed)
+    print(f"{args.envs} envs: {rate:,.0f} env-steps/s, {episodes} episodes finished")
+
+if __name__ == "__main__":
+    main()